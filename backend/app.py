@@ -1,19 +1,113 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, has_request_context, jsonify, request, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from sqlalchemy import and_, case, event, func, or_, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.orm import Session, joinedload, object_session
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import base64
+import csv
+import functools
+import hashlib
+import io
+import json
+import math
+import numpy as np
 import os
+import random
 import requests
 import re
+import sqlite3
+import threading
+import time
 
 app = Flask(__name__)
 CORS(app)
 
 # Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ats.db'
+def database_url():
+    """DATABASE_URL from the environment; the postgres:// scheme some hosts hand out is normalized"""
+    url = os.environ.get('DATABASE_URL', 'sqlite:///ats.db')
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url):
+    """Connection pool tuning; in-memory SQLite keeps SQLAlchemy's single-connection pool"""
+    if url.startswith('sqlite') and (url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    }
+
+
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 
+# SQLite tuning for several gunicorn workers sharing one file: WAL lets readers run
+# alongside the single writer, and busy_timeout makes writers queue instead of failing
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+}
+
+
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    # Stop pysqlite from issuing its own BEGIN/COMMIT so SQLAlchemy controls transaction
+    # scope; otherwise SAVEPOINTs (begin_nested) do not nest inside the outer transaction
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {pragma}={value}')
+    cursor.close()
+
+
+@event.listens_for(Engine, 'begin')
+def _begin_sqlite_transaction(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    # A deferred transaction that reads and then writes cannot wait for the write lock once
+    # another worker has committed (SQLITE_BUSY, busy_timeout is not consulted), so anything
+    # that may write takes the lock up front: requests other than GET/HEAD/OPTIONS, and
+    # transactions opened with begin_write(). Everything else, including the background
+    # threads' polling, stays deferred so it does not block writers.
+    immediate = connection.get_execution_options().get('sqlite_begin') == 'IMMEDIATE'
+    if not immediate and has_request_context():
+        immediate = request.method not in ('GET', 'HEAD', 'OPTIONS')
+    connection.exec_driver_sql('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+
+
+def begin_write():
+    """
+    Open the session's next transaction with BEGIN IMMEDIATE on SQLite. Code outside a
+    request calls this right before a transaction that writes; inside an open
+    transaction it does nothing.
+    """
+    if not db.session().in_transaction():
+        db.session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
 # ==================== DATA MODELS ====================
 
 class Candidate(db.Model):
@@ -43,6 +137,7 @@ class Candidate(db.Model):
     google_scholar_url = db.Column(db.String(300))
     research_gate_url = db.Column(db.String(300))
     arxiv_author_id = db.Column(db.String(100))
+    arxiv_last_submitted = db.Column(db.DateTime)  # Newest arXiv submission ingested; refreshes fetch only newer
     orcid_id = db.Column(db.String(100))
     h_index = db.Column(db.Integer)
     citation_count = db.Column(db.Integer)
@@ -56,16 +151,31 @@ class Candidate(db.Model):
     status = db.Column(db.String(50), default='new')  # new, reviewing, interviewing, offer, hired, rejected
     rating = db.Column(db.Integer)  # 1-5 star rating
     notes = db.Column(db.Text)
+    source = db.Column(db.String(100), index=True)  # boolean_search, landing_page, manual, referral, etc.
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Indexes matched to list filters, keyset pagination and import/export lookups (see MIGRATIONS)
+    __table_args__ = (
+        db.Index('ix_candidate_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_candidate_created', 'created_at', 'id'),
+        db.Index('ix_candidate_updated', 'updated_at', 'id'),
+        db.Index('ix_candidate_primary_expertise', 'primary_expertise'),
+        db.Index('ix_candidate_github_url', 'github_url'),
+    )
+
     # Relationships
     applications = db.relationship('Application', backref='candidate', lazy=True, cascade='all, delete-orphan')
     publications = db.relationship('Publication', backref='candidate', lazy=True, cascade='all, delete-orphan')
 
-    def to_dict(self):
+    def to_dict(self, application_count=None, publication_count=None):
+        """Counts can be passed in by serialize_candidates() to avoid loading the relationships"""
+        if application_count is None:
+            application_count = len(self.applications)
+        if publication_count is None:
+            publication_count = len(self.publications)
         return {
             'id': self.id,
             'first_name': self.first_name,
@@ -85,6 +195,7 @@ class Candidate(db.Model):
             'google_scholar_url': self.google_scholar_url,
             'research_gate_url': self.research_gate_url,
             'arxiv_author_id': self.arxiv_author_id,
+            'arxiv_last_submitted': self.arxiv_last_submitted.isoformat() if self.arxiv_last_submitted else None,
             'orcid_id': self.orcid_id,
             'h_index': self.h_index,
             'citation_count': self.citation_count,
@@ -94,10 +205,11 @@ class Candidate(db.Model):
             'status': self.status,
             'rating': self.rating,
             'notes': self.notes,
+            'source': self.source,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'application_count': len(self.applications),
-            'publication_count': len(self.publications)
+            'application_count': application_count,
+            'publication_count': publication_count
         }
 
 
@@ -135,14 +247,21 @@ class Job(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_job_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_job_created', 'created_at', 'id'),
+    )
+
     # Relationships
     applications = db.relationship('Application', backref='job', lazy=True, cascade='all, delete-orphan')
 
-    def to_dict(self, show_company=False):
+    def to_dict(self, show_company=False, application_count=None):
         """
         Convert job to dict. If confidential and show_company is False,
         hide the company name (stealth mode for candidates)
         """
+        if application_count is None:
+            application_count = len(self.applications)
         return {
             'id': self.id,
             'title': self.title,
@@ -165,7 +284,7 @@ class Job(db.Model):
             'closing_date': self.closing_date.isoformat() if self.closing_date else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'application_count': len(self.applications)
+            'application_count': application_count
         }
 
 
@@ -178,7 +297,7 @@ class Application(db.Model):
     # Application Details
     status = db.Column(db.String(50), default='applied')  # applied, screening, interview, offer, hired, rejected
     stage = db.Column(db.String(100))  # phone screen, technical interview, on-site, etc.
-    source = db.Column(db.String(100))  # linkedin, referral, google_scholar, arxiv, etc.
+    source = db.Column(db.String(100), index=True)  # linkedin, referral, google_scholar, arxiv, etc.
 
     # Tracking
     applied_date = db.Column(db.DateTime, default=datetime.utcnow)
@@ -197,6 +316,13 @@ class Application(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_application_candidate', 'candidate_id', 'created_at'),
+        db.Index('ix_application_job_status', 'job_id', 'status'),
+        db.Index('ix_application_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_application_applied', 'applied_date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -220,15 +346,45 @@ class Application(db.Model):
         }
 
 
+class Paper(db.Model):
+    """A paper stored once however many candidates wrote it; Publication rows link candidates to it"""
+    __table_args__ = (
+        db.Index('ix_paper_venue_class', 'venue_class', 'citation_count'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Identity, checked in this order when a paper is ingested
+    arxiv_id = db.Column(db.String(100), unique=True)  # Without version suffix
+    doi = db.Column(db.String(200), unique=True)
+    title_hash = db.Column(db.String(40), nullable=False, index=True)  # sha1 of the normalized title; not unique
+
+    title = db.Column(db.String(500), nullable=False)
+    authors = db.Column(db.Text)
+    venue = db.Column(db.String(300))
+    venue_class = db.Column(db.String(50))  # Top conference the venue names; the paper's class in conference stats
+    year = db.Column(db.Integer)
+    paper_url = db.Column(db.String(500))
+    citation_count = db.Column(db.Integer, default=0)
+    abstract = db.Column(db.Text)  # Full text; publications keep a truncated copy
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    publications = db.relationship('Publication', backref='paper', lazy=True)
+
+
 class Publication(db.Model):
     """Research Papers and Publications (UNIQUE FEATURE!)"""
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
+    paper_id = db.Column(db.Integer, db.ForeignKey('paper.id'))  # Shared record; NULL for rows predating it
 
     # Publication Details
     title = db.Column(db.String(500), nullable=False)
     authors = db.Column(db.Text)  # All authors
     venue = db.Column(db.String(300))  # Conference/Journal name
+    venue_class = db.Column(db.String(50))  # Top conference the venue names (TOP_CONFERENCES), set on save
     year = db.Column(db.Integer)
 
     # Links
@@ -249,13 +405,24 @@ class Publication(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_publication_candidate_year', 'candidate_id', 'year'),
+        db.Index('ix_publication_candidate_arxiv', 'candidate_id', 'arxiv_id'),
+        db.Index('ix_publication_candidate_title', 'candidate_id', 'title'),
+        db.Index('ix_publication_arxiv_id', 'arxiv_id'),
+        db.Index('ix_publication_paper_candidate', 'paper_id', 'candidate_id'),
+        db.Index('ix_publication_venue_class', 'venue_class', 'candidate_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
             'candidate_id': self.candidate_id,
+            'paper_id': self.paper_id,
             'title': self.title,
             'authors': self.authors,
             'venue': self.venue,
+            'venue_class': self.venue_class,
             'year': self.year,
             'paper_url': self.paper_url,
             'arxiv_id': self.arxiv_id,
@@ -269,8 +436,61 @@ class Publication(db.Model):
         }
 
 
+class CandidateToken(db.Model):
+    """Inverted index: one posting per (normalized token, kind, candidate)"""
+    token = db.Column(db.String(200), primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)  # skill, expertise, term (free text, incl. publications)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), primary_key=True, index=True)
+
+
+class EnrichmentTask(db.Model):
+    """Background enrichment run for one candidate and source"""
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False, index=True)
+    source = db.Column(db.String(50), nullable=False)  # github, arxiv, orcid, scholar
+
+    status = db.Column(db.String(20), default='pending')  # pending, running, succeeded, failed
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=3)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow)  # Not picked up before this time (retry backoff)
+    locked_at = db.Column(db.DateTime)
+
+    result = db.Column(db.Text)  # JSON response of the enrichment
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_enrichment_task_status_run_after', 'status', 'run_after'),
+        # At most one active task per candidate and source (deduplication)
+        db.Index('uq_enrichment_task_active', 'candidate_id', 'source', unique=True,
+                 sqlite_where=text("status IN ('pending', 'running')"),
+                 postgresql_where=text("status IN ('pending', 'running')")),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'candidate_id': self.candidate_id,
+            'source': self.source,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+
 class SavedSearch(db.Model):
     """Saved Boolean Searches"""
+    __table_args__ = (
+        db.Index('ix_saved_search_due', 'execution_mode', 'next_run_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     # Search Details
@@ -285,10 +505,20 @@ class SavedSearch(db.Model):
     total_results = db.Column(db.Integer, default=0)
     github_results_count = db.Column(db.Integer, default=0)
 
+    # Scheduling
+    execution_mode = db.Column(db.String(20), default='on-demand')  # on-demand, auto-run
+    schedule = db.Column(db.Text)  # JSON: frequency, time, timezone, daysOfWeek
+    next_run_at = db.Column(db.DateTime)  # Set while execution_mode is auto-run
+    last_run_status = db.Column(db.String(50))  # completed, deferred, failed
+    last_delta_count = db.Column(db.Integer, default=0)  # New or changed profiles in the last run
+
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_executed = db.Column(db.DateTime, default=datetime.utcnow)
 
+    results = db.relationship('SavedSearchResult', backref='saved_search', lazy='dynamic',
+                              cascade='all, delete-orphan')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -298,14 +528,1109 @@ class SavedSearch(db.Model):
             'description': self.description,
             'total_results': self.total_results,
             'github_results_count': self.github_results_count,
+            'execution_mode': self.execution_mode or 'on-demand',
+            'schedule': json.loads(self.schedule) if self.schedule else None,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'last_run_status': self.last_run_status,
+            'last_delta_count': self.last_delta_count or 0,
             'created_at': self.created_at.isoformat(),
             'last_executed': self.last_executed.isoformat()
         }
 
 
-# Create tables
-with app.app_context():
-    db.create_all()
+class SavedSearchResult(db.Model):
+    """A profile a saved search has returned, fingerprinted so re-runs can report only what changed"""
+    __table_args__ = (
+        db.UniqueConstraint('saved_search_id', 'source', 'external_id', name='uq_saved_search_result'),
+        db.Index('ix_saved_search_result_changed', 'saved_search_id', 'last_changed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_search.id'), nullable=False)
+    source = db.Column(db.String(50), nullable=False)  # GitHub
+    external_id = db.Column(db.String(200), nullable=False)  # GitHub login
+    fingerprint = db.Column(db.String(40))  # sha1 of the profile fields a recruiter reviews
+    payload = db.Column(db.Text)  # JSON profile as returned by the search
+
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    refreshed_at = db.Column(db.DateTime)  # When the detailed profile was last fetched
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'external_id': self.external_id,
+            'change': 'new' if self.first_seen_at == self.last_changed_at else 'changed',
+            'profile': json.loads(self.payload) if self.payload else None,
+            'first_seen_at': self.first_seen_at.isoformat(),
+            'last_seen_at': self.last_seen_at.isoformat(),
+            'last_changed_at': self.last_changed_at.isoformat()
+        }
+
+
+# Email Campaign Model
+class EmailCampaign(db.Model):
+    """Email campaign for candidate outreach"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(500), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(50), default='draft')  # draft, scheduled, sent, paused
+    scheduled_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Stats
+    total_recipients = db.Column(db.Integer, default=0)
+    sent_count = db.Column(db.Integer, default=0)
+    opened_count = db.Column(db.Integer, default=0)
+    clicked_count = db.Column(db.Integer, default=0)
+    replied_count = db.Column(db.Integer, default=0)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'subject': self.subject,
+            'body': self.body,
+            'status': self.status,
+            'scheduled_at': self.scheduled_at.isoformat() if self.scheduled_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'created_at': self.created_at.isoformat(),
+            'total_recipients': self.total_recipients,
+            'sent_count': self.sent_count,
+            'opened_count': self.opened_count,
+            'clicked_count': self.clicked_count,
+            'replied_count': self.replied_count,
+            'open_rate': round((self.opened_count / self.sent_count * 100), 1) if self.sent_count > 0 else 0,
+            'click_rate': round((self.clicked_count / self.sent_count * 100), 1) if self.sent_count > 0 else 0,
+            'reply_rate': round((self.replied_count / self.sent_count * 100), 1) if self.sent_count > 0 else 0
+        }
+
+
+# Interview Model
+class Interview(db.Model):
+    """Interview scheduling"""
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+
+    interview_type = db.Column(db.String(100))  # phone, video, onsite, technical
+    scheduled_at = db.Column(db.DateTime, nullable=False)
+    duration_minutes = db.Column(db.Integer, default=60)
+    location = db.Column(db.String(300))  # Zoom link, office address, etc.
+
+    interviewers = db.Column(db.Text)  # JSON array of interviewer names/emails
+    notes = db.Column(db.Text)
+
+    status = db.Column(db.String(50), default='scheduled')  # scheduled, completed, cancelled, no_show
+    feedback = db.Column(db.Text)
+    rating = db.Column(db.Integer)  # 1-5 rating
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_interview_status_scheduled', 'status', 'scheduled_at'),
+        db.Index('ix_interview_candidate_created', 'candidate_id', 'created_at'),
+        db.Index('ix_interview_created', 'created_at', 'id'),
+    )
+
+    candidate = db.relationship('Candidate')
+    job = db.relationship('Job')
+
+    def to_dict(self):
+        candidate = self.candidate
+        job = self.job
+        return {
+            'id': self.id,
+            'candidate_id': self.candidate_id,
+            'candidate_name': f"{candidate.first_name} {candidate.last_name}" if candidate else 'Unknown',
+            'job_id': self.job_id,
+            'job_title': job.title if job else 'Unknown',
+            'interview_type': self.interview_type,
+            'scheduled_at': self.scheduled_at.isoformat(),
+            'duration_minutes': self.duration_minutes,
+            'location': self.location,
+            'interviewers': self.interviewers,
+            'notes': self.notes,
+            'status': self.status,
+            'feedback': self.feedback,
+            'rating': self.rating,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+# Offer Model
+class Offer(db.Model):
+    """Job offer management"""
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+
+    salary = db.Column(db.Integer)
+    equity = db.Column(db.String(100))  # e.g., "0.1%"
+    signing_bonus = db.Column(db.Integer)
+    start_date = db.Column(db.Date)
+
+    status = db.Column(db.String(50), default='draft')  # draft, sent, negotiating, accepted, declined, expired
+    sent_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+    responded_at = db.Column(db.DateTime)
+
+    notes = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_offer_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_offer_created', 'created_at', 'id'),
+        db.Index('ix_offer_candidate', 'candidate_id'),
+    )
+
+    candidate = db.relationship('Candidate')
+    job = db.relationship('Job')
+
+    def to_dict(self):
+        candidate = self.candidate
+        job = self.job
+        return {
+            'id': self.id,
+            'candidate_id': self.candidate_id,
+            'candidate_name': f"{candidate.first_name} {candidate.last_name}" if candidate else 'Unknown',
+            'job_id': self.job_id,
+            'job_title': job.title if job else 'Unknown',
+            'salary': self.salary,
+            'equity': self.equity,
+            'signing_bonus': self.signing_bonus,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'status': self.status,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'responded_at': self.responded_at.isoformat() if self.responded_at else None,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+# Pipeline Counter Model
+class PipelineCounter(db.Model):
+    """Row count per (entity, status), kept current by mapper events on the pipeline models"""
+    entity = db.Column(db.String(20), primary_key=True)  # candidate, job, interview, offer
+    status = db.Column(db.String(50), primary_key=True)  # '' stands for a NULL status
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Status Transition Model
+class StatusTransition(db.Model):
+    """Append-only log of status changes for candidates, applications and offers"""
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # candidate, application, offer
+    entity_id = db.Column(db.Integer, nullable=False)
+    candidate_id = db.Column(db.Integer, index=True)
+    job_id = db.Column(db.Integer, index=True)
+
+    from_status = db.Column(db.String(50))  # NULL when the row records creation
+    to_status = db.Column(db.String(50), nullable=False)
+    transitioned_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    dwell_seconds = db.Column(db.Integer)  # time spent in from_status
+    since_created_seconds = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_status_transition_entity', 'entity', 'entity_id', 'transitioned_at'),
+        db.Index('ix_status_transition_to_status', 'entity', 'to_status', 'transitioned_at'),
+        db.Index('ix_status_transition_from_status', 'entity', 'from_status', 'transitioned_at'),
+    )
+
+
+class SchemaMigration(db.Model):
+    """Versions from MIGRATIONS that have been applied to this database"""
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# ==================== SHARED PAPERS ====================
+
+def chunked(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def normalize_arxiv_id(arxiv_id):
+    """'2101.00001v2' -> '2101.00001', so every version of a preprint is one paper"""
+    return re.sub(r'v\d+$', '', arxiv_id.strip()) if arxiv_id else None
+
+
+def paper_title_hash(title):
+    """sha1 of the title lowercased with punctuation and spacing removed"""
+    return hashlib.sha1(' '.join(re.findall(r'[a-z0-9]+', title.lower())).encode()).hexdigest()
+
+
+# Publication fields that describe the paper itself rather than the candidate's link to it
+PAPER_FIELDS = ('arxiv_id', 'doi', 'title', 'authors', 'venue', 'year', 'paper_url', 'citation_count', 'abstract')
+
+
+def publication_paper_fields(publication):
+    return {field: getattr(publication, field) for field in PAPER_FIELDS}
+
+
+def match_or_create_papers(records):
+    keys = [(normalize_arxiv_id(record.get('arxiv_id')),
+             record['doi'].strip().lower() if record.get('doi') else None,
+             paper_title_hash(record['title'])) for record in records]
+    by_arxiv, by_doi, by_title = {}, {}, {}  # by_title: title hash -> papers with that title
+
+    def remember(paper):
+        if paper.arxiv_id:
+            by_arxiv[paper.arxiv_id] = paper
+        if paper.doi:
+            by_doi[paper.doi] = paper
+        titled = by_title.setdefault(paper.title_hash, [])
+        if paper not in titled:
+            titled.append(paper)
+
+    def same_title(title_hash, arxiv_id, doi):
+        # Different papers can share a title: skip any that carries another arXiv id or DOI
+        return next((paper for paper in by_title.get(title_hash, ())
+                     if not (arxiv_id and paper.arxiv_id and paper.arxiv_id != arxiv_id)
+                     and not (doi and paper.doi and paper.doi != doi)), None)
+
+    for position, column in enumerate((Paper.arxiv_id, Paper.doi, Paper.title_hash)):
+        for chunk in chunked({key[position] for key in keys if key[position]}):
+            for paper in Paper.query.filter(column.in_(chunk)):
+                remember(paper)
+
+    papers = []
+    for record, (arxiv_id, doi, title_hash) in zip(records, keys):
+        paper = ((arxiv_id and by_arxiv.get(arxiv_id)) or (doi and by_doi.get(doi))
+                 or same_title(title_hash, arxiv_id, doi))
+        if paper is None:
+            paper = Paper(arxiv_id=arxiv_id, doi=doi, title_hash=title_hash, title=record['title'][:500],
+                          authors=record.get('authors'), venue=record.get('venue'), year=record.get('year'),
+                          paper_url=record.get('paper_url'), citation_count=record.get('citation_count') or 0,
+                          abstract=record.get('abstract'))
+            db.session.add(paper)
+        else:
+            # Fill in what this source knows and the stored paper does not, unless another paper owns it
+            if arxiv_id and not paper.arxiv_id and arxiv_id not in by_arxiv:
+                paper.arxiv_id = arxiv_id
+            if doi and not paper.doi and doi not in by_doi:
+                paper.doi = doi
+            # A venue naming a top conference replaces one that names none ('arXiv')
+            if record.get('venue') and classify_venue(record['venue']) and not classify_venue(paper.venue):
+                paper.venue = record['venue']
+            for field in ('authors', 'venue', 'year', 'paper_url', 'abstract'):
+                if record.get(field) and not getattr(paper, field):
+                    setattr(paper, field, record[field])
+            paper.citation_count = max(paper.citation_count or 0, record.get('citation_count') or 0)
+        remember(paper)
+        papers.append(paper)
+    db.session.flush()
+    return papers
+
+
+def resolve_papers(records):
+    """
+    The shared Paper for each record (a dict of Paper fields), in order, creating missing ones.
+    Matches by arXiv id, then DOI, then normalized title, in one IN query each per chunk; a
+    title match is skipped when that paper carries a different arXiv id or DOI. A matched
+    paper gains fields it lacked, and identifiers no other paper owns, and keeps the higher
+    citation count. Its venue is replaced only by one that names a top conference where
+    the stored one does not. Caller commits.
+    """
+    try:
+        with db.session.begin_nested():
+            return match_or_create_papers(records)
+    except IntegrityError:
+        # Another worker stored one of these papers first; match against its row
+        with db.session.begin_nested():
+            return match_or_create_papers(records)
+
+
+def linked_paper_ids(candidate_id, paper_ids):
+    """The papers among paper_ids that the candidate already has a publication for"""
+    linked = set()
+    for chunk in chunked({paper_id for paper_id in paper_ids if paper_id}):
+        linked.update(paper_id for (paper_id,) in db.session.query(Publication.paper_id).filter(
+            Publication.candidate_id == candidate_id,
+            Publication.paper_id.in_(chunk)
+        ))
+    return linked
+
+
+def stored_papers_by_title(titles):
+    """
+    Papers already ingested for any candidate, keyed by title hash. Usable from fetch
+    steps, which run on threads without an application context.
+    """
+    hashes = list({paper_title_hash(title) for title in titles if title})
+    with app.app_context():
+        found = {}
+        for chunk in chunked(hashes):
+            found.update((paper.title_hash, {field: getattr(paper, field) for field in
+                                             ('title', 'authors', 'venue', 'year', 'paper_url', 'citation_count')})
+                         for paper in Paper.query.filter(Paper.title_hash.in_(chunk)))
+        return found
+
+
+# ==================== VENUE CLASSIFICATION ====================
+
+def trie_regex(words):
+    """
+    One regex alternation over `words`, factored into a prefix trie so shared prefixes are
+    matched once instead of once per word. A space in a word matches any run of whitespace.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # A word ends here
+
+    def build(node):
+        branches = [(r'\s+' if char == ' ' else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+# Top AI/ML conferences for tracking: canonical name -> names a venue string may use for it
+VENUE_ALIASES = {
+    'NeurIPS': ['NeurIPS', 'NIPS', 'Neural Information Processing Systems'],
+    'ICML': ['ICML', 'International Conference on Machine Learning'],
+    'ICLR': ['ICLR', 'International Conference on Learning Representations'],
+    'CVPR': ['CVPR', 'Computer Vision and Pattern Recognition'],
+    'ICCV': ['ICCV', 'International Conference on Computer Vision'],
+    'ECCV': ['ECCV', 'European Conference on Computer Vision'],
+    'AAAI': ['AAAI'],
+    'IJCAI': ['IJCAI', 'International Joint Conference on Artificial Intelligence'],
+    'ACL': ['ACL', 'Annual Meeting of the Association for Computational Linguistics'],
+    'EMNLP': ['EMNLP', 'Empirical Methods in Natural Language Processing'],
+    'NAACL': ['NAACL', 'North American Chapter of the Association for Computational Linguistics'],
+    'KDD': ['KDD', 'SIGKDD', 'Knowledge Discovery and Data Mining'],
+    'SIGIR': ['SIGIR'],
+    'ICRA': ['ICRA', 'International Conference on Robotics and Automation'],
+    'IROS': ['IROS', 'Intelligent Robots and Systems'],
+    'RSS': ['RSS', 'Robotics: Science and Systems'],
+    'CoRL': ['CoRL', 'Conference on Robot Learning'],
+}
+
+VENUE_CANONICAL = {alias.lower(): venue for venue, aliases in VENUE_ALIASES.items() for alias in aliases}
+VENUE_PATTERN = re.compile(r'(?<!\w)(' + trie_regex(VENUE_CANONICAL) + r')(?!\w)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=4096)
+def classify_venue(venue):
+    """The top conference a venue string names (leftmost alias wins), or None"""
+    match = VENUE_PATTERN.search(venue) if venue else None
+    return VENUE_CANONICAL[' '.join(match.group(1).lower().split())] if match else None
+
+
+@event.listens_for(Paper, 'before_insert')
+@event.listens_for(Paper, 'before_update')
+@event.listens_for(Publication, 'before_insert')
+@event.listens_for(Publication, 'before_update')
+def _classify_venue(mapper, connection, target):
+    target.venue_class = classify_venue(target.venue)
+
+
+# ==================== SCHEMA MIGRATIONS ====================
+
+def table_columns(table_name):
+    """Column names of an existing table, or None if the table has not been created yet"""
+    inspector = db.inspect(db.session.connection())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def add_missing_column(table_name, column_name, column_type):
+    """ALTER TABLE ADD COLUMN for a column that an existing database predates"""
+    columns = table_columns(table_name)
+    if columns is None or column_name in columns:
+        return False
+    db.session.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}'))
+    return True
+
+
+def create_missing_indexes(indexes):
+    """CREATE INDEX IF NOT EXISTS for each (name, table, columns); tables created later get them from the models"""
+    for name, table_name, columns in indexes:
+        if table_columns(table_name) is not None:
+            db.session.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({", ".join(columns)})'))
+
+
+def migrate_candidate_source():
+    """Add candidate.source and attribute existing rows from import notes and landing-page applications"""
+    if add_missing_column('candidate', 'source', 'VARCHAR(100)'):
+        db.session.execute(text(
+            "UPDATE candidate SET source = 'boolean_search' WHERE notes LIKE '%Imported from Boolean search%'"
+        ))
+        db.session.execute(text(
+            "UPDATE candidate SET source = 'landing_page' WHERE source IS NULL AND id IN "
+            "(SELECT candidate_id FROM application WHERE source = 'landing_page')"
+        ))
+    create_missing_indexes([
+        ('ix_candidate_source', 'candidate', ['source']),
+        ('ix_application_source', 'application', ['source']),
+    ])
+
+
+def migrate_hot_column_indexes():
+    """Composite indexes for list filters, keyset pagination, dedup lookups and dashboard counts"""
+    create_missing_indexes([
+        ('ix_candidate_status_created', 'candidate', ['status', 'created_at', 'id']),
+        ('ix_candidate_created', 'candidate', ['created_at', 'id']),
+        ('ix_candidate_updated', 'candidate', ['updated_at', 'id']),
+        ('ix_candidate_primary_expertise', 'candidate', ['primary_expertise']),
+        ('ix_candidate_github_url', 'candidate', ['github_url']),
+        ('ix_job_status_created', 'job', ['status', 'created_at', 'id']),
+        ('ix_job_created', 'job', ['created_at', 'id']),
+        ('ix_application_candidate', 'application', ['candidate_id', 'created_at']),
+        ('ix_application_job_status', 'application', ['job_id', 'status']),
+        ('ix_application_status_created', 'application', ['status', 'created_at', 'id']),
+        ('ix_application_applied', 'application', ['applied_date']),
+        ('ix_publication_candidate_year', 'publication', ['candidate_id', 'year']),
+        ('ix_publication_candidate_arxiv', 'publication', ['candidate_id', 'arxiv_id']),
+        ('ix_publication_candidate_title', 'publication', ['candidate_id', 'title']),
+        ('ix_publication_arxiv_id', 'publication', ['arxiv_id']),
+        ('ix_interview_status_scheduled', 'interview', ['status', 'scheduled_at']),
+        ('ix_interview_candidate_created', 'interview', ['candidate_id', 'created_at']),
+        ('ix_interview_created', 'interview', ['created_at', 'id']),
+        ('ix_offer_status_created', 'offer', ['status', 'created_at', 'id']),
+        ('ix_offer_created', 'offer', ['created_at', 'id']),
+        ('ix_offer_candidate', 'offer', ['candidate_id']),
+    ])
+
+
+def migrate_saved_search_schedule():
+    """Scheduling columns for saved searches and the index the scheduler polls"""
+    add_missing_column('saved_search', 'execution_mode', "VARCHAR(20) DEFAULT 'on-demand'")
+    add_missing_column('saved_search', 'schedule', 'TEXT')
+    add_missing_column('saved_search', 'next_run_at', 'DATETIME' if db.engine.dialect.name == 'sqlite' else 'TIMESTAMP')
+    add_missing_column('saved_search', 'last_run_status', 'VARCHAR(50)')
+    add_missing_column('saved_search', 'last_delta_count', 'INTEGER DEFAULT 0')
+    create_missing_indexes([('ix_saved_search_due', 'saved_search', ['execution_mode', 'next_run_at'])])
+
+
+def migrate_arxiv_watermark():
+    """Per-candidate watermark for incremental arXiv ingestion"""
+    add_missing_column('candidate', 'arxiv_last_submitted',
+                       'DATETIME' if db.engine.dialect.name == 'sqlite' else 'TIMESTAMP')
+
+
+def migrate_shared_papers():
+    """Link publications to shared paper rows, creating one paper per distinct arXiv id, DOI or title"""
+    add_missing_column('publication', 'paper_id', 'INTEGER REFERENCES paper(id)')
+    create_missing_indexes([('ix_publication_paper_candidate', 'publication', ['paper_id', 'candidate_id'])])
+    # Columns rather than entities: later migrations may add publication columns the model already has
+    columns = [Publication.id] + [getattr(Publication, field) for field in PAPER_FIELDS]
+    while True:
+        rows = db.session.query(*columns).filter(Publication.paper_id.is_(None)).order_by(Publication.id).limit(500).all()
+        if not rows:
+            break
+        papers = resolve_papers([row._asdict() for row in rows])
+        db.session.execute(Publication.__table__.update().where(Publication.id == db.bindparam('b_id'))
+                           .values(paper_id=db.bindparam('paper_id')),
+                           [{'b_id': row.id, 'paper_id': paper.id} for row, paper in zip(rows, papers)])
+
+
+def migrate_venue_class():
+    """Classify existing publication venues, one UPDATE per distinct venue"""
+    add_missing_column('publication', 'venue_class', 'VARCHAR(50)')
+    create_missing_indexes([('ix_publication_venue_class', 'publication', ['venue_class', 'candidate_id'])])
+    venues = [row[0] for row in db.session.query(Publication.venue).filter(Publication.venue.isnot(None)).distinct()]
+    updates = [{'b_venue': venue, 'venue_class': classify_venue(venue)} for venue in venues if classify_venue(venue)]
+    if updates:
+        db.session.execute(Publication.__table__.update().where(Publication.venue == db.bindparam('b_venue'))
+                           .values(venue_class=db.bindparam('venue_class')), updates)
+
+
+def rebuild_sqlite_table(table):
+    """
+    Recreate an SQLite table from its model, keeping its rows. SQLite cannot drop a
+    constraint in place; the table's indexes are recreated from the model afterwards.
+    """
+    existing = table_columns(table.name)
+    rebuilt = table.to_metadata(db.MetaData(), name=f'{table.name}_rebuild')
+    rebuilt.indexes.clear()
+    connection = db.session.connection()
+    rebuilt.create(connection)
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+    db.session.execute(text(f'INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {table.name}'))
+    db.session.execute(text(f'DROP TABLE {table.name}'))
+    db.session.execute(text(f'ALTER TABLE {rebuilt.name} RENAME TO {table.name}'))
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def migrate_paper_title_not_unique():
+    """Different papers can share a normalized title: drop the unique constraint on paper.title_hash"""
+    if table_columns('paper') is None:
+        return
+    constraints = [constraint for constraint in db.inspect(db.session.connection()).get_unique_constraints('paper')
+                   if constraint['column_names'] == ['title_hash']]
+    if constraints and db.engine.dialect.name == 'postgresql':
+        for constraint in constraints:
+            db.session.execute(text(f'ALTER TABLE paper DROP CONSTRAINT IF EXISTS {constraint["name"]}'))
+    elif constraints:
+        rebuild_sqlite_table(Paper.__table__)
+    create_missing_indexes([('ix_paper_title_hash', 'paper', ['title_hash'])])
+
+
+def migrate_paper_venue_class():
+    """
+    Classify shared paper venues. A paper whose venue names no top conference takes the
+    venue of its first publication that does, as ingestion now does.
+    """
+    add_missing_column('paper', 'venue_class', 'VARCHAR(50)')
+    create_missing_indexes([('ix_paper_venue_class', 'paper', ['venue_class', 'citation_count'])])
+    first_classified = db.session.query(
+        Publication.paper_id, func.min(Publication.id).label('publication_id')
+    ).filter(Publication.paper_id.isnot(None), Publication.venue_class.isnot(None)).group_by(
+        Publication.paper_id
+    ).subquery()
+    promoted = [{'b_id': paper_id, 'venue': venue} for paper_id, paper_venue, venue in db.session.query(
+        Paper.id, Paper.venue, Publication.venue
+    ).join(first_classified, first_classified.c.paper_id == Paper.id).join(
+        Publication, Publication.id == first_classified.c.publication_id
+    ) if not classify_venue(paper_venue)]
+    if promoted:
+        db.session.execute(Paper.__table__.update().where(Paper.id == db.bindparam('b_id'))
+                           .values(venue=db.bindparam('venue')), promoted)
+    venues = [row[0] for row in db.session.query(Paper.venue).filter(Paper.venue.isnot(None)).distinct()]
+    updates = [{'b_venue': venue, 'venue_class': classify_venue(venue)} for venue in venues if classify_venue(venue)]
+    if updates:
+        db.session.execute(Paper.__table__.update().where(Paper.venue == db.bindparam('b_venue'))
+                           .values(venue_class=db.bindparam('venue_class')), updates)
+
+
+class MigrationSkipped(Exception):
+    """Raised by a step that cannot run in this environment yet; it is retried on the next upgrade"""
+
+
+# Full-text index definitions: table -> (columns in descending importance, bm25 weights).
+# SQLite uses an FTS5 external-content table kept in sync by triggers; Postgres a generated
+# tsvector column weighted A, B, C in the same order.
+FULL_TEXT_INDEXES = {
+    'candidate': (['skills', 'bio', 'notes'], [2.0, 1.0, 0.5]),
+    'publication': (['title', 'keywords', 'abstract'], [3.0, 2.0, 1.0]),
+}
+POSTGRES_TEXT_WEIGHTS = ['A', 'B', 'C', 'D']
+
+
+def sqlite_has_fts5():
+    return bool(db.session.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def create_sqlite_full_text_index(table, columns):
+    fts = f'{table}_fts'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    created = not db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+    ).scalar()
+
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='id', tokenize='porter unicode61')"
+    ))
+    db.session.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    ))
+    db.session.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+    ))
+    db.session.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    ))
+    if created:
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def create_postgres_full_text_index(table, columns):
+    vector = ' || '.join(
+        f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(columns, POSTGRES_TEXT_WEIGHTS)
+    )
+    db.session.execute(text(
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED"
+    ))
+    db.session.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+    ))
+
+
+def migrate_full_text_search():
+    """Full-text indexes over candidate bio/notes/skills and publication title/abstract/keywords"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite' and not sqlite_has_fts5():
+        raise MigrationSkipped("SQLite was built without FTS5; /api/search is unavailable")
+    for table, (columns, _) in FULL_TEXT_INDEXES.items():
+        if dialect == 'postgresql':
+            create_postgres_full_text_index(table, columns)
+        else:
+            create_sqlite_full_text_index(table, columns)
+
+
+# Append-only: never edit or renumber a released migration, add a new version instead.
+# Every step must be idempotent, since a fresh database already has the model's schema.
+MIGRATIONS = [
+    (1, 'candidate_source', migrate_candidate_source),
+    (2, 'hot_column_indexes', migrate_hot_column_indexes),
+    (3, 'full_text_search', migrate_full_text_search),
+    (4, 'saved_search_schedule', migrate_saved_search_schedule),
+    (5, 'arxiv_watermark', migrate_arxiv_watermark),
+    (6, 'shared_papers', migrate_shared_papers),
+    (7, 'venue_class', migrate_venue_class),
+    (8, 'paper_title_not_unique', migrate_paper_title_not_unique),
+    (9, 'paper_venue_class', migrate_paper_venue_class),
+]
+
+
+def run_migrations():
+    """Apply pending MIGRATIONS in version order, one transaction per version"""
+    applied = {row.version for row in SchemaMigration.query}
+    db.session.commit()
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            begin_write()
+            migrate()
+            db.session.add(SchemaMigration(version=version, name=name))
+            db.session.commit()
+        except IntegrityError:
+            # Another process applied this version first
+            db.session.rollback()
+        except MigrationSkipped as e:
+            db.session.rollback()
+            print(f"Migration {version} ({name}) skipped: {e}")
+
+
+@app.cli.command('migrations')
+def migrations_command():
+    """List schema migrations and whether each is applied"""
+    applied = {row.version: row for row in SchemaMigration.query}
+    for version, name, _ in MIGRATIONS:
+        row = applied.get(version)
+        state = f"applied {row.applied_at.isoformat()}" if row else "pending"
+        print(f"{version:>4}  {name:<30} {state}")
+
+
+# Endpoint queries that must be served by an index. Each builds the same query the
+# endpoint issues; tests/test_query_plans.py fails if any plan falls back to a table scan,
+# and 'flask check-query-plans' runs the same checks against a deployed database.
+QUERY_PLAN_CHECKS = [
+    ('candidates by status (keyset page)', lambda: Candidate.query.filter(Candidate.status == 'new')
+        .order_by(Candidate.created_at.desc(), Candidate.id.desc()).limit(DEFAULT_PAGE_SIZE)),
+    ('candidates (keyset page)', lambda: Candidate.query
+        .order_by(Candidate.created_at.desc(), Candidate.id.desc()).limit(DEFAULT_PAGE_SIZE)),
+    ('candidate export watermark', lambda: Candidate.query.filter(Candidate.updated_at > datetime(2000, 1, 1))
+        .order_by(Candidate.updated_at, Candidate.id)),
+    ('candidate import dedup by GitHub URL', lambda: db.session.query(Candidate.github_url)
+        .filter(Candidate.github_url.in_(['https://github.com/a', 'https://github.com/b']))),
+    ('expertise counts', lambda: db.session.query(Candidate.primary_expertise, func.count())
+        .group_by(Candidate.primary_expertise)),
+    ('source conversion', lambda: db.session.query(Candidate.source, func.count())
+        .group_by(Candidate.source)),
+    ('jobs by status', lambda: Job.query.filter(Job.status == 'open')
+        .order_by(Job.created_at.desc(), Job.id.desc()).limit(DEFAULT_PAGE_SIZE)),
+    ('applications for candidate', lambda: Application.query.filter_by(candidate_id=1)),
+    ('applications for job', lambda: Application.query.filter_by(job_id=1)),
+    ('publications for candidate', lambda: Publication.query.filter_by(candidate_id=1)
+        .order_by(Publication.year.desc())),
+    ('arXiv dedup', lambda: db.session.query(Publication.arxiv_id).filter(
+        Publication.candidate_id == 1, Publication.arxiv_id.in_(['2101.00001', '2101.00002']))),
+    ('Scholar dedup', lambda: db.session.query(Publication.title).filter_by(candidate_id=1)),
+    ('conference papers for candidate', lambda: db.session.query(func.count(Publication.venue_class))
+        .filter(Publication.candidate_id == 1)),
+    ('paper by arXiv id', lambda: Paper.query.filter(Paper.arxiv_id.in_(['2101.00001']))),
+    ('paper by title', lambda: Paper.query.filter(Paper.title_hash.in_(['0' * 40]))),
+    ('papers already linked', lambda: db.session.query(Publication.paper_id).filter(
+        Publication.candidate_id == 1, Publication.paper_id.in_([1, 2]))),
+    ('top conference papers', lambda: db.session.query(Paper.id).filter(
+        Paper.venue_class.isnot(None), db.session.query(Publication.id).filter(Publication.paper_id == Paper.id).exists()
+    ).order_by(Paper.citation_count.desc(), Paper.id).limit(50)),
+    ('authors of papers', lambda: db.session.query(Publication.paper_id, Candidate.id).join(
+        Candidate, Candidate.id == Publication.candidate_id).filter(Publication.paper_id.in_([1, 2]))),
+    ('upcoming interviews', lambda: db.session.query(func.count(Interview.id))
+        .filter(Interview.status == 'scheduled', Interview.scheduled_at > datetime(2000, 1, 1))),
+    ('interviews for candidate', lambda: Interview.query.filter_by(candidate_id=1)),
+    ('offers by status', lambda: Offer.query.filter(Offer.status == 'sent')
+        .order_by(Offer.created_at.desc(), Offer.id.desc()).limit(DEFAULT_PAGE_SIZE)),
+    ('due saved searches', lambda: SavedSearch.query.filter(SavedSearch.execution_mode == 'auto-run',
+                                                            SavedSearch.next_run_at <= datetime(2000, 1, 1))
+        .order_by(SavedSearch.next_run_at).limit(5)),
+    ('saved search delta', lambda: SavedSearchResult.query.filter(SavedSearchResult.saved_search_id == 1,
+                                                                  SavedSearchResult.last_changed_at >= datetime(2000, 1, 1))),
+]
+
+SQLITE_TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+POSTGRES_TABLE_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain_query(query):
+    """Plan lines for an ORM query, asking the database to avoid sequential scans where it can"""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.params
+    if compiled.positiontup is not None:
+        params = tuple(str(params[name]) if isinstance(params[name], datetime) else params[name]
+                       for name in compiled.positiontup)
+    connection = db.session.connection()
+    if db.engine.dialect.name == 'postgresql':
+        # Small tables are cheaper to scan; disabling seq scans shows whether an index is usable at all
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        return [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {compiled}', params)]
+    return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params)]
+
+
+def full_scans(plan):
+    pattern = POSTGRES_TABLE_SCAN if db.engine.dialect.name == 'postgresql' else SQLITE_TABLE_SCAN
+    return [match.group(1) for match in map(pattern.search, plan) if match]
+
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """EXPLAIN the hot endpoint queries and exit non-zero if any scans a whole table"""
+    failures = 0
+    for name, build in QUERY_PLAN_CHECKS:
+        plan = explain_query(build())
+        scanned = full_scans(plan)
+        print(f"{'FAIL' if scanned else 'ok  '}  {name}")
+        if scanned:
+            failures += 1
+            for line in plan:
+                print(f"        {line}")
+    db.session.rollback()
+    if failures:
+        print(f"{failures} of {len(QUERY_PLAN_CHECKS)} queries fall back to a full table scan")
+        raise SystemExit(1)
+
+
+# ==================== CANDIDATE SKILL INDEX ====================
+
+EXPERTISE_TOKEN_PATTERN = re.compile(r'[a-z0-9+#]+')
+
+
+def normalize_skill_tokens(text):
+    """Split a comma-separated skills string into normalized (lowercase, trimmed) tokens"""
+    if not text:
+        return set()
+    return {token.strip().lower() for token in text.split(',') if token.strip()}
+
+
+def normalize_expertise_tokens(text):
+    """Split an expertise phrase into lowercase word tokens"""
+    if not text:
+        return set()
+    return set(EXPERTISE_TOKEN_PATTERN.findall(text.lower()))
+
+
+def candidate_index_tokens(candidate):
+    """All (token, kind) postings for a candidate"""
+    postings = {(token[:200], 'skill') for token in normalize_skill_tokens(candidate.skills)}
+    postings.update((token[:200], 'expertise') for token in normalize_expertise_tokens(candidate.primary_expertise))
+    return postings
+
+
+def reindex_candidate_tokens(candidate):
+    """Replace a candidate's postings with tokens from its current skills and expertise (caller commits)"""
+    if candidate.id is None:
+        db.session.flush()
+    CandidateToken.query.filter(
+        CandidateToken.candidate_id == candidate.id,
+        CandidateToken.kind.in_(['skill', 'expertise'])
+    ).delete(synchronize_session=False)
+    rows = [{'token': token, 'kind': kind, 'candidate_id': candidate.id}
+            for token, kind in candidate_index_tokens(candidate)]
+    if rows:
+        db.session.execute(CandidateToken.__table__.insert(), rows)
+
+
+def rebuild_candidate_index():
+    """Rebuild every posting list from the candidate table"""
+    CandidateToken.query.delete(synchronize_session=False)
+    batch = []
+    query = db.session.query(Candidate.id, Candidate.skills, Candidate.primary_expertise)
+    for candidate in query.yield_per(5000):
+        batch.extend({'token': token, 'kind': kind, 'candidate_id': candidate.id}
+                     for token, kind in candidate_index_tokens(candidate))
+        if len(batch) >= 5000:
+            db.session.execute(CandidateToken.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(CandidateToken.__table__.insert(), batch)
+    rebuild_candidate_terms()
+    db.session.commit()
+
+
+# Free-text fields whose words are indexed as 'term' postings for the local boolean engine.
+# A candidate's postings also cover the text of their publications.
+CANDIDATE_TERM_FIELDS = ('primary_expertise', 'skills', 'bio', 'notes', 'company', 'location')
+PUBLICATION_TERM_FIELDS = ('title', 'keywords', 'abstract', 'venue')
+
+
+def text_terms(*texts):
+    """Lowercase word tokens across several text fields"""
+    terms = set()
+    for value in texts:
+        if value:
+            terms.update(token[:200] for token in EXPERTISE_TOKEN_PATTERN.findall(value.lower()))
+    return terms
+
+
+def candidate_term_texts(candidate_ids, session):
+    """Map candidate id -> list of indexed text fields, including their publications'"""
+    texts = {}
+    candidate_columns = [getattr(Candidate, field) for field in CANDIDATE_TERM_FIELDS]
+    for row in session.query(Candidate.id, *candidate_columns).filter(Candidate.id.in_(candidate_ids)):
+        texts[row[0]] = list(row[1:])
+    publication_columns = [getattr(Publication, field) for field in PUBLICATION_TERM_FIELDS]
+    for row in session.query(Publication.candidate_id, *publication_columns).filter(
+            Publication.candidate_id.in_(list(texts))):
+        texts[row[0]].extend(row[1:])
+    return texts
+
+
+def reindex_candidate_terms(candidate_ids, session=None):
+    """Replace 'term' postings for these candidates (caller commits)"""
+    session = session or db.session
+    candidate_ids = sorted(candidate_ids)
+    for start in range(0, len(candidate_ids), 500):
+        chunk = candidate_ids[start:start + 500]
+        session.execute(CandidateToken.__table__.delete().where(
+            CandidateToken.candidate_id.in_(chunk),
+            CandidateToken.kind == 'term'
+        ))
+        rows = [{'token': token, 'kind': 'term', 'candidate_id': candidate_id}
+                for candidate_id, texts in candidate_term_texts(chunk, session).items()
+                for token in text_terms(*texts)]
+        if rows:
+            session.execute(CandidateToken.__table__.insert(), rows)
+
+
+def rebuild_candidate_terms():
+    """Rebuild every 'term' posting list (caller commits)"""
+    CandidateToken.query.filter_by(kind='term').delete(synchronize_session=False)
+    candidate_ids = [row[0] for row in db.session.query(Candidate.id)]
+    reindex_candidate_terms(candidate_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_term_changes(session, flush_context):
+    changed = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Publication):
+            changed.add(obj.candidate_id)
+        elif isinstance(obj, Candidate) and obj not in session.deleted:
+            state = db.inspect(obj)
+            if obj in session.new or any(state.attrs[field].history.has_changes() for field in CANDIDATE_TERM_FIELDS):
+                changed.add(obj.id)
+    if changed:
+        session.info.setdefault('term_index_changes', set()).update(changed)
+
+
+@event.listens_for(Session, 'before_commit')
+def _reindex_changed_terms(session):
+    # Keep 'term' postings in the same transaction as the text that produced them. Commit
+    # flushes only after this hook, so flush here to see pending changes.
+    session.flush()
+    while session.info.get('term_index_changes'):
+        reindex_candidate_terms(session.info.pop('term_index_changes'), session)
+        session.flush()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_term_changes(session):
+    session.info.pop('term_index_changes', None)
+
+
+def candidates_with_all_tokens(kind, tokens):
+    """Query of candidate ids whose posting lists contain every token (posting-list intersection)"""
+    return db.session.query(CandidateToken.candidate_id).filter(
+        CandidateToken.kind == kind,
+        CandidateToken.token.in_(tokens)
+    ).group_by(CandidateToken.candidate_id).having(func.count(CandidateToken.token) == len(tokens))
+
+
+def skill_overlap_counts(skills):
+    """Map candidate id -> how many of the given skills appear in their posting lists"""
+    if not skills:
+        return {}
+    rows = db.session.query(CandidateToken.candidate_id, func.count(CandidateToken.token)).filter(
+        CandidateToken.kind == 'skill',
+        CandidateToken.token.in_(skills)
+    ).group_by(CandidateToken.candidate_id).all()
+    return dict(rows)
+
+
+@app.cli.command('rebuild-candidate-index')
+def rebuild_candidate_index_command():
+    """Rebuild the skill/expertise inverted index"""
+    rebuild_candidate_index()
+    print(f"Indexed {CandidateToken.query.count()} postings")
+
+
+def backfill_candidate_index():
+    """Build the index for databases created before it (or its 'term' postings) existed"""
+    if Candidate.query.first():
+        if not db.session.query(CandidateToken.query.exists()).scalar():
+            rebuild_candidate_index()
+        elif not db.session.query(CandidateToken.query.filter_by(kind='term').exists()).scalar():
+            rebuild_candidate_terms()
+            db.session.commit()
+
+
+# ==================== LIST PAGINATION ====================
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, row_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def serialize_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def list_response(query, model, collection, serialize, order_by, hidden_columns=(), mask=None, options=()):
+    """
+    Build a list endpoint response.
+
+    - Pages use keyset pagination on (created_at, id), newest first: DEFAULT_PAGE_SIZE
+      rows unless ?limit= says otherwise, continued with ?cursor=, with next_cursor and
+      has_more in the response. ?all=1 returns the full list instead, in the endpoint's
+      usual `order_by` order, for clients written before paging.
+    - ?fields=a,b,c loads only those columns and returns plain column values.
+      `hidden_columns` are loaded for `mask(item, row)` but not returned.
+
+    `serialize` turns a list of model instances into a list of dicts; `options` are
+    loader options for the full (non-projected) query.
+    """
+    columns = model.__table__.columns
+    fields = None
+    if request.args.get('fields'):
+        fields = [name.strip() for name in request.args['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in columns]
+        if unknown:
+            return jsonify({
+                "error": f"Unknown fields: {', '.join(unknown)}",
+                "allowed_fields": list(columns.keys())
+            }), 400
+
+    paginate = request.args.get('all') not in ('1', 'true')
+    if paginate:
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        if request.args.get('cursor'):
+            try:
+                created_at, row_id = decode_cursor(request.args['cursor'])
+            except (ValueError, UnicodeDecodeError):
+                return jsonify({"error": "Invalid cursor"}), 400
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            ))
+        query = query.limit(limit + 1)
+    else:
+        query = query.order_by(order_by)
+
+    if fields:
+        loaded = list(dict.fromkeys(fields + ['id', 'created_at'] + list(hidden_columns)))
+        rows = query.with_entities(*[columns[name] for name in loaded]).all()
+    else:
+        rows = query.options(*options).all()
+
+    has_more = paginate and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+
+    if fields:
+        items = []
+        for row in rows:
+            item = {name: serialize_value(getattr(row, name)) for name in fields}
+            if mask:
+                mask(item, row)
+            items.append(item)
+    else:
+        items = serialize(rows)
+
+    if not paginate:
+        return jsonify({collection: items, "total": len(items)})
+
+    return jsonify({
+        collection: items,
+        "count": len(items),
+        "has_more": has_more,
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    })
+
+
+# ==================== BATCHED SERIALIZATION ====================
+
+def count_by(column, ids):
+    """Map id -> number of rows referencing it, one GROUP BY per chunk of ids"""
+    counts = {}
+    for chunk in chunked(ids):
+        counts.update(db.session.query(column, func.count()).filter(column.in_(chunk)).group_by(column).all())
+    return counts
+
+
+def serialize_candidates(candidates):
+    """Serialize candidates with application/publication counts from two aggregate queries"""
+    ids = [c.id for c in candidates]
+    application_counts = count_by(Application.candidate_id, ids)
+    publication_counts = count_by(Publication.candidate_id, ids)
+    return [
+        c.to_dict(application_count=application_counts.get(c.id, 0),
+                  publication_count=publication_counts.get(c.id, 0))
+        for c in candidates
+    ]
+
+
+def serialize_jobs(jobs, show_company=False):
+    """Serialize jobs with application counts from one aggregate query"""
+    application_counts = count_by(Application.job_id, [j.id for j in jobs])
+    return [j.to_dict(show_company=show_company, application_count=application_counts.get(j.id, 0)) for j in jobs]
+
+
+def candidate_and_job_options(model):
+    """Loader options that fetch the candidate name and job title shown by to_dict() in the same query"""
+    return (
+        joinedload(model.candidate).load_only(Candidate.first_name, Candidate.last_name),
+        joinedload(model.job).load_only(Job.title)
+    )
 
 
 # ==================== API ENDPOINTS ====================
@@ -321,35 +1646,61 @@ def health_check():
 
 # ==================== CANDIDATES ====================
 
-@app.route('/api/candidates', methods=['GET'])
-def get_candidates():
-    """Get all candidates with optional filtering"""
-    status = request.args.get('status')
-    expertise = request.args.get('expertise')
-
-    query = Candidate.query
-
+def filter_candidates(query, status=None, expertise=None, skills=None):
+    """Apply the candidate list filters; expertise and skills intersect posting lists"""
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Candidate.status == status)
     if expertise:
-        query = query.filter(Candidate.primary_expertise.contains(expertise))
+        tokens = normalize_expertise_tokens(expertise)
+        query = query.filter(Candidate.id.in_(candidates_with_all_tokens('expertise', tokens)))
+    if skills:
+        tokens = normalize_skill_tokens(skills)
+        query = query.filter(Candidate.id.in_(candidates_with_all_tokens('skill', tokens)))
+    return query
+
+
+def resolve_candidate_selection(data):
+    """
+    The candidate ids a bulk request body selects, by "candidate_ids" or "filter", as
+    (ids, None), or (None, error response) when the body selects nothing valid.
+    """
+    if data.get('candidate_ids'):
+        try:
+            if not isinstance(data['candidate_ids'], list):
+                raise TypeError
+            return sorted({int(cid) for cid in data['candidate_ids']}), None
+        except (TypeError, ValueError):
+            return None, (jsonify({"error": "candidate_ids must be a list of integers"}), 400)
+    if 'filter' in data:
+        criteria = data['filter'] or {}
+        if not isinstance(criteria, dict):
+            return None, (jsonify({"error": "filter must be an object"}), 400)
+        query = filter_candidates(db.session.query(Candidate.id), criteria.get('status'),
+                                  criteria.get('expertise'), criteria.get('skills'))
+        return [row[0] for row in query.order_by(Candidate.id)], None
+    return None, (jsonify({"error": "Provide candidate_ids or filter"}), 400)
 
-    candidates = query.order_by(Candidate.created_at.desc()).all()
-    return jsonify({
-        "candidates": [c.to_dict() for c in candidates],
-        "total": len(candidates)
-    })
+
+@app.route('/api/candidates', methods=['GET'])
+def get_candidates():
+    """Get candidates with optional filtering, pagination and field projection"""
+    query = filter_candidates(Candidate.query, request.args.get('status'),
+                              request.args.get('expertise'), request.args.get('skills'))
+    return list_response(query, Candidate, 'candidates', serialize_candidates, Candidate.created_at.desc())
 
 
 @app.route('/api/candidates/<int:candidate_id>', methods=['GET'])
 def get_candidate(candidate_id):
     """Get single candidate with full details"""
     candidate = Candidate.query.get_or_404(candidate_id)
-    data = candidate.to_dict()
+    applications = Application.query.filter_by(candidate_id=candidate_id).options(
+        *candidate_and_job_options(Application)).all()
+    publications = candidate.publications
+    data = candidate.to_dict(application_count=len(applications), publication_count=len(publications))
 
     # Include applications and publications
-    data['applications'] = [app.to_dict() for app in candidate.applications]
-    data['publications'] = [pub.to_dict() for pub in candidate.publications]
+    data['applications'] = [app.to_dict() for app in applications]
+    data['publications'] = [pub.to_dict() for pub in publications]
 
     return jsonify(data)
 
@@ -377,6 +1728,8 @@ def create_candidate():
         github_url=data.get('github_url'),
         portfolio_url=data.get('portfolio_url'),
         resume_url=data.get('resume_url'),
+        company=data.get('company'),
+        bio=data.get('bio'),
         google_scholar_url=data.get('google_scholar_url'),
         research_gate_url=data.get('research_gate_url'),
         arxiv_author_id=data.get('arxiv_author_id'),
@@ -388,10 +1741,13 @@ def create_candidate():
         years_experience=data.get('years_experience'),
         status=data.get('status', 'new'),
         rating=data.get('rating'),
-        notes=data.get('notes')
+        notes=data.get('notes'),
+        source=data.get('source') or 'manual'
     )
 
     db.session.add(candidate)
+    reindex_candidate_tokens(candidate)
+    record_status_transition('candidate', candidate, None)
     db.session.commit()
 
     return jsonify(candidate.to_dict()), 201
@@ -402,16 +1758,19 @@ def update_candidate(candidate_id):
     """Update candidate"""
     candidate = Candidate.query.get_or_404(candidate_id)
     data = request.get_json()
+    previous_status = candidate.status
 
     # Update all fields that are present in the request
     for field in ['first_name', 'last_name', 'email', 'phone', 'location',
-                  'linkedin_url', 'github_url', 'portfolio_url', 'resume_url',
+                  'linkedin_url', 'github_url', 'portfolio_url', 'resume_url', 'company', 'bio',
                   'google_scholar_url', 'research_gate_url', 'arxiv_author_id', 'orcid_id',
                   'h_index', 'citation_count', 'primary_expertise', 'skills',
-                  'years_experience', 'status', 'rating', 'notes']:
+                  'years_experience', 'status', 'rating', 'notes', 'source']:
         if field in data:
             setattr(candidate, field, data[field])
 
+    reindex_candidate_tokens(candidate)
+    record_status_transition('candidate', candidate, previous_status)
     db.session.commit()
     return jsonify(candidate.to_dict())
 
@@ -420,345 +1779,981 @@ def update_candidate(candidate_id):
 def delete_candidate(candidate_id):
     """Delete candidate"""
     candidate = Candidate.query.get_or_404(candidate_id)
+    CandidateToken.query.filter_by(candidate_id=candidate.id).delete(synchronize_session=False)
+    EnrichmentTask.query.filter_by(candidate_id=candidate.id).delete(synchronize_session=False)
     db.session.delete(candidate)
     db.session.commit()
     return jsonify({"message": "Candidate deleted successfully"})
 
 
+# ==================== CANDIDATE EXPORT ====================
+
+EXPORT_BATCH_SIZE = 1000
+
+
+@app.route('/api/candidates/export', methods=['GET'])
+def stream_candidate_export():
+    """
+    Stream candidates as NDJSON (default) or CSV for warehouse syncs.
+
+    ?updated_since=<ISO timestamp> exports only rows changed after that watermark; the
+    X-Export-Watermark response header is the value to pass on the next run.
+    ?fields=a,b,c limits the exported columns.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    columns = Candidate.__table__.columns
+    fields = list(columns.keys())
+    if request.args.get('fields'):
+        fields = [name.strip() for name in request.args['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in columns]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}", "allowed_fields": list(columns.keys())}), 400
+
+    # Fix the upper bound now so rows changed during the export are picked up next time
+    watermark = db.session.query(func.max(Candidate.updated_at)).scalar()
+    query = db.session.query(*[columns[name] for name in fields])
+    if watermark:
+        query = query.filter(Candidate.updated_at <= watermark)
+    if request.args.get('updated_since'):
+        try:
+            updated_since = datetime.fromisoformat(request.args['updated_since'])
+        except ValueError:
+            return jsonify({"error": "updated_since must be an ISO timestamp"}), 400
+        query = query.filter(Candidate.updated_at > updated_since)
+    query = query.order_by(Candidate.updated_at, Candidate.id).yield_per(EXPORT_BATCH_SIZE)
+
+    def generate_ndjson():
+        lines = []
+        for row in query:
+            lines.append(json.dumps({name: serialize_value(value) for name, value in zip(fields, row)}))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for count, row in enumerate(query, 1):
+            writer.writerow([serialize_value(value) for value in row])
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    if export_format == 'csv':
+        response = Response(stream_with_context(generate_csv()), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=candidates.csv'
+    else:
+        response = Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    response.headers['X-Export-Watermark'] = watermark.isoformat() if watermark else ''
+    return response
+
+
 # ==================== CANDIDATE ENRICHMENT APIs ====================
 
-@app.route('/api/candidates/<int:candidate_id>/enrich/github', methods=['POST'])
-def enrich_from_github(candidate_id):
-    """Auto-enrich candidate profile from GitHub API"""
-    candidate = Candidate.query.get_or_404(candidate_id)
+# Each source is split into a fetch step (network only, safe to run off the request
+# thread) and an apply step (updates the candidate in the current session, caller commits).
+
+class EnrichmentError(Exception):
+    """
+    An enrichment source could not be used; carries the HTTP status to report.
+    Background tasks retry it when `retryable`, which defaults to a 429 or 5xx status.
+    """
+
+    def __init__(self, message, status_code=500, retryable=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self._retryable = retryable
+
+    @property
+    def retryable(self):
+        if self._retryable is not None:
+            return self._retryable
+        return self.status_code == 429 or self.status_code >= 500
+
+
+def transient_error(e):
+    """Whether a failed fetch is worth retrying: a network failure or an upstream 429/5xx, not a bug"""
+    status = getattr(e, 'status', None) or getattr(getattr(e, 'response', None), 'status_code', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(e, (requests.RequestException, ConnectionError, TimeoutError))
+
+
+def enrichment_identity(candidate):
+    """The candidate fields the fetch steps need, as a plain dict"""
+    return {
+        'id': candidate.id,
+        'first_name': candidate.first_name,
+        'last_name': candidate.last_name,
+        'github_url': candidate.github_url,
+        'orcid_id': candidate.orcid_id,
+        'arxiv_author_id': candidate.arxiv_author_id,
+        'arxiv_last_submitted': candidate.arxiv_last_submitted,
+        'google_scholar_url': candidate.google_scholar_url
+    }
 
-    if not candidate.github_url:
-        return jsonify({"error": "No GitHub URL provided for this candidate"}), 400
 
-    try:
-        # Extract username from GitHub URL
-        # Handles: https://github.com/username or github.com/username
-        username = candidate.github_url.rstrip('/').split('/')[-1]
+def fetch_github_enrichment(identity):
+    """Fetch a GitHub profile and its top languages"""
+    if not identity['github_url']:
+        raise EnrichmentError("No GitHub URL provided for this candidate", 400)
 
-        # Fetch from GitHub API
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'ATS-Recruiter'
-        }
+    # Extract username from GitHub URL
+    # Handles: https://github.com/username or github.com/username
+    username = identity['github_url'].rstrip('/').split('/')[-1]
 
-        # Add GitHub token if available for higher rate limits
-        github_token = os.environ.get('GITHUB_TOKEN')
-        if github_token:
-            headers['Authorization'] = f'token {github_token}'
+    try:
+        # Fetch from GitHub API
+        headers = github_client.headers()
+        response = github_client.get(f'{GITHUB_API_URL}/users/{username}', headers=headers, timeout=10,
+                                     ttl=HTTP_CACHE_TTLS['github_user'])
+    except GitHubRateLimited as e:
+        raise EnrichmentError(str(e), 429)
+    except Exception as e:
+        raise EnrichmentError(f"Failed to enrich from GitHub: {str(e)}", retryable=transient_error(e))
+
+    if response.status_code == 404:
+        raise EnrichmentError(f"GitHub user '{username}' not found", 404)
+    elif response.status_code in (403, 429):
+        raise EnrichmentError("GitHub API rate limit exceeded. Add tokens to GITHUB_TOKENS for a larger budget.", 429)
+    elif response.status_code != 200:
+        raise EnrichmentError(f"GitHub API error: {response.status_code}", retryable=response.status_code >= 500)
+
+    return {
+        'username': username,
+        'profile': response.json(),
+        # Fetch top programming languages from repos
+        'languages': get_user_languages(username, headers)
+    }
 
-        response = requests.get(f'https://api.github.com/users/{username}', headers=headers, timeout=10)
 
-        if response.status_code == 200:
-            data = response.json()
-
-            # Update candidate with GitHub data
-            candidate.github_followers = data.get('followers', 0)
-            candidate.github_repos = data.get('public_repos', 0)
-            candidate.bio = data.get('bio') or candidate.bio  # Keep existing if GitHub has none
-            candidate.location = data.get('location') or candidate.location
-            candidate.company = data.get('company') or candidate.company
-
-            # Fetch top programming languages from repos
-            languages = get_user_languages(username, headers)
-            if languages:
-                # Store as comma-separated string in skills field
-                existing_skills = candidate.skills or ''
-                new_skills = ', '.join(languages)
-                if existing_skills:
-                    candidate.skills = f"{existing_skills}, {new_skills}"
-                else:
-                    candidate.skills = new_skills
+def apply_github_enrichment(candidate, payload):
+    data = payload['profile']
+    languages = payload['languages']
 
-            db.session.commit()
+    # Update candidate with GitHub data
+    candidate.github_followers = data.get('followers', 0)
+    candidate.github_repos = data.get('public_repos', 0)
+    candidate.bio = data.get('bio') or candidate.bio  # Keep existing if GitHub has none
+    candidate.location = data.get('location') or candidate.location
+    candidate.company = data.get('company') or candidate.company
 
-            return jsonify({
-                "success": True,
-                "message": f"Enriched profile from GitHub user: {username}",
-                "data": {
-                    "followers": candidate.github_followers,
-                    "repos": candidate.github_repos,
-                    "languages": languages,
-                    "bio": candidate.bio,
-                    "location": candidate.location,
-                    "company": candidate.company
-                }
-            })
-        elif response.status_code == 404:
-            return jsonify({"error": f"GitHub user '{username}' not found"}), 404
-        elif response.status_code == 403:
-            return jsonify({"error": "GitHub API rate limit exceeded. Add GITHUB_TOKEN to environment variables."}), 429
+    if languages:
+        # Store as comma-separated string in skills field
+        existing_skills = candidate.skills or ''
+        new_skills = ', '.join(languages)
+        if existing_skills:
+            candidate.skills = f"{existing_skills}, {new_skills}"
         else:
-            return jsonify({"error": f"GitHub API error: {response.status_code}"}), 500
+            candidate.skills = new_skills
 
-    except Exception as e:
-        return jsonify({"error": f"Failed to enrich from GitHub: {str(e)}"}), 500
+    reindex_candidate_tokens(candidate)
 
+    return {
+        "success": True,
+        "message": f"Enriched profile from GitHub user: {payload['username']}",
+        "data": {
+            "followers": candidate.github_followers,
+            "repos": candidate.github_repos,
+            "languages": languages,
+            "bio": candidate.bio,
+            "location": candidate.location,
+            "company": candidate.company
+        }
+    }
 
-@app.route('/api/candidates/<int:candidate_id>/enrich/arxiv', methods=['POST'])
-def enrich_from_arxiv(candidate_id):
-    """Auto-fetch publications from arXiv API"""
-    candidate = Candidate.query.get_or_404(candidate_id)
 
+# arXiv asks clients for at most one request every 3 seconds
+ARXIV_PAGE_SIZE = int(os.environ.get('ARXIV_PAGE_SIZE', 100))
+ARXIV_PAGE_DELAY_SECONDS = float(os.environ.get('ARXIV_PAGE_DELAY_SECONDS', 3))
+# Upper bound on papers read in one ingestion by arXiv author id, and by name alone, which
+# can match other authors with the same name
+ARXIV_MAX_RESULTS = int(os.environ.get('ARXIV_MAX_RESULTS', 1000))
+ARXIV_NAME_MAX_RESULTS = int(os.environ.get('ARXIV_NAME_MAX_RESULTS', 100))
+
+
+def iter_arxiv_papers(arxiv, author_query, since=None, max_results=ARXIV_MAX_RESULTS):
+    """
+    Stream an author's papers newest first, page by page, stopping at the first paper
+    submitted at or before `since` (naive UTC) or after `max_results` papers.
+    """
+    client = arxiv.Client(page_size=ARXIV_PAGE_SIZE, delay_seconds=ARXIV_PAGE_DELAY_SECONDS, num_retries=3)
+    search = arxiv.Search(
+        query=f'au:{author_query}',
+        max_results=max_results,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Descending
+    )
+    for result in client.results(search):
+        published = result.published.astimezone(timezone.utc).replace(tzinfo=None)
+        if since and published <= since:
+            return
+        yield {
+            'arxiv_id': result.entry_id.split('/')[-1],  # Extract ID from URL
+            'title': result.title,
+            'authors': ', '.join([author.name for author in result.authors]),
+            'year': result.published.year,
+            'published': published,
+            'url': result.entry_id,
+            'abstract': result.summary  # Stored in full on the shared paper
+        }
+
+
+def fetch_arxiv_enrichment(identity):
+    """
+    Search arXiv for the candidate's papers. Only papers submitted after the candidate's
+    watermark are fetched, unless identity['full_history'] asks for everything. A name
+    is searched as a quoted phrase and reads at most ARXIV_NAME_MAX_RESULTS papers.
+    """
     # Need either arXiv author ID or name to search
-    author_query = None
-    if candidate.arxiv_author_id:
-        author_query = candidate.arxiv_author_id
+    if identity['arxiv_author_id']:
+        author_query, max_results = identity['arxiv_author_id'], ARXIV_MAX_RESULTS
     else:
-        # Try searching by name
-        author_query = f"{candidate.first_name} {candidate.last_name}"
+        # Unquoted, arXiv would match the surname against every field
+        name = ' '.join(f"{identity['first_name']} {identity['last_name']}".replace('"', ' ').split())
+        author_query, max_results = f'"{name}"', ARXIV_NAME_MAX_RESULTS
 
     try:
         import arxiv
+    except ImportError:
+        raise EnrichmentError("arXiv library not installed. Run: pip install arxiv")
 
-        # Search arXiv for author's papers
-        search = arxiv.Search(
-            query=f'au:{author_query}',
-            max_results=20,
-            sort_by=arxiv.SortCriterion.SubmittedDate
-        )
+    since = None if identity.get('full_history') else identity['arxiv_last_submitted']
+    try:
+        papers = list(iter_arxiv_papers(arxiv, author_query, since, max_results))
+    except Exception as e:
+        raise EnrichmentError(f"Failed to fetch from arXiv: {str(e)}", retryable=transient_error(e))
+    # Stopped by the cap rather than at the watermark: papers between the two were not read
+    return {'since': since, 'papers': papers, 'truncated': since is not None and len(papers) >= max_results}
+
+
+def apply_arxiv_enrichment(candidate, payload):
+    papers = payload['papers']
+
+    # Ids this candidate already has, checked in one IN query per chunk
+    existing = set()
+    for chunk in chunked({paper['arxiv_id'] for paper in papers}):
+        existing.update(arxiv_id for (arxiv_id,) in db.session.query(Publication.arxiv_id).filter(
+            Publication.candidate_id == candidate.id,
+            Publication.arxiv_id.in_(chunk)
+        ))
+    papers = [paper for paper in papers if paper['arxiv_id'] not in existing]
+
+    # Co-authors share one stored paper; link this candidate to the ones they are not linked to yet
+    shared = resolve_papers([{
+        'arxiv_id': paper['arxiv_id'],
+        'title': paper['title'],
+        'authors': paper['authors'],
+        'venue': 'arXiv',
+        'year': paper['year'],
+        'paper_url': paper['url'],
+        'abstract': paper['abstract']
+    } for paper in papers])
+    linked = linked_paper_ids(candidate.id, [paper.id for paper in shared])
+
+    new_publications = []
+    for paper, stored in zip(papers, shared):
+        if stored.id in linked:
+            continue
+        linked.add(stored.id)
+        new_publications.append(Publication(
+            candidate_id=candidate.id,
+            paper_id=stored.id,
+            title=paper['title'],
+            authors=paper['authors'],
+            venue='arXiv',
+            year=paper['year'],
+            citation_count=0,  # arXiv API doesn't provide citations
+            paper_url=paper['url'],
+            arxiv_id=paper['arxiv_id'],
+            abstract=paper['abstract'][:500] if paper['abstract'] else None  # Truncate abstract
+        ))
+
+    db.session.add_all(new_publications)
+    if payload['papers'] and not payload.get('truncated'):
+        newest = max(paper['published'] for paper in payload['papers'])
+        if not candidate.arxiv_last_submitted or newest > candidate.arxiv_last_submitted:
+            candidate.arxiv_last_submitted = newest
+    db.session.flush()
+
+    return {
+        "success": True,
+        "message": f"Found {len(new_publications)} new papers from arXiv",
+        "papers_added": len(new_publications),
+        "papers_fetched": len(payload['papers']),
+        "since": payload['since'].isoformat() if payload['since'] else None,
+        "truncated": bool(payload.get('truncated')),
+        "last_submitted": candidate.arxiv_last_submitted.isoformat() if candidate.arxiv_last_submitted else None,
+        "total_publications": Publication.query.filter_by(candidate_id=candidate.id).count(),
+        "papers": [{
+            'title': publication.title,
+            'year': publication.year,
+            'arxiv_id': publication.arxiv_id,
+            'url': publication.paper_url
+        } for publication in new_publications]
+    }
 
-        papers_added = 0
-        papers_data = []
-
-        for result in search.results():
-            # Check if publication already exists
-            arxiv_id = result.entry_id.split('/')[-1]  # Extract ID from URL
-            existing = Publication.query.filter_by(
-                candidate_id=candidate_id,
-                arxiv_id=arxiv_id
-            ).first()
-
-            if not existing:
-                # Add new publication
-                publication = Publication(
-                    candidate_id=candidate_id,
-                    title=result.title,
-                    authors=', '.join([author.name for author in result.authors]),
-                    journal='arXiv',
-                    year=result.published.year,
-                    citations=0,  # arXiv API doesn't provide citations
-                    url=result.entry_id,
-                    arxiv_id=arxiv_id,
-                    abstract=result.summary[:500] if result.summary else None  # Truncate abstract
-                )
-                db.session.add(publication)
-                papers_added += 1
 
-                papers_data.append({
-                    'title': result.title,
-                    'year': result.published.year,
-                    'arxiv_id': arxiv_id,
-                    'url': result.entry_id
-                })
+def fetch_orcid_enrichment(identity):
+    """Fetch a public ORCID record"""
+    if not identity['orcid_id']:
+        raise EnrichmentError("No ORCID ID provided for this candidate", 400)
 
-        db.session.commit()
+    # ORCID public API endpoint
+    orcid_id = identity['orcid_id'].replace('https://orcid.org/', '').replace('http://orcid.org/', '')
+    url = f'https://pub.orcid.org/v3.0/{orcid_id}/record'
 
-        return jsonify({
-            "success": True,
-            "message": f"Found {papers_added} new papers from arXiv",
-            "papers_added": papers_added,
-            "total_publications": len(candidate.publications),
-            "papers": papers_data
-        })
+    headers = {
+        'Accept': 'application/json'
+    }
 
-    except ImportError:
-        return jsonify({"error": "arXiv library not installed. Run: pip install arxiv"}), 500
+    try:
+        response = http_cache.get(url, headers=headers, ttl=HTTP_CACHE_TTLS['orcid_record'], timeout=10)
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch from arXiv: {str(e)}"}), 500
+        raise EnrichmentError(f"Failed to enrich from ORCID: {str(e)}", retryable=transient_error(e))
 
+    if response.status_code == 404:
+        raise EnrichmentError(f"ORCID ID '{orcid_id}' not found", 404)
+    elif response.status_code != 200:
+        raise EnrichmentError(f"ORCID API error: {response.status_code}", retryable=response.status_code >= 500)
 
-@app.route('/api/candidates/<int:candidate_id>/enrich/orcid', methods=['POST'])
-def enrich_from_orcid(candidate_id):
-    """Auto-enrich candidate profile from ORCID API"""
-    candidate = Candidate.query.get_or_404(candidate_id)
+    return {'orcid_id': orcid_id, 'record': response.json()}
 
-    if not candidate.orcid_id:
-        return jsonify({"error": "No ORCID ID provided for this candidate"}), 400
 
-    try:
-        # ORCID public API endpoint
-        orcid_id = candidate.orcid_id.replace('https://orcid.org/', '').replace('http://orcid.org/', '')
-        url = f'https://pub.orcid.org/v3.0/{orcid_id}/record'
+def apply_orcid_enrichment(candidate, payload):
+    data = payload['record']
 
-        headers = {
-            'Accept': 'application/json'
+    # Extract researcher information
+    person = data.get('person', {})
+    bio = person.get('biography', {})
+
+    # Update candidate bio if available
+    if bio and bio.get('content'):
+        candidate.bio = bio['content']
+
+    # Extract employment/affiliation
+    activities = data.get('activities-summary', {})
+    employments = activities.get('employments', {}).get('affiliation-group', [])
+
+    if employments:
+        # Get most recent employment
+        latest = employments[0].get('summaries', [{}])[0].get('employment-summary', {})
+        org = latest.get('organization', {})
+        if org.get('name'):
+            candidate.company = org['name']
+        if org.get('address', {}).get('city'):
+            city = org['address']['city']
+            country = org['address'].get('country', '')
+            candidate.location = f"{city}, {country}" if country else city
+
+    # Count publications from ORCID
+    works = activities.get('works', {}).get('group', [])
+    orcid_publication_count = len(works)
+
+    return {
+        "success": True,
+        "message": f"Enriched profile from ORCID: {payload['orcid_id']}",
+        "data": {
+            "orcid_id": payload['orcid_id'],
+            "bio": candidate.bio,
+            "company": candidate.company,
+            "location": candidate.location,
+            "orcid_publications": orcid_publication_count
         }
+    }
 
-        response = requests.get(url, headers=headers, timeout=10)
 
-        if response.status_code == 200:
-            data = response.json()
-
-            # Extract researcher information
-            person = data.get('person', {})
-            bio = person.get('biography', {})
-
-            # Update candidate bio if available
-            if bio and bio.get('content'):
-                candidate.bio = bio['content']
-
-            # Extract employment/affiliation
-            activities = data.get('activities-summary', {})
-            employments = activities.get('employments', {}).get('affiliation-group', [])
-
-            if employments:
-                # Get most recent employment
-                latest = employments[0].get('summaries', [{}])[0].get('employment-summary', {})
-                org = latest.get('organization', {})
-                if org.get('name'):
-                    candidate.company = org['name']
-                if org.get('address', {}).get('city'):
-                    city = org['address']['city']
-                    country = org['address'].get('country', '')
-                    candidate.location = f"{city}, {country}" if country else city
-
-            # Count publications from ORCID
-            works = activities.get('works', {}).get('group', [])
-            orcid_publication_count = len(works)
+# Publications per Scholar profile that are filled and stored
+SCHOLAR_MAX_PUBLICATIONS = int(os.environ.get('SCHOLAR_MAX_PUBLICATIONS', 20))
+# Seconds one enrichment waits for its publication fills; later ones use the unfilled entry
+SCHOLAR_FILL_TIMEOUT = float(os.environ.get('SCHOLAR_FILL_TIMEOUT', 60))
+# Seconds scholarly waits on one HTTP request, so an abandoned fill ends on its own
+SCHOLAR_REQUEST_TIMEOUT = int(os.environ.get('SCHOLAR_REQUEST_TIMEOUT', 20))
 
-            db.session.commit()
 
-            return jsonify({
-                "success": True,
-                "message": f"Enriched profile from ORCID: {orcid_id}",
-                "data": {
-                    "orcid_id": orcid_id,
-                    "bio": candidate.bio,
-                    "company": candidate.company,
-                    "location": candidate.location,
-                    "orcid_publications": orcid_publication_count
-                }
-            })
-        elif response.status_code == 404:
-            return jsonify({"error": f"ORCID ID '{orcid_id}' not found"}), 404
-        else:
-            return jsonify({"error": f"ORCID API error: {response.status_code}"}), 500
+class ScholarFillPool:
+    """
+    Threads for scholarly.fill calls, shared by all enrichments. A fill still running at
+    its timeout cannot be stopped, so the pool it runs on is retired: later enrichments
+    get fresh threads instead of queueing behind stuck ones.
+    """
 
-    except Exception as e:
-        return jsonify({"error": f"Failed to enrich from ORCID: {str(e)}"}), 500
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
 
+    def _new_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scholar')
+
+    def executor(self):
+        with self._lock:
+            return self._executor
+
+    def retire(self, executor):
+        """Replace `executor` if it is still the current one; its running fills finish in the background"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._new_executor()
+        executor.shutdown(wait=False)
+
+
+# Concurrent scholarly.fill calls across all enrichments
+scholar_fill_pool = ScholarFillPool(max_workers=int(os.environ.get('SCHOLAR_MAX_WORKERS', 4)))
 
-@app.route('/api/candidates/<int:candidate_id>/enrich/scholar', methods=['POST'])
-def enrich_from_scholar(candidate_id):
-    """Auto-enrich candidate profile from Google Scholar"""
-    candidate = Candidate.query.get_or_404(candidate_id)
 
+# Venues that say nothing about where a paper was published; stored papers with one are filled again
+UNINFORMATIVE_VENUES = (None, '', 'arXiv', 'Unknown')
+
+
+def fill_scholar_publications(scholarly, entries):
+    """
+    Filled records for a profile's publication entries, in order. Papers in the Scholar
+    cache, or stored with full details by a co-author's enrichment, are not fetched again;
+    the rest are filled concurrently on scholar_fill_pool. A fill that fails, or has not
+    finished within SCHOLAR_FILL_TIMEOUT, falls back to the unfilled entry.
+    Returns (records, papers reused without a fill).
+    """
+    keys = [scholar_publication_key(entry) for entry in entries]
+    cached = scholar_publication_cache.get_many([key for key in keys if key])
+    stored = stored_papers_by_title(entry.get('bib', {}).get('title')
+                                    for entry, key in zip(entries, keys) if key not in cached)
+
+    def reuse(entry, key):
+        if key in cached:
+            record = dict(cached[key])
+        else:
+            title = entry.get('bib', {}).get('title')
+            paper = stored.get(paper_title_hash(title)) if title else None
+            if not paper or not paper['authors'] or paper['venue'] in UNINFORMATIVE_VENUES:
+                return None
+            record = {
+                'bib': {'title': paper['title'], 'author': paper['authors'], 'venue': paper['venue'],
+                        'pub_year': str(paper['year']) if paper['year'] else None},
+                'pub_url': paper['paper_url']
+            }
+        # The profile listing carries the current citation count; a reused record may be older
+        record['num_citations'] = entry.get('num_citations', record.get('num_citations', 0))
+        return record
+
+    def fill(entry):
+        try:
+            return scholar_publication_record(scholarly.fill(entry)), True
+        except Exception as e:
+            app.logger.warning("Error filling Scholar publication %s: %s", entry.get('author_pub_id'), e)
+            return scholar_publication_record(entry), False
+
+    records = [reuse(entry, key) for entry, key in zip(entries, keys)]
+    executor = scholar_fill_pool.executor()
+    pending = {executor.submit(fill, entries[index]): index
+               for index, record in enumerate(records) if record is None}
+    done, not_done = wait(pending, timeout=SCHOLAR_FILL_TIMEOUT)
+    if not_done:
+        app.logger.warning("%d of %d Scholar publication fills did not finish within %ss",
+                           len(not_done), len(pending), SCHOLAR_FILL_TIMEOUT)
+        for future in not_done:
+            future.cancel()  # Queued fills never start; running ones cannot be stopped
+        scholar_fill_pool.retire(executor)
+    filled = {}
+    for future, index in pending.items():
+        record, complete = future.result() if future in done else (scholar_publication_record(entries[index]), False)
+        records[index] = record
+        if complete and keys[index]:
+            filled[keys[index]] = record
+    scholar_publication_cache.put_many(filled)
+    return records, len(entries) - len(pending)
+
+
+def fetch_scholar_enrichment(identity):
+    """Fetch a Google Scholar author profile and up to SCHOLAR_MAX_PUBLICATIONS filled publications"""
     # Need either Google Scholar URL or name to search
-    if not candidate.google_scholar_url and not (candidate.first_name and candidate.last_name):
-        return jsonify({"error": "Need Google Scholar URL or candidate name"}), 400
+    if not identity['google_scholar_url'] and not (identity['first_name'] and identity['last_name']):
+        raise EnrichmentError("Need Google Scholar URL or candidate name", 400)
 
     try:
         from scholarly import scholarly, ProxyGenerator
+    except ImportError:
+        raise EnrichmentError("scholarly library not installed. Run: pip install scholarly")
 
-        # Optional: Use a proxy to avoid rate limiting (requires free-proxy package)
-        # pg = ProxyGenerator()
-        # pg.FreeProxies()
-        # scholarly.use_proxy(pg)
+    # Optional: Use a proxy to avoid rate limiting (requires free-proxy package)
+    # pg = ProxyGenerator()
+    # pg.FreeProxies()
+    # scholarly.use_proxy(pg)
+    if hasattr(scholarly, 'set_timeout'):  # scholarly 1.6+
+        scholarly.set_timeout(SCHOLAR_REQUEST_TIMEOUT)
 
+    try:
         author = None
 
-        if candidate.google_scholar_url:
+        if identity['google_scholar_url']:
             # Extract scholar ID from URL
             # Format: https://scholar.google.com/citations?user=SCHOLAR_ID
-            if 'user=' in candidate.google_scholar_url:
-                scholar_id = candidate.google_scholar_url.split('user=')[1].split('&')[0]
+            if 'user=' in identity['google_scholar_url']:
+                scholar_id = identity['google_scholar_url'].split('user=')[1].split('&')[0]
                 author = scholarly.search_author_id(scholar_id)
             else:
-                return jsonify({"error": "Invalid Google Scholar URL format"}), 400
+                raise EnrichmentError("Invalid Google Scholar URL format", 400)
         else:
             # Search by name
-            search_query = f"{candidate.first_name} {candidate.last_name}"
+            search_query = f"{identity['first_name']} {identity['last_name']}"
             search_results = scholarly.search_author(search_query)
             author = next(search_results, None)  # Get first result
 
         if not author:
-            return jsonify({"error": "Author not found on Google Scholar"}), 404
+            raise EnrichmentError("Author not found on Google Scholar", 404)
 
         # Fill in author details
         author = scholarly.fill(author)
 
-        # Update candidate with Scholar metrics
-        candidate.h_index = author.get('hindex', 0)
-        candidate.citation_count = author.get('citedby', 0)
-
-        # Update affiliation if available
-        if author.get('affiliation'):
-            candidate.company = author['affiliation']
-
-        # Update research interests/expertise
-        if author.get('interests'):
-            candidate.primary_expertise = author['interests'][0] if author['interests'] else None
-
-        # Fetch publications
-        publications = author.get('publications', [])
-        papers_added = 0
-        papers_data = []
-
-        for pub in publications[:20]:  # Limit to 20 most recent
-            pub_filled = scholarly.fill(pub)
-
-            # Check if publication already exists by title
-            existing = Publication.query.filter_by(
-                candidate_id=candidate_id,
-                title=pub_filled['bib'].get('title', '')
-            ).first()
-
-            if not existing and pub_filled['bib'].get('title'):
-                publication = Publication(
-                    candidate_id=candidate_id,
-                    title=pub_filled['bib']['title'],
-                    authors=pub_filled['bib'].get('author', ''),
-                    journal=pub_filled['bib'].get('venue', 'Unknown'),
-                    year=int(pub_filled['bib'].get('pub_year', 0)) if pub_filled['bib'].get('pub_year') else None,
-                    citations=pub_filled.get('num_citations', 0),
-                    url=pub_filled.get('pub_url', pub_filled.get('eprint_url', ''))
-                )
-                db.session.add(publication)
-                papers_added += 1
+        # Limit to the most recent
+        publications, cache_hits = fill_scholar_publications(
+            scholarly, author.get('publications', [])[:SCHOLAR_MAX_PUBLICATIONS])
+        return {'author': author, 'publications': publications, 'cache_hits': cache_hits}
+    except EnrichmentError:
+        raise
+    except StopIteration:
+        raise EnrichmentError("No Google Scholar profile found for this author", 404)
+    except Exception as e:
+        raise EnrichmentError(f"Failed to fetch from Google Scholar: {str(e)}", retryable=transient_error(e))
+
+
+def apply_scholar_enrichment(candidate, payload):
+    author = payload['author']
+
+    # Update candidate with Scholar metrics
+    candidate.h_index = author.get('hindex', 0)
+    candidate.citation_count = author.get('citedby', 0)
+
+    # Update affiliation if available
+    if author.get('affiliation'):
+        candidate.company = author['affiliation']
+
+    # Update research interests/expertise
+    if author.get('interests'):
+        candidate.primary_expertise = author['interests'][0] if author['interests'] else None
+        reindex_candidate_tokens(candidate)
+
+    # Titles already stored for this candidate, loaded once
+    titles = {title for (title,) in db.session.query(Publication.title).filter_by(candidate_id=candidate.id)}
+    records = []
+    for pub_filled in payload['publications']:
+        title = pub_filled['bib'].get('title')
+        if not title or title in titles:
+            continue
+        titles.add(title)
+        records.append({
+            'title': title,
+            'authors': pub_filled['bib'].get('author', ''),
+            'venue': pub_filled['bib'].get('venue', 'Unknown'),
+            'year': int(pub_filled['bib'].get('pub_year', 0)) if pub_filled['bib'].get('pub_year') else None,
+            'citation_count': pub_filled.get('num_citations', 0),
+            'paper_url': pub_filled.get('pub_url', pub_filled.get('eprint_url', ''))
+        })
+
+    # Co-authors share one stored paper; link this candidate to the ones they are not linked to yet
+    shared = resolve_papers(records)
+    linked = linked_paper_ids(candidate.id, [paper.id for paper in shared])
+    new_publications = []
+    for record, paper in zip(records, shared):
+        if paper.id in linked:
+            continue
+        linked.add(paper.id)
+        new_publications.append(Publication(candidate_id=candidate.id, paper_id=paper.id, **record))
+
+    db.session.add_all(new_publications)
+    db.session.flush()
+
+    return {
+        "success": True,
+        "message": f"Enriched profile from Google Scholar",
+        "data": {
+            "h_index": candidate.h_index,
+            "citations": candidate.citation_count,
+            "affiliation": candidate.company,
+            "expertise": candidate.primary_expertise,
+            "papers_added": len(new_publications),
+            "publications_from_cache": payload.get('cache_hits', 0),
+            "total_publications": Publication.query.filter_by(candidate_id=candidate.id).count()
+        },
+        "papers": [{
+            'title': publication.title,
+            'year': publication.year,
+            'citations': publication.citation_count
+        } for publication in new_publications[:5]]  # Return first 5 papers
+    }
+
+
+ENRICHMENT_SOURCES = {
+    'github': (fetch_github_enrichment, apply_github_enrichment),
+    'arxiv': (fetch_arxiv_enrichment, apply_arxiv_enrichment),
+    'orcid': (fetch_orcid_enrichment, apply_orcid_enrichment),
+    'scholar': (fetch_scholar_enrichment, apply_scholar_enrichment)
+}
+
+
+def enrich_candidate(candidate, source, **options):
+    """Fetch from one source and apply it to the candidate (caller commits). Raises EnrichmentError.
+
+    The open transaction is committed before the remote call so no database lock is
+    held while waiting on the network. `options` are passed to the fetch step in the identity.
+    """
+    fetch, apply = ENRICHMENT_SOURCES[source]
+    identity = dict(enrichment_identity(candidate), **options)
+    db.session.commit()
+    payload = fetch(identity)
+    begin_write()
+    return apply(candidate, payload)
 
-                papers_data.append({
-                    'title': publication.title,
-                    'year': publication.year,
-                    'citations': publication.citations
-                })
 
+def enrichment_response(candidate_id, source, **options):
+    candidate = Candidate.query.get_or_404(candidate_id)
+    try:
+        result = enrich_candidate(candidate, source, **options)
         db.session.commit()
+        return jsonify(result)
+    except EnrichmentError as e:
+        db.session.rollback()
+        return jsonify({"error": e.message}), e.status_code
 
-        return jsonify({
-            "success": True,
-            "message": f"Enriched profile from Google Scholar",
-            "data": {
-                "h_index": candidate.h_index,
-                "citations": candidate.citation_count,
-                "affiliation": candidate.company,
-                "expertise": candidate.primary_expertise,
-                "papers_added": papers_added,
-                "total_publications": len(candidate.publications)
-            },
-            "papers": papers_data[:5]  # Return first 5 papers
-        })
 
-    except ImportError:
-        return jsonify({"error": "scholarly library not installed. Run: pip install scholarly"}), 500
-    except StopIteration:
-        return jsonify({"error": "No Google Scholar profile found for this author"}), 404
+@app.route('/api/candidates/<int:candidate_id>/enrich/github', methods=['POST'])
+def enrich_from_github(candidate_id):
+    """Auto-enrich candidate profile from GitHub API"""
+    return enrichment_response(candidate_id, 'github')
+
+
+@app.route('/api/candidates/<int:candidate_id>/enrich/arxiv', methods=['POST'])
+def enrich_from_arxiv(candidate_id):
+    """Auto-fetch publications from arXiv API; ?full=1 re-reads the whole history, not just newer papers"""
+    return enrichment_response(candidate_id, 'arxiv', full_history=request.args.get('full') in ('1', 'true'))
+
+
+@app.route('/api/candidates/<int:candidate_id>/enrich/orcid', methods=['POST'])
+def enrich_from_orcid(candidate_id):
+    """Auto-enrich candidate profile from ORCID API"""
+    return enrichment_response(candidate_id, 'orcid')
+
+
+@app.route('/api/candidates/<int:candidate_id>/enrich/scholar', methods=['POST'])
+def enrich_from_scholar(candidate_id):
+    """Auto-enrich candidate profile from Google Scholar"""
+    return enrichment_response(candidate_id, 'scholar')
+
+
+# ==================== BULK ENRICHMENT ====================
+
+# Parallel fetches allowed per source in one bulk run
+BULK_ENRICHMENT_CONCURRENCY = {'github': 8, 'orcid': 4, 'arxiv': 2, 'scholar': 1}
+BULK_ENRICHMENT_BATCH_SIZE = 100
+
+
+@app.route('/api/candidates/enrich/bulk', methods=['POST'])
+def bulk_enrich_candidates():
+    """
+    Enrich many candidates from one or more sources, streaming NDJSON progress.
+
+    Body: {"candidate_ids": [...]} or {"filter": {"status", "expertise", "skills"}},
+    "sources": [...], optional "concurrency": {source: n}, "budget": {source: max fetches}
+    and "batch_size". Fetches run in parallel per source; results are applied and
+    committed once per batch.
+    """
+    data = request.get_json() or {}
+    sources = data.get('sources') or []
+    if not isinstance(sources, list) or not sources or any(source not in ENRICHMENT_SOURCES for source in sources):
+        return jsonify({"error": f"sources must be a non-empty subset of {list(ENRICHMENT_SOURCES)}"}), 400
+
+    candidate_ids, error = resolve_candidate_selection(data)
+    if error:
+        return error
+
+    try:
+        requested = data.get('concurrency') or {}
+        limits = data.get('budget') or {}
+        concurrency = {source: max(int(requested.get(source, BULK_ENRICHMENT_CONCURRENCY[source])), 1)
+                       for source in sources}
+        budget = {source: None if limits.get(source) is None else max(int(limits[source]), 0) for source in sources}
+        batch_size = max(int(data.get('batch_size', BULK_ENRICHMENT_BATCH_SIZE)), 1)
+    except (AttributeError, TypeError, ValueError):
+        return jsonify({"error": "concurrency and budget must map sources to integers, and batch_size be an integer"}), 400
+
+    def generate():
+        executors = {source: ThreadPoolExecutor(max_workers=concurrency[source], thread_name_prefix=f'bulk-{source}')
+                     for source in sources}
+        succeeded = {source: 0 for source in sources}
+        failed = {source: 0 for source in sources}
+        skipped = {source: 0 for source in sources}
+        submitted = {source: 0 for source in sources}
+        processed = 0
+
+        yield json.dumps({"event": "started", "candidates": len(candidate_ids), "sources": sources}) + '\n'
+        try:
+            for batch_ids in chunked(candidate_ids, batch_size):
+                candidates = {c.id: c for c in Candidate.query.filter(Candidate.id.in_(batch_ids))}
+
+                futures = {}
+                for candidate in candidates.values():
+                    identity = enrichment_identity(candidate)
+                    for source in sources:
+                        if budget[source] is not None and submitted[source] >= budget[source]:
+                            skipped[source] += 1
+                            continue
+                        submitted[source] += 1
+                        futures[executors[source].submit(ENRICHMENT_SOURCES[source][0], identity)] = (candidate.id, source)
+
+                # Hold no transaction (and so no database lock) while the fetches run
+                db.session.commit()
+                outcomes = []
+                for future in as_completed(futures):
+                    try:
+                        outcomes.append((futures[future], future.result(), None))
+                    except Exception as e:
+                        outcomes.append((futures[future], None, e))
+
+                # Reload the batch in one query, then apply everything in one short write transaction
+                candidates = {c.id: c for c in Candidate.query.filter(Candidate.id.in_(batch_ids))}
+                errors = []
+                for (candidate_id, source), payload, error in outcomes:
+                    try:
+                        if error:
+                            raise error
+                        if candidate_id not in candidates:
+                            raise EnrichmentError("Candidate no longer exists", 404)
+                        # A savepoint per candidate keeps one bad row from discarding the batch
+                        with db.session.begin_nested():
+                            ENRICHMENT_SOURCES[source][1](candidates[candidate_id], payload)
+                        succeeded[source] += 1
+                    except EnrichmentError as e:
+                        if e.status_code == 400:
+                            # Candidate has no identifier for this source
+                            skipped[source] += 1
+                            continue
+                        failed[source] += 1
+                        errors.append({'candidate_id': candidate_id, 'source': source, 'error': e.message})
+                    except Exception as e:
+                        failed[source] += 1
+                        errors.append({'candidate_id': candidate_id, 'source': source, 'error': str(e)})
+
+                db.session.commit()
+                processed += len(batch_ids)
+                yield json.dumps({
+                    "event": "batch",
+                    "processed": processed,
+                    "total": len(candidate_ids),
+                    "succeeded": succeeded,
+                    "failed": failed,
+                    "skipped": skipped,
+                    "errors": errors
+                }) + '\n'
+
+            yield json.dumps({
+                "event": "done",
+                "processed": processed,
+                "succeeded": succeeded,
+                "failed": failed,
+                "skipped": skipped
+            }) + '\n'
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# ==================== ENRICHMENT TASK QUEUE ====================
+
+TASK_RETRY_BASE_SECONDS = int(os.environ.get('TASK_RETRY_BASE_SECONDS', 30))
+TASK_LOCK_TIMEOUT_SECONDS = int(os.environ.get('TASK_LOCK_TIMEOUT_SECONDS', 600))
+TASK_MAX_ATTEMPTS_LIMIT = 10  # Upper bound on a task's max_attempts from the API
+
+
+def enqueue_enrichment(candidate_id, source, max_attempts=3):
+    """Queue an enrichment run; returns (task, created). An identical pending/running task is reused."""
+    active = EnrichmentTask.query.filter(
+        EnrichmentTask.candidate_id == candidate_id,
+        EnrichmentTask.source == source,
+        EnrichmentTask.status.in_(['pending', 'running'])
+    ).first()
+    if active:
+        return active, False
+
+    task = EnrichmentTask(candidate_id=candidate_id, source=source, max_attempts=max_attempts)
+    db.session.add(task)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker queued the same job between our check and insert
+        db.session.rollback()
+        return EnrichmentTask.query.filter(
+            EnrichmentTask.candidate_id == candidate_id,
+            EnrichmentTask.source == source,
+            EnrichmentTask.status.in_(['pending', 'running'])
+        ).first(), False
+    return task, True
+
+
+def claim_next_task():
+    """
+    Atomically move the next due task (or a stale running one) to running. A stale task
+    whose attempts are used up is failed instead, so a task that keeps crashing its
+    worker is not picked up forever.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=TASK_LOCK_TIMEOUT_SECONDS)
+    abandoned = and_(EnrichmentTask.status == 'running', EnrichmentTask.locked_at < stale)
+    exhausted = and_(abandoned, EnrichmentTask.attempts >= EnrichmentTask.max_attempts)
+    due = or_(
+        and_(EnrichmentTask.status == 'pending', EnrichmentTask.run_after <= now),
+        and_(abandoned, EnrichmentTask.attempts < EnrichmentTask.max_attempts)
+    )
+    # The poll is read-only, so an idle worker never holds the write lock
+    has_exhausted = db.session.query(EnrichmentTask.query.filter(exhausted).exists()).scalar()
+    task_ids = [row.id for row in db.session.query(EnrichmentTask.id).filter(due)
+                .order_by(EnrichmentTask.run_after, EnrichmentTask.id).limit(5)]
+    db.session.commit()
+
+    if has_exhausted:
+        begin_write()
+        EnrichmentTask.query.filter(exhausted).update(
+            {'status': 'failed', 'locked_at': None, 'error': 'Worker stopped during the last attempt'},
+            synchronize_session=False
+        )
+        db.session.commit()
+    for task_id in task_ids:
+        begin_write()
+        claimed = EnrichmentTask.query.filter(EnrichmentTask.id == task_id, due).update(
+            {'status': 'running', 'locked_at': now, 'attempts': EnrichmentTask.attempts + 1},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            return EnrichmentTask.query.get(task_id)
+    return None
+
+
+def run_enrichment_task(task):
+    """Run a claimed task and record success, a scheduled retry, or failure"""
+    candidate = Candidate.query.get(task.candidate_id)
+    try:
+        if not candidate:
+            raise EnrichmentError("Candidate no longer exists", 404)
+        result = enrich_candidate(candidate, task.source)
+        task.status = 'succeeded'
+        task.result = json.dumps(result)
+        task.error = None
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch from Google Scholar: {str(e)}"}), 500
+        db.session.rollback()
+        begin_write()
+        # Only network failures and upstream 429/5xx are retried; anything else fails now
+        error = e if isinstance(e, EnrichmentError) else EnrichmentError(str(e), retryable=transient_error(e))
+        task.error = error.message
+        if error.retryable and task.attempts < task.max_attempts:
+            # Exponential backoff with jitter: 30s, 60s, 120s, ...
+            delay = TASK_RETRY_BASE_SECONDS * 2 ** (task.attempts - 1)
+            task.run_after = datetime.utcnow() + timedelta(seconds=delay * random.uniform(1, 1.5))
+            task.status = 'pending'
+        else:
+            task.status = 'failed'
+    task.locked_at = None
+    db.session.commit()
+
+
+class EnrichmentWorkerPool:
+    """Background threads that drain the enrichment task table"""
+
+    def __init__(self, workers=2, poll_interval=2):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'enrichment-worker-{number}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            try:
+                with app.app_context():
+                    task = claim_next_task()
+                    if task:
+                        run_enrichment_task(task)
+                        continue
+            except Exception as e:
+                print(f"Enrichment worker error: {e}")
+            time.sleep(self.poll_interval)
+
+
+enrichment_workers = EnrichmentWorkerPool(
+    workers=int(os.environ.get('ENRICHMENT_WORKERS', 2)),
+    poll_interval=float(os.environ.get('ENRICHMENT_POLL_INTERVAL', 2))
+)
+
+
+@app.before_request
+def start_enrichment_workers():
+    enrichment_workers.start()
+
+
+@app.route('/api/candidates/<int:candidate_id>/enrich/<source>/async', methods=['POST'])
+def enqueue_candidate_enrichment(candidate_id, source):
+    """Queue an enrichment run in the background and return its task id"""
+    if source not in ENRICHMENT_SOURCES:
+        return jsonify({"error": f"Unknown enrichment source: {source}"}), 400
+    Candidate.query.get_or_404(candidate_id)
+
+    data = request.get_json(silent=True) or {}
+    try:
+        max_attempts = int(data.get('max_attempts', 3))
+        if not 1 <= max_attempts <= TASK_MAX_ATTEMPTS_LIMIT:
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({"error": f"max_attempts must be an integer from 1 to {TASK_MAX_ATTEMPTS_LIMIT}"}), 400
+    task, created = enqueue_enrichment(candidate_id, source, max_attempts=max_attempts)
+    return jsonify({
+        "task": task.to_dict(),
+        "deduplicated": not created
+    }), 202
+
+
+@app.route('/api/tasks/<int:task_id>', methods=['GET'])
+def get_task(task_id):
+    """Poll a background enrichment task"""
+    task = EnrichmentTask.query.get_or_404(task_id)
+    return jsonify(task.to_dict())
+
+
+@app.route('/api/tasks', methods=['GET'])
+def get_tasks():
+    """List background enrichment tasks"""
+    query = EnrichmentTask.query
+    if request.args.get('status'):
+        query = query.filter_by(status=request.args['status'])
+    if request.args.get('candidate_id'):
+        query = query.filter_by(candidate_id=request.args['candidate_id'])
+    return list_response(query, EnrichmentTask, 'tasks', lambda rows: [t.to_dict() for t in rows],
+                         EnrichmentTask.created_at.desc())
 
 
 # ==================== PHASE 3: AI/ML FEATURES ====================
 
 # Top AI/ML conferences for tracking
-TOP_CONFERENCES = [
-    'NeurIPS', 'NIPS', 'ICML', 'ICLR', 'CVPR', 'ICCV', 'ECCV',
-    'AAAI', 'IJCAI', 'ACL', 'EMNLP', 'NAACL', 'KDD', 'SIGIR',
-    'ICRA', 'IROS', 'RSS', 'CoRL'
-]
+# (canonical names and aliases are in VENUE_ALIASES; classify_venue() matches them)
+TOP_CONFERENCES = list(VENUE_ALIASES)
 
 # AI/ML skills taxonomy
 AI_ML_SKILLS = {
@@ -773,64 +2768,240 @@ AI_ML_SKILLS = {
 }
 
 
-@app.route('/api/candidates/<int:candidate_id>/extract-skills', methods=['POST'])
-def extract_skills_from_candidate(candidate_id):
-    """Auto-extract AI/ML skills from candidate's bio, publications, and GitHub"""
-    candidate = Candidate.query.get_or_404(candidate_id)
+class SkillExtractor:
+    """
+    Finds taxonomy keywords in text in a single regex pass. Keywords are compiled into a
+    prefix trie between word-boundary lookarounds, so 'rl' and 'go' match only as words
+    while 'c++' and 'q-learning' still match. Keywords of three or more characters ending
+    in a letter other than 's' also match with a plural 's' ('transformers', 'CNNs').
+    """
+
+    def __init__(self, taxonomy):
+        self.taxonomy = {category: sorted({' '.join(keyword.lower().split()) for keyword in keywords})
+                         for category, keywords in taxonomy.items()}
+        self.categories = {}  # keyword -> categories it belongs to
+        for category, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                self.categories.setdefault(keyword, []).append(category)
+        self.forms = {}  # matchable form -> keyword
+        for keyword in self.categories:
+            self.forms.setdefault(keyword, keyword)
+            if len(keyword) >= 3 and keyword[-1].isalpha() and keyword[-1] != 's':
+                self.forms.setdefault(keyword + 's', keyword)
+        self.pattern = re.compile(r'(?<!\w)' + trie_regex(self.forms) + r'(?!\w)',
+                                  re.IGNORECASE) if self.forms else None
+
+    def extract(self, *texts):
+        """Keywords found in any of the texts, as {category: sorted keywords}"""
+        found = set()
+        if self.pattern:
+            for text in texts:
+                if text:
+                    found.update(self.forms[' '.join(match.lower().split())] for match in self.pattern.findall(text))
+        by_category = {}
+        for keyword in sorted(found):
+            for category in self.categories[keyword]:
+                by_category.setdefault(category, []).append(keyword)
+        return by_category
+
+    def extract_many(self, documents):
+        """extract() for each document, a list of texts"""
+        return [self.extract(*texts) for texts in documents]
+
+
+class SkillTaxonomy:
+    """
+    The current SkillExtractor. With SKILL_TAXONOMY_PATH set, the JSON file there
+    ({category: [keywords]}) replaces AI_ML_SKILLS and is recompiled whenever it changes;
+    a file that fails to load leaves the last good taxonomy in place.
+    """
+
+    def __init__(self, default, path=None):
+        self.path = path
+        self.source = 'default'
+        self.error = None
+        self.loaded_at = datetime.utcnow()
+        self._mtime = None
+        self._extractor = SkillExtractor(default)
+        self._lock = threading.Lock()
+
+    def extractor(self):
+        if not self.path:
+            return self._extractor
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return self._extractor
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._load(mtime)
+        return self._extractor
+
+    def _load(self, mtime):
+        self._mtime = mtime
+        try:
+            with open(self.path) as f:
+                taxonomy = json.load(f)
+            if not isinstance(taxonomy, dict) or not all(
+                    isinstance(keywords, list) and all(isinstance(keyword, str) for keyword in keywords)
+                    for keywords in taxonomy.values()):
+                raise ValueError("taxonomy must map each category to a list of keywords")
+            self._extractor = SkillExtractor(taxonomy)
+            self.source = self.path
+            self.error = None
+            self.loaded_at = datetime.utcnow()
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            print(f"Skill taxonomy {self.path} not loaded: {e}")
+
+    def summary(self):
+        extractor = self.extractor()
+        return {
+            'source': self.source,
+            'loaded_at': self.loaded_at.isoformat(),
+            'error': self.error,
+            'keywords': len(extractor.categories),
+            'taxonomy': extractor.taxonomy
+        }
+
 
-    # Collect all text sources
-    text_sources = []
+skill_taxonomy = SkillTaxonomy(AI_ML_SKILLS, os.environ.get('SKILL_TAXONOMY_PATH'))
 
-    if candidate.bio:
-        text_sources.append(candidate.bio.lower())
-    if candidate.primary_expertise:
-        text_sources.append(candidate.primary_expertise.lower())
 
-    # Add publication titles and abstracts
-    for pub in candidate.publications:
-        if pub.title:
-            text_sources.append(pub.title.lower())
-        if hasattr(pub, 'abstract') and pub.abstract:
-            text_sources.append(pub.abstract.lower())
+def candidate_skill_texts(candidate_ids):
+    """Bio, expertise and publication titles and abstracts per candidate, in two queries"""
+    texts = {}
+    for row in db.session.query(Candidate.id, Candidate.bio, Candidate.primary_expertise).filter(
+            Candidate.id.in_(candidate_ids)):
+        texts[row.id] = [row.bio, row.primary_expertise]
+    for row in db.session.query(Publication.candidate_id, Publication.title, Publication.abstract).filter(
+            Publication.candidate_id.in_(candidate_ids)):
+        texts[row.candidate_id].extend((row.title, row.abstract))
+    return texts
 
-    # Combine all text
-    combined_text = ' '.join(text_sources)
 
-    # Extract skills by category
-    extracted_skills = {}
-    skill_count = 0
+def merge_skills(existing, extracted):
+    """
+    The existing comma-separated skills followed by any extracted ones they lack, joined
+    with ', '. Existing lists may be written with or without a space after the comma.
+    """
+    skills = [skill.strip() for skill in (existing or '').split(',') if skill.strip()]
+    known = {skill.lower() for skill in skills}
+    for skill in extracted:
+        if skill.lower() not in known:
+            known.add(skill.lower())
+            skills.append(skill)
+    return ', '.join(skills)
 
-    for category, keywords in AI_ML_SKILLS.items():
-        found_skills = []
-        for keyword in keywords:
-            if keyword in combined_text:
-                found_skills.append(keyword)
-                skill_count += 1
 
-        if found_skills:
-            extracted_skills[category] = list(set(found_skills))  # Remove duplicates
+@app.route('/api/candidates/<int:candidate_id>/extract-skills', methods=['POST'])
+def extract_skills_from_candidate(candidate_id):
+    """Auto-extract AI/ML skills from candidate's bio, publications, and GitHub"""
+    candidate = Candidate.query.get_or_404(candidate_id)
 
-    # Update candidate skills field
-    all_skills = []
-    for category_skills in extracted_skills.values():
-        all_skills.extend(category_skills)
+    extracted_skills = skill_taxonomy.extractor().extract(*candidate_skill_texts([candidate_id])[candidate_id])
+    all_skills = sorted({skill for skills in extracted_skills.values() for skill in skills})
 
     if all_skills:
         # Merge with existing skills
-        existing = candidate.skills.split(', ') if candidate.skills else []
-        combined = list(set(existing + all_skills))
-        candidate.skills = ', '.join(combined)
+        candidate.skills = merge_skills(candidate.skills, all_skills)
+        reindex_candidate_tokens(candidate)
         db.session.commit()
 
     return jsonify({
         "success": True,
-        "skills_extracted": skill_count,
+        "skills_extracted": sum(len(skills) for skills in extracted_skills.values()),
         "skills_by_category": extracted_skills,
         "total_skills": len(all_skills),
         "updated_skills": candidate.skills
     })
 
 
+# Candidates read and written per round trip by bulk skill extraction
+SKILL_EXTRACTION_BATCH_SIZE = 500
+
+
+@app.route('/api/candidates/extract-skills/bulk', methods=['POST'])
+def bulk_extract_skills():
+    """
+    Extract skills for many candidates in one call.
+
+    Body: {"candidate_ids": [...]} or {"filter": {"status", "expertise", "skills"}}, and
+    "dry_run": true to return each candidate's skills without saving them. Otherwise
+    skills, skill postings and text terms are written in batches and committed once.
+    """
+    data = request.get_json() or {}
+    candidate_ids, error = resolve_candidate_selection(data)
+    if error:
+        return error
+    dry_run = bool(data.get('dry_run'))
+
+    started = time.perf_counter()
+    extractor = skill_taxonomy.extractor()
+    keyword_counts = Counter()
+    results = []
+    updated = []
+    now = datetime.utcnow()
+
+    for batch_ids in chunked(candidate_ids, SKILL_EXTRACTION_BATCH_SIZE):
+        texts = candidate_skill_texts(batch_ids)
+        ids = [candidate_id for candidate_id in batch_ids if candidate_id in texts]
+        extracted = dict(zip(ids, extractor.extract_many(texts[candidate_id] for candidate_id in ids)))
+        for skills_by_category in extracted.values():
+            keyword_counts.update({skill for skills in skills_by_category.values() for skill in skills})
+        if dry_run:
+            results.extend({'candidate_id': candidate_id, 'skills_by_category': extracted[candidate_id]}
+                           for candidate_id in ids)
+            continue
+
+        changes = []
+        for row in db.session.query(Candidate.id, Candidate.skills, Candidate.primary_expertise).filter(
+                Candidate.id.in_(ids)):
+            skills = merge_skills(row.skills, sorted({skill for skills in extracted[row.id].values() for skill in skills}))
+            if skills != (row.skills or ''):
+                changes.append({'b_id': row.id, 'skills': skills, 'updated_at': now,
+                                'primary_expertise': row.primary_expertise})
+        if not changes:
+            continue
+
+        db.session.execute(Candidate.__table__.update().where(Candidate.id == db.bindparam('b_id')).values(
+            skills=db.bindparam('skills'), updated_at=db.bindparam('updated_at')),
+            [{'b_id': change['b_id'], 'skills': change['skills'], 'updated_at': now} for change in changes])
+        changed_ids = [change['b_id'] for change in changes]
+        CandidateToken.query.filter(CandidateToken.candidate_id.in_(changed_ids),
+                                    CandidateToken.kind == 'skill').delete(synchronize_session=False)
+        postings = [{'token': token, 'kind': kind, 'candidate_id': change['b_id']}
+                    for change in changes
+                    for token, kind in candidate_index_tokens(SimpleNamespace(**change)) if kind == 'skill']
+        for chunk in chunked(postings, 5000):
+            db.session.execute(CandidateToken.__table__.insert(), chunk)
+        updated.extend(changed_ids)
+
+    if updated:
+        # Core updates bypass flush events: queue the text-term reindex and snapshot refresh by hand
+        db.session.info.setdefault('term_index_changes', set()).update(updated)
+        db.session.info['analytics_changed'] = True
+    db.session.commit()
+
+    response = {
+        'processed': len(candidate_ids),
+        'updated': len(updated),
+        'dry_run': dry_run,
+        'keyword_counts': dict(keyword_counts.most_common()),
+        'took_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    if dry_run:
+        response['results'] = results
+    return jsonify(response)
+
+
+@app.route('/api/skills/taxonomy', methods=['GET'])
+def get_skill_taxonomy():
+    """The skill taxonomy in use, where it was loaded from, and any reload error"""
+    return jsonify(skill_taxonomy.summary())
+
+
 @app.route('/api/candidates/<int:candidate_id>/impact-score', methods=['GET'])
 def calculate_research_impact_score(candidate_id):
     """Calculate research impact score based on multiple factors"""
@@ -858,7 +3029,9 @@ def calculate_research_impact_score(candidate_id):
 
     # Publication Score (0-20 points)
     # 20+ publications is excellent
-    pub_count = len(candidate.publications)
+    pub_count, conference_pubs = db.session.query(
+        func.count(Publication.id), func.count(Publication.venue_class)
+    ).filter(Publication.candidate_id == candidate_id).one()
     score_breakdown['publication_score'] = min(pub_count, 20)
 
     # GitHub Activity Score (0-15 points)
@@ -869,14 +3042,7 @@ def calculate_research_impact_score(candidate_id):
         score_breakdown['github_score'] += min(candidate.github_repos / 20, 5)
 
     # Top Conference Publications (0-15 points)
-    # Publications in NeurIPS, ICML, CVPR, etc.
-    conference_pubs = 0
-    for pub in candidate.publications:
-        venue = pub.journal.upper() if pub.journal else ''
-        for conf in TOP_CONFERENCES:
-            if conf in venue:
-                conference_pubs += 1
-                break
+    # Publications in NeurIPS, ICML, CVPR, etc. (venue_class, counted above)
     score_breakdown['conference_score'] = min(conference_pubs * 3, 15)
 
     # Calculate total (out of 100)
@@ -918,169 +3084,364 @@ def calculate_research_impact_score(candidate_id):
     })
 
 
-@app.route('/api/jobs/<int:job_id>/match-candidates', methods=['POST'])
-def match_candidates_to_job(job_id):
-    """AI-powered candidate matching for a job"""
-    job = Job.query.get_or_404(job_id)
+# ==================== CANDIDATE FEATURE STORE ====================
+
+# updated_at is stamped at flush, not commit: each sync re-reads this far behind the watermark
+FEATURE_STORE_SYNC_WINDOW_SECONDS = int(os.environ.get('FEATURE_STORE_SYNC_WINDOW_SECONDS', 60))
+# How often the stored ids are checked against the table, whatever the row count says
+FEATURE_STORE_RECONCILE_SECONDS = int(os.environ.get('FEATURE_STORE_RECONCILE_SECONDS', 300))
+
+
+class CandidateFeatureStore:
+    """
+    NumPy-backed columns of the candidate fields used by job matching.
+    Skill overlap comes from the CandidateToken posting lists rather than this store.
+
+    Rows are refreshed incrementally: ORM writes made in this process are applied
+    when their transaction commits, and writes made by other workers are picked up
+    before each match by re-reading rows updated since FEATURE_STORE_SYNC_WINDOW_SECONDS
+    before the watermark. Deletes by other workers are found when the row count
+    differs, and by a full id check every FEATURE_STORE_RECONCILE_SECONDS.
+    """
+
+    NUMERIC_COLUMNS = ['h_index', 'citation_count', 'github_repos', 'github_followers', 'years_experience']
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.size = 0
+            self.loaded = False
+            self.watermark = None
+            self.reconciled_at = None  # time.monotonic() of the last id check
+            self.ids = np.zeros(0, dtype=np.int64)
+            self.features = np.zeros((0, len(self.NUMERIC_COLUMNS)), dtype=np.float64)
+            self.expertise_codes = np.zeros(0, dtype=np.int32)  # -1 = no expertise
+            self.expertise_values = []  # code -> lowercased expertise
+            self.expertise_lookup = {}  # lowercased expertise -> code
+            self.row_of = {}  # candidate id -> row
+
+    @staticmethod
+    def row_from_candidate(candidate):
+        """Snapshot the matching fields of a Candidate (or a column row with the same names)"""
+        return (
+            candidate.id,
+            candidate.h_index,
+            candidate.citation_count,
+            candidate.github_repos,
+            candidate.github_followers,
+            candidate.years_experience,
+            candidate.primary_expertise
+        )
 
-    # Get match parameters
-    data = request.get_json() or {}
-    min_score = data.get('min_score', 0)
-    top_n = data.get('top_n', 10)
-
-    # Get all candidates
-    candidates = Candidate.query.all()
-
-    # Calculate match score for each candidate
-    matches = []
-
-    for candidate in candidates:
-        match_score = 0
-        score_details = {}
-
-        # 1. Expertise Match (0-30 points)
-        expertise_score = 0
-        if job.required_expertise and candidate.primary_expertise:
-            job_expertise = job.required_expertise.lower()
-            candidate_expertise = candidate.primary_expertise.lower()
-
-            # Exact match
-            if candidate_expertise in job_expertise or job_expertise in candidate_expertise:
-                expertise_score = 30
-            # Partial match
-            elif any(word in job_expertise for word in candidate_expertise.split()):
-                expertise_score = 15
-
-        score_details['expertise_match'] = expertise_score
-        match_score += expertise_score
-
-        # 2. Skills Match (0-25 points)
-        skills_score = 0
-        if job.required_skills and candidate.skills:
-            job_skills = set(job.required_skills.lower().split(','))
-            candidate_skills = set(candidate.skills.lower().split(','))
-
-            # Count overlapping skills
-            overlap = len(job_skills.intersection(candidate_skills))
-            total_required = len(job_skills)
-
-            if total_required > 0:
-                skills_score = (overlap / total_required) * 25
-
-        score_details['skills_match'] = round(skills_score, 2)
-        match_score += skills_score
-
-        # 3. Research Impact (0-20 points)
-        # Use h-index and citations as proxy
-        impact_score = 0
-        if candidate.h_index:
-            impact_score += min(candidate.h_index, 10)
-        if candidate.citation_count:
-            impact_score += min(candidate.citation_count / 100, 10)
-
-        score_details['research_impact'] = round(impact_score, 2)
-        match_score += impact_score
-
-        # 4. Experience Level (0-15 points)
-        experience_score = 0
-        if candidate.years_experience:
-            # Assume job requires 5 years (adjust based on job.experience_required if available)
+    def _grow(self, rows):
+        """Make room for at least `rows` rows"""
+        capacity = len(self.ids)
+        if rows > capacity:
+            extra = max(rows, capacity * 2, 1024) - capacity
+            self.ids = np.concatenate([self.ids, np.zeros(extra, dtype=np.int64)])
+            self.features = np.vstack([self.features, np.zeros((extra, self.features.shape[1]))])
+            self.expertise_codes = np.concatenate([self.expertise_codes, np.full(extra, -1, dtype=np.int32)])
+
+    def _expertise_code(self, expertise):
+        if not expertise:
+            return -1
+        key = expertise.lower()
+        if key not in self.expertise_lookup:
+            self.expertise_lookup[key] = len(self.expertise_values)
+            self.expertise_values.append(key)
+        return self.expertise_lookup[key]
+
+    def _upsert(self, row):
+        candidate_id = row[0]
+        index = self.row_of.get(candidate_id)
+        if index is None:
+            index = self.size
+            self._grow(self.size + 1)
+            self.row_of[candidate_id] = index
+            self.size += 1
+
+        self.ids[index] = candidate_id
+        self.features[index] = [value or 0 for value in row[1:6]]
+        self.expertise_codes[index] = self._expertise_code(row[6])
+
+    def _remove(self, candidate_id):
+        index = self.row_of.pop(candidate_id, None)
+        if index is None:
+            return
+        last = self.size - 1
+        if index != last:
+            # Move the last row into the hole so the live rows stay contiguous
+            self.ids[index] = self.ids[last]
+            self.features[index] = self.features[last]
+            self.expertise_codes[index] = self.expertise_codes[last]
+            self.row_of[int(self.ids[index])] = index
+        self.size = last
+
+    def apply(self, changes):
+        """Apply {candidate_id: row or None} collected from committed ORM writes"""
+        if not changes:
+            return
+        with self._lock:
+            if not self.loaded:
+                return  # The first sync() loads everything anyway
+            for candidate_id, row in changes.items():
+                if row is None:
+                    self._remove(candidate_id)
+                else:
+                    self._upsert(row)
+
+    def _load_rows(self, query):
+        for row in query.yield_per(5000):
+            self._upsert(tuple(row))
+
+    def sync(self):
+        """Bring the store up to date with the candidate table"""
+        columns = (Candidate.id, Candidate.h_index, Candidate.citation_count, Candidate.github_repos,
+                   Candidate.github_followers, Candidate.years_experience, Candidate.primary_expertise)
+        count, latest = db.session.query(func.count(Candidate.id), func.max(Candidate.updated_at)).one()
+        now = time.monotonic()
+
+        with self._lock:
+            if not self.loaded:
+                self._load_rows(db.session.query(*columns))
+                self.loaded = True
+                self.reconciled_at = now
+            elif self.watermark is not None:
+                # A write flushed before the last sync may have committed after it with an older
+                # updated_at, so the window behind the watermark is read again every time
+                since = self.watermark - timedelta(seconds=FEATURE_STORE_SYNC_WINDOW_SECONDS)
+                self._load_rows(db.session.query(*columns).filter(Candidate.updated_at >= since))
+            elif latest:
+                self._load_rows(db.session.query(*columns))
+            if latest and (self.watermark is None or latest > self.watermark):
+                self.watermark = latest
+
+            if count != self.size or now - self.reconciled_at >= FEATURE_STORE_RECONCILE_SECONDS:
+                # Rows were deleted or added outside the watermark: match ids to the table
+                self.reconciled_at = now
+                live_ids = {row[0] for row in db.session.query(Candidate.id).yield_per(10000)}
+                for candidate_id in [cid for cid in self.row_of if cid not in live_ids]:
+                    self._remove(candidate_id)
+                missing = live_ids.difference(self.row_of)
+                if missing:
+                    self._load_rows(db.session.query(*columns).filter(Candidate.id.in_(missing)))
+
+    def score_job(self, job, skill_overlap, min_score=0, top_n=10):
+        """
+        Score every candidate against a job with array operations.
+        `skill_overlap` maps candidate id -> number of the job's required skills they have.
+        Returns (total_evaluated, matches_found, [(candidate_id, total, breakdown), ...]).
+        """
+        with self._lock:
+            n = self.size
+            ids = self.ids[:n]
+            features = self.features[:n]
+            h_index, citations, repos, followers, years = (features[:, i] for i in range(len(self.NUMERIC_COLUMNS)))
+
+            # 1. Expertise Match (0-30 points), scored once per distinct expertise value
+            expertise_score = np.zeros(n)
+            if job.required_expertise and self.expertise_values:
+                job_expertise = job.required_expertise.lower()
+                per_value = np.zeros(len(self.expertise_values) + 1)  # trailing slot for code -1
+                for code, candidate_expertise in enumerate(self.expertise_values):
+                    if candidate_expertise in job_expertise or job_expertise in candidate_expertise:
+                        per_value[code] = 30
+                    elif any(word in job_expertise for word in candidate_expertise.split()):
+                        per_value[code] = 15
+                expertise_score = per_value[self.expertise_codes[:n]]
+
+            # 2. Skills Match (0-25 points)
+            skills_score = np.zeros(n)
+            job_skills = normalize_skill_tokens(job.required_skills)
+            if job_skills:
+                overlap = np.zeros(n)
+                rows = [(self.row_of[cid], count) for cid, count in skill_overlap.items() if cid in self.row_of]
+                if rows:
+                    index, counts = zip(*rows)
+                    overlap[list(index)] = counts
+                skills_score = overlap / len(job_skills) * 25
+
+            # 3. Research Impact (0-20 points)
+            impact_score = np.minimum(h_index, 10) + np.minimum(citations / 100, 10)
+
+            # 4. Experience Level (0-15 points)
             target_years = 5
             if hasattr(job, 'experience_required') and job.experience_required:
                 target_years = job.experience_required
+            experience_score = np.where(years != 0, np.maximum(15 - np.abs(years - target_years) * 2, 0), 0)
 
-            # Perfect match at target, decay above/below
-            diff = abs(candidate.years_experience - target_years)
-            experience_score = max(15 - diff * 2, 0)
-
-        score_details['experience_match'] = round(experience_score, 2)
-        match_score += experience_score
-
-        # 5. GitHub Activity (0-10 points)
-        github_score = 0
-        if candidate.github_repos:
-            github_score += min(candidate.github_repos / 10, 5)
-        if candidate.github_followers:
-            github_score += min(candidate.github_followers / 50, 5)
-
-        score_details['github_activity'] = round(github_score, 2)
-        match_score += github_score
-
-        # Total score (out of 100)
-        total_score = round(match_score, 2)
-
-        # Only include if above minimum score
-        if total_score >= min_score:
-            matches.append({
-                'candidate_id': candidate.id,
-                'candidate_name': f"{candidate.first_name} {candidate.last_name}",
-                'email': candidate.email,
-                'match_score': total_score,
-                'score_breakdown': score_details,
-                'primary_expertise': candidate.primary_expertise,
-                'h_index': candidate.h_index,
-                'citations': candidate.citation_count,
-                'github_url': candidate.github_url
-            })
+            # 5. GitHub Activity (0-10 points)
+            github_score = np.minimum(repos / 10, 5) + np.minimum(followers / 50, 5)
+
+            total = np.round(expertise_score + skills_score + impact_score + experience_score + github_score, 2)
+
+            selected = np.flatnonzero(total >= min_score)
+            matches_found = len(selected)
+            top_n = max(int(top_n), 0)
+            if top_n == 0:
+                selected = selected[:0]
+            elif top_n < len(selected):
+                # Keep the top-N (plus ties at the cut-off) without sorting everything
+                cut = np.argpartition(-total[selected], top_n - 1)[top_n - 1]
+                selected = selected[total[selected] >= total[selected][cut]]
+            # Highest score first, ties broken by candidate id
+            selected = selected[np.lexsort((ids[selected], -total[selected]))][:top_n]
+
+            results = []
+            for i in selected:
+                results.append((int(ids[i]), float(total[i]), {
+                    'expertise_match': int(expertise_score[i]),
+                    'skills_match': round(float(skills_score[i]), 2),
+                    'research_impact': round(float(impact_score[i]), 2),
+                    'experience_match': round(float(experience_score[i]), 2),
+                    'github_activity': round(float(github_score[i]), 2)
+                }))
+
+            return n, matches_found, results
+
+
+candidate_features = CandidateFeatureStore()
+
+
+@event.listens_for(Candidate, 'after_insert')
+@event.listens_for(Candidate, 'after_update')
+def _track_candidate_features(mapper, connection, target):
+    session = object_session(target)
+    session.info.setdefault('candidate_features', {})[target.id] = CandidateFeatureStore.row_from_candidate(target)
+
+
+@event.listens_for(Candidate, 'after_delete')
+def _untrack_candidate_features(mapper, connection, target):
+    session = object_session(target)
+    session.info.setdefault('candidate_features', {})[target.id] = None
 
-    # Sort by match score (descending)
-    matches.sort(key=lambda x: x['match_score'], reverse=True)
 
-    # Return top N matches
-    top_matches = matches[:top_n]
+@event.listens_for(Session, 'after_commit')
+def _apply_candidate_features(session):
+    candidate_features.apply(session.info.pop('candidate_features', None))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_candidate_features(session):
+    session.info.pop('candidate_features', None)
+
+
+@app.route('/api/jobs/<int:job_id>/match-candidates', methods=['POST'])
+def match_candidates_to_job(job_id):
+    """AI-powered candidate matching for a job"""
+    job = Job.query.get_or_404(job_id)
+
+    # Get match parameters
+    data = request.get_json() or {}
+    try:
+        min_score = float(data.get('min_score', 0))
+        top_n = int(data.get('top_n', 10))
+        if not math.isfinite(min_score) or not 1 <= top_n <= MAX_PAGE_SIZE:
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({"error": f"min_score must be a number and top_n an integer from 1 to {MAX_PAGE_SIZE}"}), 400
+
+    # Skill overlap from the posting lists, everything else from the precomputed feature matrix
+    skill_overlap = skill_overlap_counts(normalize_skill_tokens(job.required_skills))
+    candidate_features.sync()
+    total_evaluated, matches_found, scored = candidate_features.score_job(job, skill_overlap, min_score, top_n)
+
+    # Only the top N candidates are loaded for display
+    top_ids = [candidate_id for candidate_id, _, _ in scored]
+    details = {}
+    if top_ids:
+        rows = db.session.query(
+            Candidate.id, Candidate.first_name, Candidate.last_name, Candidate.email,
+            Candidate.primary_expertise, Candidate.h_index, Candidate.citation_count, Candidate.github_url
+        ).filter(Candidate.id.in_(top_ids)).all()
+        details = {row.id: row for row in rows}
+
+    top_matches = []
+    for candidate_id, total_score, score_details in scored:
+        candidate = details.get(candidate_id)
+        if not candidate:
+            continue
+        top_matches.append({
+            'candidate_id': candidate.id,
+            'candidate_name': f"{candidate.first_name} {candidate.last_name}",
+            'email': candidate.email,
+            'match_score': total_score,
+            'score_breakdown': score_details,
+            'primary_expertise': candidate.primary_expertise,
+            'h_index': candidate.h_index,
+            'citations': candidate.citation_count,
+            'github_url': candidate.github_url
+        })
 
     return jsonify({
         "job_id": job_id,
         "job_title": job.title,
-        "total_candidates_evaluated": len(candidates),
-        "matches_found": len(matches),
+        "total_candidates_evaluated": total_evaluated,
+        "matches_found": matches_found,
         "top_matches": top_matches
     })
 
 
 @app.route('/api/publications/analyze-conferences', methods=['GET'])
 def analyze_conference_publications():
-    """Analyze all publications to identify top conference papers"""
-    all_publications = Publication.query.all()
-
-    conference_stats = {}
-    top_conference_papers = []
-
-    for pub in all_publications:
-        venue = pub.journal.upper() if pub.journal else ''
-
-        # Check if it's a top conference
-        for conf in TOP_CONFERENCES:
-            if conf in venue:
-                # Track conference stats
-                if conf not in conference_stats:
-                    conference_stats[conf] = 0
-                conference_stats[conf] += 1
-
-                # Add to top conference papers
-                candidate = Candidate.query.get(pub.candidate_id)
-                top_conference_papers.append({
-                    'publication_id': pub.id,
-                    'title': pub.title,
-                    'conference': conf,
-                    'year': pub.year,
-                    'citations': pub.citations,
-                    'candidate_name': f"{candidate.first_name} {candidate.last_name}" if candidate else 'Unknown',
-                    'candidate_id': pub.candidate_id
-                })
-                break
-
-    # Sort conferences by paper count
-    sorted_conferences = sorted(conference_stats.items(), key=lambda x: x[1], reverse=True)
-
-    # Sort papers by citations
-    top_conference_papers.sort(key=lambda x: x['citations'] or 0, reverse=True)
+    """
+    Analyze all publications to identify top conference papers. A paper written by
+    several candidates is counted once, under the class of the shared paper's venue,
+    and lists every one of them.
+    """
+    # One row per paper: the shared paper id, or minus the publication id for unlinked rows
+    paper_key = func.coalesce(Publication.paper_id, -Publication.id)
+    total_authorships, total_papers = db.session.query(
+        func.count(Publication.id), func.count(func.distinct(paper_key))
+    ).one()
+
+    # Classified papers some candidate still has a publication for
+    has_authors = db.session.query(Publication.id).filter(Publication.paper_id == Paper.id).exists()
+    classified = db.session.query(Paper).filter(Paper.venue_class.isnot(None), has_authors)
+    conference_stats = classified.with_entities(Paper.venue_class, func.count()).group_by(
+        Paper.venue_class
+    ).order_by(func.count().desc()).all()
+
+    # Top papers by citations, with their candidate authors in one joined query
+    top = classified.with_entities(
+        Paper.id, Paper.venue_class, Paper.title, Paper.year, Paper.citation_count
+    ).order_by(Paper.citation_count.desc(), Paper.id).limit(50).all()
+    authors = {}
+    first_publication = {}
+    if top:
+        for paper_id, publication_id, candidate_id, first_name, last_name in db.session.query(
+                Publication.paper_id, Publication.id, Candidate.id, Candidate.first_name, Candidate.last_name
+        ).join(Candidate, Candidate.id == Publication.candidate_id).filter(
+                Publication.paper_id.in_([row[0] for row in top])
+        ).order_by(Publication.id):
+            first_publication.setdefault(paper_id, publication_id)
+            authors.setdefault(paper_id, []).append({'candidate_id': candidate_id,
+                                                     'candidate_name': f"{first_name} {last_name}"})
+
+    papers = []
+    for paper_id, conference, title, year, citation_count in top:
+        candidates = authors.get(paper_id, [])
+        papers.append({
+            'publication_id': first_publication.get(paper_id),
+            'paper_id': paper_id,
+            'title': title,
+            'conference': conference,
+            'year': year,
+            'citations': citation_count,
+            'candidate_name': candidates[0]['candidate_name'] if candidates else 'Unknown',
+            'candidate_id': candidates[0]['candidate_id'] if candidates else None,
+            'candidates': candidates
+        })
 
     return jsonify({
-        "total_publications": len(all_publications),
-        "top_conference_papers": len(top_conference_papers),
-        "conference_breakdown": dict(sorted_conferences),
-        "papers": top_conference_papers[:50]  # Return top 50
+        "total_publications": total_papers,
+        "total_authorships": total_authorships,
+        "top_conference_papers": sum(count for _, count in conference_stats),
+        "conference_breakdown": dict(conference_stats),
+        "papers": papers  # Return top 50
     })
 
 
@@ -1095,19 +3456,23 @@ def get_jobs():
     if status:
         query = query.filter_by(status=status)
 
-    jobs = query.order_by(Job.posted_date.desc()).all()
-    return jsonify({
-        "jobs": [j.to_dict() for j in jobs],
-        "total": len(jobs)
-    })
+    return list_response(query, Job, 'jobs', serialize_jobs, Job.posted_date.desc(),
+                         hidden_columns=['confidential'], mask=mask_confidential_company)
+
+
+def mask_confidential_company(item, row):
+    """Apply stealth mode to a projected job row"""
+    if 'company' in item and row.confidential:
+        item['company'] = 'Confidential Company'
 
 
 @app.route('/api/jobs/<int:job_id>', methods=['GET'])
 def get_job(job_id):
     """Get single job"""
     job = Job.query.get_or_404(job_id)
-    data = job.to_dict()
-    data['applications'] = [app.to_dict() for app in job.applications]
+    applications = Application.query.filter_by(job_id=job_id).options(*candidate_and_job_options(Application)).all()
+    data = job.to_dict(application_count=len(applications))
+    data['applications'] = [app.to_dict() for app in applications]
     return jsonify(data)
 
 
@@ -1182,11 +3547,8 @@ def reveal_job_company(job_id):
 @app.route('/api/applications', methods=['GET'])
 def get_applications():
     """Get all applications"""
-    applications = Application.query.order_by(Application.applied_date.desc()).all()
-    return jsonify({
-        "applications": [a.to_dict() for a in applications],
-        "total": len(applications)
-    })
+    return list_response(Application.query, Application, 'applications', lambda rows: [a.to_dict() for a in rows],
+                         Application.applied_date.desc(), options=candidate_and_job_options(Application))
 
 
 @app.route('/api/applications', methods=['POST'])
@@ -1211,6 +3573,7 @@ def create_application():
     )
 
     db.session.add(application)
+    record_status_transition('application', application, None)
     db.session.commit()
 
     return jsonify(application.to_dict()), 201
@@ -1221,12 +3584,14 @@ def update_application(application_id):
     """Update application"""
     application = Application.query.get_or_404(application_id)
     data = request.get_json()
+    previous_status = application.status
 
     for field in ['status', 'stage', 'source', 'technical_score', 'research_score',
                   'culture_fit_score', 'overall_score', 'notes']:
         if field in data:
             setattr(application, field, data[field])
 
+    record_status_transition('application', application, previous_status)
     db.session.commit()
     return jsonify(application.to_dict())
 
@@ -1275,6 +3640,7 @@ def create_publication():
         keywords=data.get('keywords'),
         abstract=data.get('abstract')
     )
+    publication.paper_id = resolve_papers([publication_paper_fields(publication)])[0].id
 
     db.session.add(publication)
     db.session.commit()
@@ -1291,32 +3657,146 @@ def delete_publication(publication_id):
     return jsonify({"message": "Publication deleted successfully"})
 
 
+# ==================== FULL-TEXT SEARCH ====================
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+FTS_TERM_PATTERN = re.compile(r'\w+\*?')
+
+
+def fts5_match_expression(query):
+    """Quote each term of free text for FTS5 MATCH (implicit AND; a trailing * keeps prefix matching)"""
+    terms = []
+    for term in FTS_TERM_PATTERN.findall(query):
+        terms.append(f'"{term.rstrip("*")}"' + ('*' if term.endswith('*') else ''))
+    return ' '.join(terms)
+
+
+def search_full_text(table, query, limit, offset):
+    """Ranked [(id, score, snippet)] from one full-text index, best match first"""
+    columns, weights = FULL_TEXT_INDEXES[table]
+    params = {'limit': limit, 'offset': offset}
+
+    if db.engine.dialect.name == 'postgresql':
+        # Rank and page on the index first; ts_headline only runs for the returned page
+        document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+        sql = (
+            f"SELECT id, score, ts_headline('english', {document}, q, "
+            f"'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=16, MinWords=4') "
+            f"FROM (SELECT t.id, ts_rank_cd(t.search_vector, q) AS score, q, "
+            f"{', '.join(f't.{column}' for column in columns)} "
+            f"FROM {table} t, websearch_to_tsquery('english', :query) q "
+            f"WHERE t.search_vector @@ q ORDER BY score DESC, t.id LIMIT :limit OFFSET :offset) ranked "
+            f"ORDER BY score DESC, id"
+        )
+        params['query'] = query
+    else:
+        params['query'] = fts5_match_expression(query)
+        if not params['query']:
+            return []
+        fts = f'{table}_fts'
+        rank = f"bm25({fts}, {', '.join(str(weight) for weight in weights)})"
+        sql = (
+            f"SELECT rowid, -{rank}, snippet({fts}, -1, '<mark>', '</mark>', '…', 16) "
+            f"FROM {fts} WHERE {fts} MATCH :query ORDER BY {rank} LIMIT :limit OFFSET :offset"
+        )
+
+    return [(row[0], round(float(row[1]), 6), row[2]) for row in db.session.execute(text(sql), params)]
+
+
+def candidate_search_results(hits):
+    candidates = {c.id: c for c in Candidate.query.filter(Candidate.id.in_([hit[0] for hit in hits]))}
+    return [{
+        'id': c.id,
+        'full_name': f"{c.first_name} {c.last_name}",
+        'primary_expertise': c.primary_expertise,
+        'status': c.status,
+        'location': c.location,
+        'score': score,
+        'snippet': snippet
+    } for c, score, snippet in ((candidates.get(i), score, snippet) for i, score, snippet in hits) if c]
+
+
+def publication_search_results(hits):
+    publications = {p.id: p for p in Publication.query.options(joinedload(Publication.candidate))
+                    .filter(Publication.id.in_([hit[0] for hit in hits]))}
+    return [{
+        'id': p.id,
+        'candidate_id': p.candidate_id,
+        'candidate_name': f"{p.candidate.first_name} {p.candidate.last_name}" if p.candidate else None,
+        'title': p.title,
+        'venue': p.venue,
+        'year': p.year,
+        'score': score,
+        'snippet': snippet
+    } for p, score, snippet in ((publications.get(i), score, snippet) for i, score, snippet in hits) if p]
+
+
+@app.route('/api/search', methods=['GET'])
+def full_text_search():
+    """
+    Ranked full-text search over candidate skills/bio/notes and publication title/keywords/abstract.
+
+    ?q=<terms> (every term must match; 'transform*' matches by prefix),
+    ?type=all|candidates|publications, ?limit and ?offset page each result list.
+    Snippets wrap matched terms in <mark>.
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    search_type = request.args.get('type', 'all')
+    if search_type not in ('all', 'candidates', 'publications'):
+        return jsonify({"error": "type must be one of: all, candidates, publications"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    started = time.perf_counter()
+    response = {'query': query}
+    try:
+        if search_type in ('all', 'candidates'):
+            response['candidates'] = candidate_search_results(search_full_text('candidate', query, limit, offset))
+        if search_type in ('all', 'publications'):
+            response['publications'] = publication_search_results(search_full_text('publication', query, limit, offset))
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return jsonify({"error": "Full-text search is not available on this database"}), 503
+
+    response['took_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return jsonify(response)
+
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild and optimize the SQLite FTS5 indexes (Postgres columns are maintained by the database)"""
+    if db.engine.dialect.name != 'sqlite':
+        print("Nothing to rebuild: search vectors are generated columns")
+        return
+    for table in FULL_TEXT_INDEXES:
+        fts = f'{table}_fts'
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('optimize')"))
+        print(f"Rebuilt {fts}")
+    db.session.commit()
+
+
 # ==================== STATS & DASHBOARD ====================
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get dashboard statistics"""
-    total_candidates = Candidate.query.count()
-    total_jobs = Job.query.count()
-    total_applications = Application.query.count()
-
-    active_candidates = Candidate.query.filter(Candidate.status.in_(['reviewing', 'interviewing'])).count()
-    open_jobs = Job.query.filter_by(status='open').count()
-
-    # Top expertise areas
-    candidates = Candidate.query.all()
-    expertise_counts = {}
-    for c in candidates:
-        if c.primary_expertise:
-            expertise_counts[c.primary_expertise] = expertise_counts.get(c.primary_expertise, 0) + 1
+    metrics = pipeline_metrics()
+    candidate_statuses = metrics['candidate_statuses']
 
     return jsonify({
-        "total_candidates": total_candidates,
-        "total_jobs": total_jobs,
-        "total_applications": total_applications,
-        "active_candidates": active_candidates,
-        "open_jobs": open_jobs,
-        "top_expertise_areas": expertise_counts
+        "total_candidates": sum(candidate_statuses.values()),
+        "total_jobs": sum(metrics['job_statuses'].values()),
+        "total_applications": metrics['total_applications'],
+        "active_candidates": candidate_statuses.get('reviewing', 0) + candidate_statuses.get('interviewing', 0),
+        "open_jobs": metrics['job_statuses'].get('open', 0),
+        "top_expertise_areas": metrics['expertise_counts']
     })
 
 
@@ -1357,6 +3837,13 @@ def execute_boolean_search():
             'results': []
         }
 
+    # Internal Search (our own candidates and publications)
+    if 'Internal' in data_sources:
+        try:
+            results['results']['Internal'] = run_local_boolean_search(query)
+        except BooleanQueryError as e:
+            results['results']['Internal'] = {'error': str(e), 'candidates': []}
+
     # Google Scholar Search (no official API)
     if 'Google Scholar' in data_sources:
         results['results']['Google Scholar'] = {
@@ -1368,11 +3855,995 @@ def execute_boolean_search():
     return jsonify(results), 200
 
 
+# ==================== BOOLEAN QUERY ENGINE ====================
+
+BOOLEAN_TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+BOOLEAN_OPERATORS = ('AND', 'OR', 'NOT')
+BOOLEAN_MAX_TERMS = 200
+LOCAL_SEARCH_DEFAULT_LIMIT = 50
+# Once the running AND result is this small, later posting lists are fetched only within it
+POSTING_RESTRICT_THRESHOLD = 2000
+
+
+class BooleanQueryError(ValueError):
+    """Malformed boolean query"""
+
+
+def tokenize_boolean_query(query):
+    """Split a boolean query into (kind, value) tokens: '(', ')', AND, OR, NOT, PHRASE, WORD"""
+    query = re.sub(r'#.*', '', query)  # comments, as in extract_keywords_from_boolean
+    tokens = []
+    position = 0
+    while query[position:].strip():
+        match = BOOLEAN_TOKEN_PATTERN.match(query, position)
+        if not match:
+            raise BooleanQueryError(f"Unterminated quote at position {query.index(chr(34), position)}")
+        open_paren, close_paren, phrase, word = match.groups()
+        if open_paren:
+            tokens.append(('(', None))
+        elif close_paren:
+            tokens.append((')', None))
+        elif phrase is not None:
+            tokens.append(('PHRASE', phrase))
+        elif word.upper() in BOOLEAN_OPERATORS:
+            tokens.append((word.upper(), None))
+        else:
+            tokens.append(('WORD', word))
+        position = match.end()
+    return tokens
+
+
+def term_node(word, phrase=False):
+    """AST node for a word or quoted phrase, normalized like the 'term' postings"""
+    prefix = not phrase and word.endswith('*')
+    words = EXPERTISE_TOKEN_PATTERN.findall(word.lower())
+    if not words:
+        return None
+    if prefix and len(words) == 1:
+        return ('prefix', words[0])
+    if len(words) == 1:
+        return ('term', words[0])
+    # 'scikit-learn' or "deep learning": every word must match, adjacent and in order
+    return ('phrase', tuple(words))
+
+
+def parse_boolean_query(query):
+    """
+    Parse AND/OR/NOT (case-insensitive), parentheses, "quoted phrases" and trailing-*
+    prefixes into a tuple AST. Adjacent operands are ANDed; NOT binds tightest, then AND, then OR.
+    """
+    tokens = tokenize_boolean_query(query)
+    position = 0
+    terms = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() == 'OR':
+            take()
+            children.append(parse_and())
+        children = [child for child in children if child]
+        return children[0] if len(children) == 1 else ('or', tuple(children)) if children else None
+
+    def parse_and():
+        children = [parse_unary()]
+        while peek() in ('AND', 'NOT', 'WORD', 'PHRASE', '('):
+            if peek() == 'AND':
+                take()
+            children.append(parse_unary())
+        children = [child for child in children if child]
+        return children[0] if len(children) == 1 else ('and', tuple(children)) if children else None
+
+    def parse_unary():
+        nonlocal terms
+        kind, value = take() if position < len(tokens) else (None, None)
+        if kind == 'NOT':
+            child = parse_unary()
+            return ('not', child) if child else None
+        if kind == '(':
+            node = parse_or()
+            if peek() != ')':
+                raise BooleanQueryError("Missing closing parenthesis")
+            take()
+            return node
+        if kind in ('WORD', 'PHRASE'):
+            terms += 1
+            if terms > BOOLEAN_MAX_TERMS:
+                raise BooleanQueryError(f"Query has more than {BOOLEAN_MAX_TERMS} terms")
+            return term_node(value, phrase=kind == 'PHRASE')
+        raise BooleanQueryError(f"Expected a term but found {kind or 'end of query'}")
+
+    node = parse_or()
+    if position < len(tokens):
+        raise BooleanQueryError(f"Unexpected {tokens[position][0]} after a complete expression")
+    if node is None:
+        raise BooleanQueryError("Query has no searchable terms")
+    return node
+
+
+def describe_node(node):
+    kind = node[0]
+    if kind == 'term':
+        return node[1]
+    if kind == 'prefix':
+        return f"{node[1]}*"
+    if kind == 'phrase':
+        return f'"{" ".join(node[1])}"'
+    if kind == 'not':
+        return f"NOT {describe_node(node[1])}"
+    return f"({f' {kind.upper()} '.join(describe_node(child) for child in node[1])})"
+
+
+class BooleanQueryEngine:
+    """
+    Evaluate a parsed boolean query as set operations over the 'term' posting lists.
+
+    AND evaluates its operands cheapest-first (by posting-list size), stops as soon as
+    the running result is empty, and once that result is small fetches later posting lists
+    only within it; NOT inside an AND is a difference against the running result. The plan
+    records estimates, match counts and skipped operands.
+    """
+
+    def __init__(self, session=None):
+        self.session = session or db.session
+        self._estimates = {}
+        self._universe = None
+
+    def universe(self):
+        if self._universe is None:
+            self._universe = {row[0] for row in self.session.query(Candidate.id)}
+        return self._universe
+
+    def posting_query(self, node):
+        query = self.session.query(CandidateToken.candidate_id).filter(CandidateToken.kind == 'term')
+        if node[0] == 'prefix':
+            start = node[1]
+            end = start[:-1] + chr(ord(start[-1]) + 1)
+            return query.filter(CandidateToken.token >= start, CandidateToken.token < end)
+        return query.filter(CandidateToken.token == node[1])
+
+    def estimate(self, node):
+        """Upper bound on matches, from posting-list sizes (cached per query)"""
+        key = node
+        if key in self._estimates:
+            return self._estimates[key]
+        kind = node[0]
+        if kind in ('term', 'prefix'):
+            value = self.posting_query(node).with_entities(func.count()).scalar()
+        elif kind == 'phrase':
+            value = min(self.estimate(('term', word)) for word in node[1])
+        elif kind == 'and':
+            positives = [self.estimate(child) for child in node[1] if child[0] != 'not']
+            value = min(positives) if positives else len(self.universe())
+        elif kind == 'or':
+            value = sum(self.estimate(child) for child in node[1])
+        else:
+            value = len(self.universe())
+        self._estimates[key] = value
+        return value
+
+    def fetch_postings(self, node, within):
+        query = self.posting_query(node)
+        restricted = within is not None and len(within) <= POSTING_RESTRICT_THRESHOLD
+        if restricted:
+            if not within:
+                return set(), True
+            query = query.filter(CandidateToken.candidate_id.in_(within))
+        ids = {row[0] for row in query}
+        return (ids & within if within is not None else ids), restricted
+
+    def phrase_matches(self, words, candidate_ids):
+        """Keep candidates whose text (or a publication's) contains the words adjacent and in order"""
+        width = len(words)
+        matched = set()
+        ids = sorted(candidate_ids)
+        for start in range(0, len(ids), 500):
+            for candidate_id, texts in candidate_term_texts(ids[start:start + 500], self.session).items():
+                for value in texts:
+                    tokens = EXPERTISE_TOKEN_PATTERN.findall(value.lower()) if value else []
+                    if any(tuple(tokens[i:i + width]) == words for i in range(len(tokens) - width + 1)):
+                        matched.add(candidate_id)
+                        break
+        return matched
+
+    def evaluate(self, node, within=None):
+        """Return (candidate ids, plan) for node, restricted to within when given"""
+        kind = node[0]
+        plan = {'op': kind.upper(), 'expression': describe_node(node)}
+
+        if kind in ('term', 'prefix'):
+            ids, restricted = self.fetch_postings(node, within)
+            plan.update({'postings': self.estimate(node), 'restricted': restricted})
+
+        elif kind == 'phrase':
+            words = [('term', word) for word in node[1]]
+            ids, children = self.evaluate_and(words, within)
+            plan['children'] = children
+            ids = self.phrase_matches(node[1], ids) if ids else ids
+
+        elif kind == 'and':
+            ids, plan['children'] = self.evaluate_and(node[1], within)
+
+        elif kind == 'or':
+            ids = set()
+            plan['children'] = []
+            for child in node[1]:
+                if within is not None and len(ids) == len(within):
+                    # Every candidate in scope already matches
+                    plan['children'].append({'op': child[0].upper(), 'expression': describe_node(child), 'skipped': True})
+                    continue
+                child_ids, child_plan = self.evaluate(child, within)
+                ids |= child_ids
+                plan['children'].append(child_plan)
+
+        else:  # not
+            scope = within if within is not None else self.universe()
+            excluded, child_plan = self.evaluate(node[1], scope)
+            ids = scope - excluded
+            plan['children'] = [child_plan]
+
+        plan['matched'] = len(ids)
+        return ids, plan
+
+    def evaluate_and(self, children, within):
+        positives = sorted((child for child in children if child[0] != 'not'), key=self.estimate)
+        negatives = [child for child in children if child[0] == 'not']
+        result = within
+        plans = []
+        for child in positives + negatives:
+            if result is not None and not result:
+                plans.append({'op': child[0].upper(), 'expression': describe_node(child), 'skipped': True})
+                continue
+            if child[0] == 'not':
+                scope = result if result is not None else self.universe()
+                excluded, child_plan = self.evaluate(child[1], scope)
+                result = scope - excluded
+                child_plan = {'op': 'NOT', 'expression': describe_node(child), 'children': [child_plan],
+                              'matched': len(result)}
+            else:
+                ids, child_plan = self.evaluate(child, result)
+                result = ids if result is None else result & ids
+                child_plan['estimate'] = self.estimate(child)
+            plans.append(child_plan)
+        return (result if result is not None else set()), plans
+
+
+def run_local_boolean_search(query, limit=LOCAL_SEARCH_DEFAULT_LIMIT, offset=0):
+    """Evaluate a boolean query against our candidates; raises BooleanQueryError"""
+    started = time.perf_counter()
+    node = parse_boolean_query(query)
+    ids, plan = BooleanQueryEngine().evaluate(node)
+
+    page = sorted(ids, reverse=True)[offset:offset + limit]
+    candidates = {c.id: c for c in Candidate.query.filter(Candidate.id.in_(page))} if page else {}
+    return {
+        'query': query,
+        'parsed': describe_node(node),
+        'total': len(ids),
+        'candidates': serialize_candidates([candidates[i] for i in page if i in candidates]),
+        'plan': plan,
+        'took_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+@app.route('/api/boolean-search/local', methods=['POST'])
+def execute_local_boolean_search():
+    """
+    Run a boolean query against our own candidates and their publications, without GitHub.
+
+    Body: {"query": "...", "limit": 50, "offset": 0}. Results are newest first; "plan"
+    shows how the query was evaluated.
+    """
+    data = request.get_json() or {}
+    if not data.get('query'):
+        return jsonify({"error": "Query is required"}), 400
+    try:
+        limit = min(max(int(data.get('limit', LOCAL_SEARCH_DEFAULT_LIMIT)), 1), MAX_PAGE_SIZE)
+        offset = max(int(data.get('offset', 0)), 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    try:
+        return jsonify(run_local_boolean_search(data['query'], limit, offset))
+    except BooleanQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+# ==================== HTTP RESPONSE CACHE ====================
+
+class CachedResponse:
+    """The parts of requests.Response the enrichment code reads, rebuilt from a cache entry"""
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = body
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def replayable_headers(headers):
+    """Response headers minus X-RateLimit-*, which describe the budget when the response was fetched"""
+    return CaseInsensitiveDict({name: value for name, value in headers.items()
+                                if not name.lower().startswith('x-ratelimit-')})
+
+
+class HttpResponseCache:
+    """
+    On-disk (SQLite) cache of GET responses keyed by URL.
+
+    Fresh entries are served without a request. Expired entries are revalidated with
+    If-None-Match, so an unchanged payload costs a 304 (which GitHub does not count
+    against the rate limit). The least recently used entries are evicted past max_entries.
+    Hits record their use in memory; the last_used updates are written in batches of
+    `touch_batch` (and before any eviction) so a read does not cost a commit.
+    """
+
+    def __init__(self, path, max_entries=5000, touch_batch=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._touched = {}  # url -> last hit not yet written
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+
+    def _connection(self):
+        # sqlite3 connections are per thread; the GitHub fan-out uses several threads.
+        # The file is created on first use rather than when the app is imported.
+        if not hasattr(self._local, 'connection'):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_last_used ON http_cache (last_used)")
+            connection.commit()
+            self._local.connection = connection
+        return self._local.connection
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _touch(self, url, now):
+        with self._lock:
+            self._touched[url] = now
+            if len(self._touched) < self.touch_batch:
+                return
+        self._flush_touches()
+
+    def _flush_touches(self):
+        """Write the pending last_used updates in one transaction"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            connection = self._connection()
+            connection.executemany("UPDATE http_cache SET last_used = MAX(last_used, ?) WHERE url = ?",
+                                   [(used, url) for url, used in touched.items()])
+            connection.commit()
+
+    def _store(self, url, response, ttl, now):
+        self._flush_touches()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO http_cache (url, status, headers, body, etag, expires_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, response.status_code, json.dumps(dict(replayable_headers(response.headers))), response.content,
+             response.headers.get('ETag'), now + ttl, now)
+        )
+        evicted = connection.execute(
+            "DELETE FROM http_cache WHERE url IN "
+            "(SELECT url FROM http_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        connection.commit()
+        self._count('stores')
+        if evicted:
+            with self._lock:
+                self.stats['evictions'] += evicted
+
+    def get(self, url, headers=None, ttl=3600, timeout=10, session=requests):
+        """GET `url` through the cache; only 200 responses are stored"""
+        connection = self._connection()
+        now = time.time()
+        entry = connection.execute(
+            "SELECT status, headers, body, etag, expires_at FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+
+        if entry and entry[4] > now:
+            self._touch(url, now)
+            self._count('hits')
+            # Entries stored before rate-limit headers were dropped may still carry them
+            return CachedResponse(entry[0], replayable_headers(json.loads(entry[1])), entry[2])
+
+        request_headers = dict(headers or {})
+        if entry and entry[3]:
+            request_headers['If-None-Match'] = entry[3]
+        response = session.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            connection.execute("UPDATE http_cache SET expires_at = ?, last_used = ? WHERE url = ?",
+                               (now + ttl, now, url))
+            connection.commit()
+            self._count('revalidated')
+            # Keep the stored payload but surface fresh headers such as X-RateLimit-Remaining
+            cached_headers = CaseInsensitiveDict(json.loads(entry[1]))
+            cached_headers.update(response.headers)
+            return CachedResponse(entry[0], cached_headers, entry[2])
+
+        self._count('misses')
+        if response.status_code == 200:
+            self._store(url, response, ttl, now)
+        return response
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['revalidated']) / lookups * 100, 1) if lookups else 0
+        stats['entries'] = self._connection().execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+        stats['max_entries'] = self.max_entries
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+        connection = self._connection()
+        connection.execute("DELETE FROM http_cache")
+        connection.commit()
+
+
+# Cache lifetimes in seconds for each external payload
+HTTP_CACHE_TTLS = {
+    'github_user': int(os.environ.get('HTTP_CACHE_TTL_GITHUB_USER', 3600)),
+    'github_repos': int(os.environ.get('HTTP_CACHE_TTL_GITHUB_REPOS', 3600)),
+    'github_search': int(os.environ.get('HTTP_CACHE_TTL_GITHUB_SEARCH', 600)),
+    'orcid_record': int(os.environ.get('HTTP_CACHE_TTL_ORCID', 86400))
+}
+
+http_cache = HttpResponseCache(
+    os.environ.get('HTTP_CACHE_PATH', os.path.join(app.instance_path, 'http_cache.db')),
+    max_entries=int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', 5000)),
+    touch_batch=int(os.environ.get('HTTP_CACHE_TOUCH_BATCH', 100))
+)
+
+
+@app.route('/api/http-cache/stats', methods=['GET'])
+def get_http_cache_stats():
+    """Hit/miss statistics for the external API response cache"""
+    return jsonify(http_cache.summary())
+
+
+@app.route('/api/http-cache', methods=['DELETE'])
+def clear_http_cache():
+    """Drop every cached external API response"""
+    http_cache.clear()
+    return jsonify({"message": "HTTP cache cleared"})
+
+
+# ==================== SCHOLAR PUBLICATION CACHE ====================
+
+# Fields of a filled scholarly publication that enrichment reads
+SCHOLAR_PUBLICATION_FIELDS = ('bib', 'num_citations', 'pub_url', 'eprint_url', 'author_pub_id', 'cites_id')
+
+
+def scholar_publication_key(publication):
+    """Scholar's cluster id, shared by every co-author's copy of a paper, else the per-profile id"""
+    if publication.get('cites_id'):
+        return 'cluster:' + ','.join(sorted(publication['cites_id']))
+    if publication.get('author_pub_id'):
+        return 'pub:' + publication['author_pub_id']
+    return None
+
+
+def scholar_publication_record(publication):
+    return {field: publication[field] for field in SCHOLAR_PUBLICATION_FIELDS if field in publication}
+
+
+class ScholarPublicationCache:
+    """
+    On-disk (SQLite) cache of filled Google Scholar publications keyed by Scholar id.
+
+    Filling is the slow, throttled part of Scholar enrichment, and co-authors list the
+    same papers, so a paper filled for one candidate is reused for the next. Entries
+    older than `ttl` seconds are filled again.
+    """
+
+    def __init__(self, path, ttl=30 * 86400):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def _connection(self):
+        # Fetches run on bulk-enrichment and worker threads; the file is created on first use
+        if not hasattr(self._local, 'connection'):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS scholar_publication (
+                    scholar_id TEXT PRIMARY KEY,
+                    record TEXT NOT NULL,
+                    filled_at REAL NOT NULL
+                )
+            """)
+            connection.commit()
+            self._local.connection = connection
+        return self._local.connection
+
+    def get_many(self, keys):
+        """Fresh records for the keys that have one, as {key: record}"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update((key, json.loads(record)) for key, record in connection.execute(
+                f"SELECT scholar_id, record FROM scholar_publication "
+                f"WHERE filled_at > ? AND scholar_id IN ({', '.join('?' * len(chunk))})",
+                [time.time() - self.ttl, *chunk]
+            ))
+        with self._lock:
+            self.stats['hits'] += len(found)
+            self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, records):
+        if not records:
+            return
+        now = time.time()
+        connection = self._connection()
+        connection.executemany(
+            "INSERT OR REPLACE INTO scholar_publication (scholar_id, record, filled_at) VALUES (?, ?, ?)",
+            [(key, json.dumps(record, default=str), now) for key, record in records.items()]
+        )
+        connection.commit()
+        with self._lock:
+            self.stats['stores'] += len(records)
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0
+        stats['entries'] = self._connection().execute("SELECT COUNT(*) FROM scholar_publication").fetchone()[0]
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute("DELETE FROM scholar_publication")
+        connection.commit()
+
+
+scholar_publication_cache = ScholarPublicationCache(
+    os.environ.get('SCHOLAR_CACHE_PATH', os.path.join(app.instance_path, 'scholar_cache.db')),
+    ttl=int(os.environ.get('SCHOLAR_CACHE_TTL', 30 * 86400))
+)
+
+
+@app.route('/api/scholar-cache/stats', methods=['GET'])
+def get_scholar_cache_stats():
+    """Hit/miss statistics for the shared Google Scholar publication cache"""
+    return jsonify(scholar_publication_cache.summary())
+
+
+@app.route('/api/scholar-cache', methods=['DELETE'])
+def clear_scholar_cache():
+    """Drop every cached Google Scholar publication"""
+    scholar_publication_cache.clear()
+    return jsonify({"message": "Scholar publication cache cleared"})
+
+
+# ==================== GITHUB CLIENT ====================
+
+GITHUB_API_URL = 'https://api.github.com'
+
+
+class GitHubRateLimited(requests.RequestException):
+    """
+    No GitHub token has rate-limit budget left before the governor's wait limit.
+    A RequestException, so callers that already handle network errors handle this too.
+    """
+
+    def __init__(self, resource, reset_at):
+        super().__init__(f"GitHub {resource} rate limit exhausted until "
+                         f"{datetime.utcfromtimestamp(reset_at).isoformat()}Z")
+        self.resource = resource
+        self.reset_at = reset_at
+
+
+def github_resource(url):
+    """The rate-limit bucket GitHub charges a URL to"""
+    return 'search' if '/search/' in url else 'core'
+
+
+class GitHubRateLimiter:
+    """
+    Rate-limit governor shared by every GitHub call.
+
+    Tracks limit/remaining/reset per token and resource from response headers and hands
+    each call the token with the most budget left. Once a token is below `low_water`
+    (a fraction of its limit) its remaining calls are spread evenly over the rest of the
+    window; an exhausted token is skipped until it resets. When every token is exhausted
+    a call waits up to `max_wait` seconds for a reset, then raises GitHubRateLimited.
+    """
+
+    def __init__(self, tokens, low_water=0.1, max_wait=10):
+        self.tokens = list(tokens) or [None]  # None makes unauthenticated calls
+        self.low_water = low_water
+        self.max_wait = max_wait
+        self._state = {}  # (token index, resource) -> {'limit', 'remaining', 'reset', 'last_call'}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'delayed': 0, 'delay_seconds': 0.0, 'exhausted': 0, 'rotated_on_403': 0}
+
+    def _current(self, index, resource, now):
+        state = self._state.get((index, resource))
+        return state if state and state['reset'] > now else None
+
+    def _ready_at(self, state, now):
+        if state is None or state['remaining'] > state['limit'] * self.low_water:
+            return now
+        if state['remaining'] <= 0:
+            return state['reset']
+        # Near exhaustion: spread what is left evenly over the rest of the window
+        return max(now, state['last_call'] + (state['reset'] - state['last_call']) / state['remaining'])
+
+    def acquire(self, resource='core', exclude=(), timeout=None):
+        """
+        Reserve one call on the best token and return its index; may sleep. With a
+        timeout (seconds), raises GitHubRateLimited rather than sleeping past it.
+        """
+        deadline = time.time() + self.max_wait
+        cutoff = deadline if timeout is None else min(deadline, time.time() + timeout)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.time()
+                choices = []
+                for index in range(len(self.tokens)):
+                    if index in exclude:
+                        continue
+                    state = self._current(index, resource, now)
+                    ready_at = self._ready_at(state, now)
+                    if state and state['remaining'] > 0:
+                        ready_at = min(ready_at, deadline)  # pacing is advisory, exhaustion is not
+                    remaining = state['remaining'] if state else float('inf')
+                    choices.append((ready_at, -remaining, index, state))
+                if not choices:
+                    raise GitHubRateLimited(resource, now)
+                ready_at, _, index, state = min(choices)
+                if ready_at <= now:
+                    if state:
+                        state['remaining'] -= 1  # corrected by the response headers
+                        state['last_call'] = now
+                    self.stats['calls'] += 1
+                    if waited:
+                        self.stats['delayed'] += 1
+                        self.stats['delay_seconds'] += waited
+                    return index
+                if ready_at > deadline:
+                    self.stats['exhausted'] += 1
+                    raise GitHubRateLimited(resource, ready_at)
+                if ready_at >= cutoff:
+                    # The caller gives up before this slot; keep the call for someone who can use it
+                    raise GitHubRateLimited(resource, ready_at)
+            pause = min(ready_at, deadline) - now
+            time.sleep(pause)
+            waited += pause
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def observe(self, index, resource, response):
+        """Record the rate-limit headers a response carried for the token that made it"""
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = int(headers['X-RateLimit-Reset'])
+            limit = int(headers.get('X-RateLimit-Limit') or remaining)
+        except (KeyError, TypeError, ValueError):
+            remaining = reset = limit = None
+        retry_at = retry_after_time(headers.get('Retry-After')) if response.status_code in (403, 429) else None
+        if retry_at is not None:
+            # Secondary rate limit: back off this token for the advised time
+            reset = retry_at
+            remaining = 0
+            limit = limit or 1
+        if reset is not None:
+            self.record(index, headers.get('X-RateLimit-Resource', resource), limit, remaining, reset)
+
+    def record(self, index, resource, limit, remaining, reset):
+        with self._lock:
+            state = self._state.get((index, resource))
+            if state is None or reset > state['reset']:
+                self._state[(index, resource)] = {'limit': limit, 'remaining': remaining, 'reset': reset,
+                                                  'last_call': time.time()}
+            else:
+                # Responses to concurrent calls arrive out of order; the lowest count is the newest
+                state['remaining'] = min(state['remaining'], remaining)
+                state['limit'] = limit
+
+    def remaining(self, resource='core'):
+        """Calls left across the pool in the current windows; None until a response has been seen"""
+        with self._lock:
+            now = time.time()
+            states = [self._current(index, resource, now) for index in range(len(self.tokens))]
+        if any(state is None for state in states):
+            return None
+        return sum(max(state['remaining'], 0) for state in states)
+
+    def label(self, index):
+        token = self.tokens[index]
+        return f'...{token[-4:]}' if token else 'anonymous'
+
+    def summary(self):
+        now = time.time()
+        with self._lock:
+            tokens = []
+            for index in range(len(self.tokens)):
+                resources = {}
+                for (token_index, resource), state in self._state.items():
+                    if token_index == index and state['reset'] > now:
+                        resources[resource] = {
+                            'limit': state['limit'],
+                            'remaining': max(state['remaining'], 0),
+                            'reset_at': datetime.utcfromtimestamp(state['reset']).isoformat(),
+                            'paced': state['remaining'] <= state['limit'] * self.low_water
+                        }
+                tokens.append({'token': self.label(index), 'resources': resources})
+            stats = dict(self.stats)
+        stats['delay_seconds'] = round(stats['delay_seconds'], 2)
+        return {'tokens': tokens, 'low_water': self.low_water, 'max_wait_seconds': self.max_wait, 'stats': stats}
+
+
+def retry_after_time(value):
+    """Epoch seconds a Retry-After header (delay seconds or an HTTP date) points to; None if unparseable"""
+    if not value:
+        return None
+    try:
+        return time.time() + int(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def github_tokens():
+    """Tokens from GITHUB_TOKENS (comma-separated) and GITHUB_TOKEN, without duplicates"""
+    tokens = [token.strip() for token in os.environ.get('GITHUB_TOKENS', '').split(',')]
+    tokens.append(os.environ.get('GITHUB_TOKEN', '').strip())
+    return list(dict.fromkeys(token for token in tokens if token))
+
+
+github_rate_limiter = GitHubRateLimiter(
+    github_tokens(),
+    low_water=float(os.environ.get('GITHUB_RATE_LIMIT_LOW_WATER', 0.1)),
+    max_wait=float(os.environ.get('GITHUB_RATE_LIMIT_MAX_WAIT', 10))
+)
+
+
+class GitHubBudget:
+    """
+    GitHub rate-limit budget for background work (scheduled saved searches).
+
+    A rolling hourly allowance, further capped by what the rate limiter reports left
+    across the token pool minus `reserve` core calls kept back for interactive requests.
+    """
+
+    def __init__(self, limiter, calls_per_hour=500, reserve=100):
+        self.limiter = limiter
+        self.calls_per_hour = calls_per_hour
+        self.reserve = reserve
+        self._spent = deque()  # (epoch, calls) spent by background work
+        self._lock = threading.Lock()
+
+    def _allowance(self, resource, now):
+        while self._spent and self._spent[0][0] <= now - 3600:
+            self._spent.popleft()
+        allowance = self.calls_per_hour - sum(calls for _, calls in self._spent)
+        remaining = self.limiter.remaining(resource)
+        if remaining is not None:
+            allowance = min(allowance, remaining - (self.reserve if resource == 'core' else 0))
+        return max(allowance, 0)
+
+    def try_spend(self, calls, resource='core'):
+        """Reserve calls for background work; False (nothing reserved) if over budget"""
+        now = time.time()
+        with self._lock:
+            if self._allowance(resource, now) < calls:
+                return False
+            self._spent.append((now, calls))
+            return True
+
+    def summary(self):
+        now = time.time()
+        with self._lock:
+            return {
+                'calls_per_hour': self.calls_per_hour,
+                'reserve': self.reserve,
+                'available': self._allowance('core', now),
+                'spent_last_hour': sum(calls for _, calls in self._spent),
+                'pool_remaining': {resource: self.limiter.remaining(resource) for resource in ('core', 'search')}
+            }
+
+
+github_budget = GitHubBudget(
+    github_rate_limiter,
+    calls_per_hour=int(os.environ.get('SAVED_SEARCH_GITHUB_BUDGET', 500)),
+    reserve=int(os.environ.get('GITHUB_RATE_LIMIT_RESERVE', 100))
+)
+
+
+class RateLimitedSession:
+    """
+    requests.Session stand-in that authenticates each GET with a token from the rate
+    limiter and reports the response's headers back to it. A rate-limited 403/429 is
+    retried once on each other token in the pool. Inside a GitHubClient fan-out, waits
+    for budget and request timeouts both end at the fan-out deadline.
+    """
+
+    def __init__(self, session, limiter):
+        self.session = session
+        self.limiter = limiter
+        self.local = threading.local()  # fan-out deadline (time.monotonic()) of the call on this thread
+
+    def time_left(self):
+        """Seconds until this thread's fan-out deadline, or None outside a fan-out"""
+        deadline = getattr(self.local, 'deadline', None)
+        return None if deadline is None else deadline - time.monotonic()
+
+    def get(self, url, headers=None, timeout=None):
+        resource = github_resource(url)
+        tried = set()
+        while True:
+            index = self.limiter.acquire(resource, exclude=tried, timeout=self.time_left())
+            tried.add(index)
+            left = self.time_left()
+            if left is not None:
+                if left <= 0:
+                    raise requests.Timeout(f"GitHub fan-out deadline passed before {url}")
+                timeout = min(timeout, left) if timeout else left
+            request_headers = dict(headers or {})
+            if self.limiter.tokens[index]:
+                request_headers['Authorization'] = f'token {self.limiter.tokens[index]}'
+            response = self.session.get(url, headers=request_headers, timeout=timeout)
+            self.limiter.observe(index, resource, response)
+            rate_limited = response.status_code in (403, 429) and (
+                response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers)
+            if not rate_limited or len(tried) == len(self.limiter.tokens):
+                return response
+            self.limiter.count('rotated_on_403')
+
+
+class GitHubClient:
+    """
+    Shared GitHub API client: one keep-alive connection pool for every call and a
+    bounded thread pool for fanning out per-user requests. Every request that reaches
+    the network goes through the rate limiter; cache hits cost nothing.
+    """
+
+    def __init__(self, limiter, max_workers=8, timeout=5, deadline=8):
+        self.timeout = timeout  # seconds per HTTP call
+        self.deadline = deadline  # seconds for a whole fan-out
+        self.limiter = limiter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers * 2)
+        session.mount('https://', adapter)
+        self.session = RateLimitedSession(session, limiter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='github')
+
+    def headers(self, user_agent='ATS-Recruiter'):
+        # Authorization is added per request by the rate limiter's token pool
+        return {
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': user_agent
+        }
+
+    def get(self, url, headers=None, timeout=None, ttl=None):
+        """
+        GET through the shared session; with a ttl the response goes through http_cache.
+        Inside fan_out() the session ends rate-limit waits and timeouts at the deadline.
+        """
+        headers = headers or self.headers()
+        timeout = timeout or self.timeout
+        if ttl:
+            return http_cache.get(url, headers=headers, ttl=ttl, timeout=timeout, session=self.session)
+        return self.session.get(url, headers=headers, timeout=timeout)
+
+    def fan_out(self, calls):
+        """
+        Run zero-argument callables concurrently and return their results in order.
+        Calls that fail or are still running at the deadline give None. Requests made
+        through get() inside a call time out at the deadline, and do not wait on the rate
+        limiter past it, so late calls end and free their pool thread instead of delaying
+        the next fan-out or spending budget on results nobody reads.
+        """
+        deadline = time.monotonic() + self.deadline
+        futures = [self.executor.submit(self._call_before, deadline, call) for call in calls]
+        done, not_done = wait(futures, timeout=self.deadline)
+        if not_done:
+            app.logger.warning("%d of %d GitHub calls missed the %ss fan-out deadline",
+                               len(not_done), len(futures), self.deadline)
+        return [future.result() if future in done and future.exception() is None else None
+                for future in futures]
+
+    def _call_before(self, deadline, call):
+        self.session.local.deadline = deadline
+        try:
+            return call()
+        finally:
+            self.session.local.deadline = None
+
+    def refresh_rate_limits(self):
+        """Load every token's current limits from /rate_limit, which does not count against them"""
+        for index, token in enumerate(self.limiter.tokens):
+            headers = self.headers()
+            if token:
+                headers['Authorization'] = f'token {token}'
+            try:
+                response = self.session.session.get(f'{GITHUB_API_URL}/rate_limit', headers=headers,
+                                                    timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Error refreshing rate limit for {self.limiter.label(index)}: {e}")
+                continue
+            if response.status_code != 200:
+                continue
+            for resource, state in response.json().get('resources', {}).items():
+                if resource in ('core', 'search'):
+                    self.limiter.record(index, resource, state['limit'], state['remaining'], state['reset'])
+
+
+github_client = GitHubClient(
+    github_rate_limiter,
+    max_workers=int(os.environ.get('GITHUB_MAX_WORKERS', 8)),
+    timeout=float(os.environ.get('GITHUB_CALL_TIMEOUT', 5)),
+    deadline=float(os.environ.get('GITHUB_FANOUT_DEADLINE', 8))
+)
+
+
+@app.route('/api/github/rate-limit', methods=['GET'])
+def get_github_rate_limit():
+    """
+    Current GitHub budget per token and resource, governor statistics, and the share
+    set aside for scheduled work. ?refresh=1 first reloads the limits from GitHub.
+    """
+    if request.args.get('refresh') in ('1', 'true'):
+        github_client.refresh_rate_limits()
+    summary = github_rate_limiter.summary()
+    summary['remaining'] = {resource: github_rate_limiter.remaining(resource) for resource in ('core', 'search')}
+    summary['background_budget'] = github_budget.summary()
+    return jsonify(summary)
+
+
 def get_user_languages(username, headers):
     """Fetch top programming languages from user's repositories"""
     try:
         repos_url = f'https://api.github.com/users/{username}/repos?sort=updated&per_page=10'
-        repos_response = requests.get(repos_url, headers=headers, timeout=5)
+        repos_response = github_client.get(repos_url, headers=headers, ttl=HTTP_CACHE_TTLS['github_repos'])
 
         if repos_response.status_code == 200:
             repos = repos_response.json()
@@ -1397,15 +4868,11 @@ def get_user_languages(username, headers):
 def get_user_details(user_url, headers):
     """Fetch detailed user profile from GitHub API"""
     try:
-        response = requests.get(user_url, headers=headers, timeout=5)
+        response = github_client.get(user_url, headers=headers, ttl=HTTP_CACHE_TTLS['github_user'])
         if response.status_code == 200:
             return response.json()
-        elif response.status_code == 403:
-            print(f"GitHub API rate limit exceeded! Status: {response.status_code}")
-            print(f"Rate limit info: {response.headers.get('X-RateLimit-Remaining', 'N/A')} remaining")
-            return None
-        elif response.status_code == 429:
-            print(f"GitHub API rate limit - too many requests: {response.status_code}")
+        elif response.status_code in (403, 429):
+            print(f"GitHub API rate limit exceeded fetching user details: Status {response.status_code}")
             return None
         else:
             print(f"GitHub API error fetching user details: Status {response.status_code}")
@@ -1415,88 +4882,98 @@ def get_user_details(user_url, headers):
         return None
 
 
-def search_github(query):
-    """Search GitHub for users matching the Boolean query with detailed profiles"""
-    # Extract keywords from Boolean query for GitHub API
+def github_user_search(query, headers):
+    """Run the GitHub user search for a Boolean query; returns (response, search query sent)"""
     # GitHub API doesn't support full Boolean syntax, so we extract key terms
     keywords = extract_keywords_from_boolean(query)
 
     # GitHub API endpoint
     search_query = ' '.join(keywords[:5])  # Limit to 5 keywords
-    url = f'https://api.github.com/search/users?q={search_query}&per_page=10'
-
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'User-Agent': 'AI-ML-ATS-BooleanSearch'
-    }
-
-    # Add GitHub token if available
-    github_token = os.environ.get('GITHUB_TOKEN')
-    if github_token:
-        headers['Authorization'] = f'token {github_token}'
+    url = f'{GITHUB_API_URL}/search/users?q={search_query}&per_page=10'
+    response = github_client.get(url, headers=headers, timeout=10, ttl=HTTP_CACHE_TTLS['github_search'])
+    return response, search_query
+
+
+def fetch_github_profiles(users, headers):
+    """
+    Detailed profiles and languages for search hits, fetched concurrently.
+    Returns (profile, detailed) per user; a failed lookup falls back to the basic search hit.
+    """
+    calls = []
+    for user in users:
+        calls.append(lambda user=user: get_user_details(user.get('url'), headers))
+        calls.append(lambda user=user: get_user_languages(user.get('login'), headers))
+    fetched = github_client.fan_out(calls)
+
+    profiles = []
+    for index, user in enumerate(users):
+        user_details = fetched[2 * index]
+
+        if user_details:
+            languages = fetched[2 * index + 1] or []
+
+            profiles.append(({
+                'username': user_details.get('login'),
+                'name': user_details.get('name') or user_details.get('login'),
+                'profile_url': user_details.get('html_url'),
+                'avatar': user_details.get('avatar_url'),
+                'bio': user_details.get('bio'),
+                'location': user_details.get('location'),
+                'company': user_details.get('company'),
+                'email': user_details.get('email'),
+                'followers': user_details.get('followers', 0),
+                'following': user_details.get('following', 0),
+                'public_repos': user_details.get('public_repos', 0),
+                'languages': languages,
+                'type': user_details.get('type'),
+                'score': user.get('score')
+            }, True))
+        else:
+            # Fallback to basic info if detailed fetch fails
+            print(f"WARNING: Falling back to basic profile for {user.get('login')} - detailed fetch failed")
+            profiles.append(({
+                'username': user.get('login'),
+                'name': user.get('login'),
+                'profile_url': user.get('html_url'),
+                'avatar': user.get('avatar_url'),
+                'bio': None,
+                'location': None,
+                'company': None,
+                'email': None,
+                'followers': 0,
+                'following': 0,
+                'public_repos': 0,
+                'languages': [],
+                'type': user.get('type'),
+                'score': user.get('score')
+            }, False))
+    return profiles
 
-    response = requests.get(url, headers=headers, timeout=10)
 
-    # Check rate limit status
-    if response.status_code == 200:
-        rate_limit_remaining = response.headers.get('X-RateLimit-Remaining', 'Unknown')
-        print(f"GitHub API rate limit remaining: {rate_limit_remaining}")
+def search_github(query):
+    """Search GitHub for users matching the Boolean query with detailed profiles"""
+    headers = github_client.headers('AI-ML-ATS-BooleanSearch')
+    try:
+        response, search_query = github_user_search(query, headers)
+    except GitHubRateLimited as e:
+        return {
+            'error': str(e),
+            'message': 'GitHub search budget is used up. Try again after the reset or add tokens to GITHUB_TOKENS.',
+            'results': [],
+            'rate_limited': True
+        }
 
     if response.status_code == 200:
         data = response.json()
-        users = data.get('items', [])
-
-        # Fetch detailed info for each user
-        enriched_users = []
-        rate_limited = False
-        for user in users[:10]:
-            # Get detailed profile
-            user_details = get_user_details(user.get('url'), headers)
-
-            if user_details:
-                # Get top programming languages
-                languages = get_user_languages(user.get('login'), headers)
-
-                enriched_users.append({
-                    'username': user_details.get('login'),
-                    'name': user_details.get('name') or user_details.get('login'),
-                    'profile_url': user_details.get('html_url'),
-                    'avatar': user_details.get('avatar_url'),
-                    'bio': user_details.get('bio'),
-                    'location': user_details.get('location'),
-                    'company': user_details.get('company'),
-                    'email': user_details.get('email'),
-                    'followers': user_details.get('followers', 0),
-                    'following': user_details.get('following', 0),
-                    'public_repos': user_details.get('public_repos', 0),
-                    'languages': languages,
-                    'type': user_details.get('type'),
-                    'score': user.get('score')
-                })
-            else:
-                # Fallback to basic info if detailed fetch fails
-                rate_limited = True
-                print(f"WARNING: Falling back to basic profile for {user.get('login')} - detailed fetch failed")
-                enriched_users.append({
-                    'username': user.get('login'),
-                    'name': user.get('login'),
-                    'profile_url': user.get('html_url'),
-                    'avatar': user.get('avatar_url'),
-                    'bio': None,
-                    'location': None,
-                    'company': None,
-                    'email': None,
-                    'followers': 0,
-                    'following': 0,
-                    'public_repos': 0,
-                    'languages': [],
-                    'type': user.get('type'),
-                    'score': user.get('score')
-                })
+
+        # Fetch detailed profiles and languages for every user concurrently
+        profiles = fetch_github_profiles(data.get('items', [])[:10], headers)
+        enriched_users = [profile for profile, _ in profiles]
+        rate_limited = not all(detailed for _, detailed in profiles)
 
         message = f'Found {len(enriched_users)} GitHub users with detailed profiles'
         if rate_limited:
-            message += ' (⚠️ Some profiles may have limited data due to GitHub API rate limits. Add a GITHUB_TOKEN environment variable for higher limits.)'
+            message += ' (⚠️ Some profiles may have limited data due to GitHub API rate limits. Add tokens to GITHUB_TOKENS for higher limits.)'
 
         return {
             'total_count': data.get('total_count', 0),
@@ -1508,7 +4985,7 @@ def search_github(query):
     else:
         return {
             'error': f'GitHub API error: {response.status_code}',
-            'message': 'GitHub search failed. You may need to add a GITHUB_TOKEN.',
+            'message': 'GitHub search failed. You may need to add tokens to GITHUB_TOKENS.',
             'results': []
         }
 
@@ -1540,6 +5017,10 @@ def save_search():
         total_results=data.get('total_results', 0),
         github_results_count=data.get('github_results_count', 0)
     )
+    try:
+        apply_search_schedule(saved_search, data.get('execution_mode', 'on-demand'), data.get('schedule'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     db.session.add(saved_search)
     db.session.commit()
@@ -1563,249 +5044,544 @@ def delete_saved_search(search_id):
     return jsonify({"message": "Search deleted successfully"})
 
 
+@app.route('/api/saved-searches/<int:search_id>/local-results', methods=['GET'])
+def get_saved_search_local_results(search_id):
+    """Re-run a saved search against our own candidates"""
+    search = SavedSearch.query.get_or_404(search_id)
+    try:
+        limit = min(max(int(request.args.get('limit', LOCAL_SEARCH_DEFAULT_LIMIT)), 1), MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    try:
+        return jsonify(run_local_boolean_search(search.search_query, limit, offset))
+    except BooleanQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+# ==================== SAVED SEARCH SCHEDULER ====================
+
+EXECUTION_MODES = ('on-demand', 'auto-run')
+SCHEDULE_FREQUENCIES = ('hourly', 'daily', 'weekly', 'monthly', 'custom')
+SCHEDULE_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+# Profiles already seen are re-fetched when the search listing shows a change, and
+# otherwise once their stored details are older than this
+SAVED_SEARCH_REFRESH_DAYS = float(os.environ.get('SAVED_SEARCH_REFRESH_DAYS', 7))
+# A claimed run that has not finished after this long is picked up again
+SAVED_SEARCH_LEASE_SECONDS = int(os.environ.get('SAVED_SEARCH_LEASE_SECONDS', 900))
+# Retry delay when the GitHub budget cannot cover a scheduled run
+SAVED_SEARCH_DEFER_SECONDS = int(os.environ.get('SAVED_SEARCH_DEFER_SECONDS', 900))
+# Profile fields whose change puts a profile back in front of the recruiter
+GITHUB_FINGERPRINT_FIELDS = ('name', 'bio', 'location', 'company', 'email', 'languages')
+# Search listing fields -> the stored profile fields they were copied to
+GITHUB_LISTING_FIELDS = {'avatar_url': 'avatar', 'html_url': 'profile_url', 'type': 'type'}
+
+
+def parse_schedule(schedule):
+    """Validate a schedule from the scheduling panel and fill defaults; raises ValueError"""
+    schedule = schedule or {}
+    if not isinstance(schedule, dict):
+        raise ValueError("schedule must be an object")
+    frequency = schedule.get('frequency', 'daily')
+    if frequency not in SCHEDULE_FREQUENCIES:
+        raise ValueError(f"frequency must be one of: {', '.join(SCHEDULE_FREQUENCIES)}")
+    try:
+        hour, minute = (int(part) for part in str(schedule.get('time', '09:00')).split(':'))
+    except ValueError:
+        raise ValueError("time must be HH:MM")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError("time must be HH:MM")
+    zone = schedule.get('timezone', 'UTC')
+    try:
+        ZoneInfo(zone)
+    except (ZoneInfoNotFoundError, TypeError, ValueError):
+        raise ValueError(f"Unknown timezone: {zone}")
+    days = schedule.get('daysOfWeek') or []
+    if not isinstance(days, list):
+        raise ValueError("daysOfWeek must be a list")
+    unknown = [day for day in days if day not in SCHEDULE_WEEKDAYS]
+    if unknown:
+        raise ValueError(f"Unknown days: {', '.join(map(str, unknown))}")
+    try:
+        day_of_month = int(schedule.get('dayOfMonth', 1))
+    except (TypeError, ValueError):
+        raise ValueError("dayOfMonth must be an integer")
+    return {
+        'frequency': frequency,
+        'time': f'{hour:02d}:{minute:02d}',
+        'timezone': zone,
+        'daysOfWeek': [day for day in SCHEDULE_WEEKDAYS if day in days],
+        'dayOfMonth': min(max(day_of_month, 1), 28)
+    }
+
+
+def next_run_after(schedule, after):
+    """First run time (naive UTC) strictly after `after` for a parsed schedule"""
+    hour, minute = (int(part) for part in schedule['time'].split(':'))
+    if schedule['frequency'] == 'hourly':
+        run = after.replace(minute=minute, second=0, microsecond=0)
+        return run if run > after else run + timedelta(hours=1)
+
+    zone = ZoneInfo(schedule['timezone'])
+    local_after = after.replace(tzinfo=timezone.utc).astimezone(zone)
+    weekdays = {SCHEDULE_WEEKDAYS.index(day) for day in schedule['daysOfWeek']}
+    if schedule['frequency'] == 'weekly' and not weekdays:
+        weekdays = {0}
+    for offset in range(63):
+        day = local_after.date() + timedelta(days=offset)
+        if weekdays and schedule['frequency'] in ('weekly', 'custom') and day.weekday() not in weekdays:
+            continue
+        if schedule['frequency'] == 'monthly' and day.day != schedule['dayOfMonth']:
+            continue
+        run = datetime(day.year, day.month, day.day, hour, minute, tzinfo=zone)
+        if run > local_after:
+            return run.astimezone(timezone.utc).replace(tzinfo=None)
+    return None
+
+
+def apply_search_schedule(search, execution_mode, schedule):
+    """Set execution mode and schedule, and when the next scheduled run is due; raises ValueError"""
+    if execution_mode not in EXECUTION_MODES:
+        raise ValueError(f"execution_mode must be one of: {', '.join(EXECUTION_MODES)}")
+    search.execution_mode = execution_mode
+    if execution_mode == 'auto-run':
+        schedule = parse_schedule(schedule)
+        search.schedule = json.dumps(schedule)
+        search.next_run_at = next_run_after(schedule, datetime.utcnow())
+    else:
+        if schedule is not None:
+            search.schedule = json.dumps(parse_schedule(schedule))
+        search.next_run_at = None
+
+
+def github_fingerprint(profile):
+    """Hash of the profile fields a recruiter reviews; follower and repo counts are ignored"""
+    fields = {field: profile.get(field) for field in GITHUB_FINGERPRINT_FIELDS}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+def listing_changed(user, refreshed_at, profile):
+    """Whether a search hit shows its profile changed since it was last fetched"""
+    if user.get('updated_at'):
+        updated_at = datetime.fromisoformat(user['updated_at'].replace('Z', '+00:00'))
+        return updated_at.astimezone(timezone.utc).replace(tzinfo=None) > refreshed_at
+    return any(user.get(field) != profile.get(stored) for field, stored in GITHUB_LISTING_FIELDS.items())
+
+
+def claim_due_searches(now, limit=5):
+    """Push each due auto-run search's next_run_at out by a lease so only one process runs it"""
+    due = db.session.query(SavedSearch.id, SavedSearch.next_run_at).filter(
+        SavedSearch.execution_mode == 'auto-run',
+        SavedSearch.next_run_at <= now
+    ).order_by(SavedSearch.next_run_at).limit(limit).all()
+    db.session.commit()  # the poll is read-only; only a claim takes the write lock
+    if not due:
+        return []
+    claimed = []
+    lease = now + timedelta(seconds=SAVED_SEARCH_LEASE_SECONDS)
+    begin_write()
+    for search_id, next_run_at in due:
+        if SavedSearch.query.filter(
+            SavedSearch.id == search_id,
+            SavedSearch.next_run_at == next_run_at
+        ).update({'next_run_at': lease}, synchronize_session=False):
+            claimed.append(search_id)
+    db.session.commit()
+    return claimed
+
+
+def finish_saved_search_run(search_id, run_at, status, summary, next_run_at=None):
+    """Record a run's status and next run time; None if the search was deleted during the run"""
+    begin_write()
+    search = SavedSearch.query.get(search_id)
+    if search is None:
+        db.session.rollback()
+        return None
+    search.last_run_status = status
+    if search.execution_mode == 'auto-run':
+        search.next_run_at = next_run_at or next_run_after(json.loads(search.schedule), run_at)
+    db.session.commit()
+    summary['status'] = status
+    summary['next_run_at'] = search.next_run_at.isoformat() if search.next_run_at else None
+    return summary
+
+
+def run_saved_search(search_id, budget=None):
+    """
+    Re-run a saved search on GitHub and record which profiles are new or changed.
+
+    Only profiles never seen, whose search hit shows a change (a newer updated_at when
+    the listing carries one, else a different avatar, URL or type), or whose details are
+    older than SAVED_SEARCH_REFRESH_DAYS get detail lookups, and only as many as `budget`
+    allows; unseen profiles that do not fit wait for the next run. No transaction is
+    held open across GitHub calls.
+    Returns a run summary, or None if the search no longer exists.
+    """
+    search = SavedSearch.query.get(search_id)
+    if search is None:
+        return None
+    query = search.search_query
+    db.session.commit()
+
+    run_at = datetime.utcnow()
+    summary = {'saved_search_id': search_id, 'run_at': run_at.isoformat(), 'github_calls': 0,
+               'new': 0, 'changed': 0, 'unchanged': 0, 'deferred': 0}
+    retry_at = run_at + timedelta(seconds=SAVED_SEARCH_DEFER_SECONDS)
+
+    if budget and not budget.try_spend(1, resource='search'):
+        return finish_saved_search_run(search_id, run_at, 'deferred', summary, retry_at)
+    headers = github_client.headers('AI-ML-ATS-SavedSearch')
+    try:
+        response, _ = github_user_search(query, headers)
+    except requests.RequestException as e:
+        summary['error'] = str(e)
+        return finish_saved_search_run(search_id, run_at, 'failed', summary)
+    summary['github_calls'] += 1
+    if response.status_code != 200:
+        summary['error'] = f'GitHub API error: {response.status_code}'
+        return finish_saved_search_run(search_id, run_at, 'failed', summary)
+    data = response.json()
+    users = [user for user in data.get('items', [])[:10] if user.get('login')]
+
+    stale_before = run_at - timedelta(days=SAVED_SEARCH_REFRESH_DAYS)
+    known = {external_id: (refreshed_at or datetime.min, json.loads(payload) if payload else {})
+             for external_id, refreshed_at, payload in db.session.query(
+                 SavedSearchResult.external_id, SavedSearchResult.refreshed_at, SavedSearchResult.payload
+             ).filter(
+                 SavedSearchResult.saved_search_id == search_id,
+                 SavedSearchResult.source == 'GitHub',
+                 SavedSearchResult.external_id.in_([user['login'] for user in users])
+             )}
+    db.session.commit()
+    # Profiles never seen come first so a tight budget still surfaces new people
+    to_fetch = sorted(
+        (user for user in users if user['login'] not in known or known[user['login']][0] < stale_before
+         or listing_changed(user, *known[user['login']])),
+        key=lambda user: user['login'] in known
+    )
+    affordable = 0
+    while affordable < len(to_fetch) and (budget is None or budget.try_spend(2)):
+        affordable += 1
+    profiles = {user['login']: profile
+                for user, (profile, detailed) in zip(to_fetch, fetch_github_profiles(to_fetch[:affordable], headers))
+                if detailed}
+    summary['github_calls'] += 2 * affordable
+
+    begin_write()
+    search = SavedSearch.query.get(search_id)
+    if search is None:
+        # Deleted while GitHub was being queried; its results went with it
+        db.session.rollback()
+        return None
+    rows = {row.external_id: row for row in SavedSearchResult.query.filter(
+        SavedSearchResult.saved_search_id == search_id,
+        SavedSearchResult.source == 'GitHub',
+        SavedSearchResult.external_id.in_([user['login'] for user in users])
+    )}
+    for user in users:
+        login = user['login']
+        row = rows.get(login)
+        profile = profiles.get(login)
+        if profile is None:
+            if row is None:
+                summary['deferred'] += 1
+            else:
+                row.last_seen_at = run_at
+                summary['unchanged'] += 1
+            continue
+
+        fingerprint = github_fingerprint(profile)
+        if row is None:
+            row = SavedSearchResult(saved_search_id=search_id, source='GitHub', external_id=login,
+                                    first_seen_at=run_at, last_changed_at=run_at)
+            db.session.add(row)
+            summary['new'] += 1
+        elif row.fingerprint != fingerprint:
+            row.last_changed_at = run_at
+            summary['changed'] += 1
+        else:
+            summary['unchanged'] += 1
+        row.fingerprint = fingerprint
+        row.payload = json.dumps(profile)
+        row.last_seen_at = run_at
+        row.refreshed_at = run_at
+
+    search.last_executed = run_at
+    search.total_results = data.get('total_count', 0)
+    search.github_results_count = len(users)
+    search.last_delta_count = summary['new'] + summary['changed']
+    return finish_saved_search_run(search_id, run_at, 'completed', summary)
+
+
+class SavedSearchScheduler:
+    """Background thread that re-runs due auto-run saved searches within the GitHub budget"""
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread or self.interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._run, name='saved-search-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                with app.app_context():
+                    for search_id in claim_due_searches(datetime.utcnow()):
+                        run_saved_search(search_id, budget=github_budget)
+            except Exception as e:
+                print(f"Saved search scheduler error: {e}")
+            time.sleep(self.interval)
+
+
+saved_search_scheduler = SavedSearchScheduler(
+    interval=float(os.environ.get('SAVED_SEARCH_SCHEDULER_INTERVAL', 60))
+)
+
+
+@app.before_request
+def start_saved_search_scheduler():
+    saved_search_scheduler.start()
+
+
+@app.route('/api/saved-searches/<int:search_id>/schedule', methods=['PUT'])
+def update_saved_search_schedule(search_id):
+    """Switch a saved search between on-demand and auto-run, or change its schedule"""
+    search = SavedSearch.query.get_or_404(search_id)
+    data = request.get_json() or {}
+    try:
+        apply_search_schedule(search, data.get('execution_mode', search.execution_mode or 'on-demand'),
+                              data.get('schedule', json.loads(search.schedule) if search.schedule else None))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+    return jsonify(search.to_dict())
+
+
+@app.route('/api/saved-searches/<int:search_id>/run', methods=['POST'])
+def run_saved_search_now(search_id):
+    """Re-run a saved search now and return the profiles that are new or changed"""
+    SavedSearch.query.get_or_404(search_id)
+    summary = run_saved_search(search_id)
+    if summary is None:
+        # Deleted before or during the run
+        return jsonify({"error": "Saved search not found"}), 404
+    if summary['status'] == 'completed':
+        summary['results'] = [row.to_dict() for row in SavedSearchResult.query.filter(
+            SavedSearchResult.saved_search_id == search_id,
+            SavedSearchResult.last_changed_at == datetime.fromisoformat(summary['run_at'])
+        ).order_by(SavedSearchResult.id)]
+    return jsonify(summary), 200 if summary['status'] == 'completed' else 502
+
+
+@app.route('/api/saved-searches/<int:search_id>/delta', methods=['GET'])
+def get_saved_search_delta(search_id):
+    """
+    Profiles that were new or changed in the latest run, or since ?since=<ISO timestamp>.
+    Each result's "change" is "new" or "changed".
+    """
+    search = SavedSearch.query.get_or_404(search_id)
+    since = search.last_executed
+    if request.args.get('since'):
+        try:
+            since = datetime.fromisoformat(request.args['since'])
+        except ValueError:
+            return jsonify({"error": "since must be an ISO timestamp"}), 400
+    rows = SavedSearchResult.query.filter(
+        SavedSearchResult.saved_search_id == search_id,
+        SavedSearchResult.last_changed_at >= since
+    ).order_by(SavedSearchResult.last_changed_at.desc(), SavedSearchResult.id).all()
+    return jsonify({
+        'saved_search_id': search_id,
+        'since': since.isoformat(),
+        'count': len(rows),
+        'results': [row.to_dict() for row in rows]
+    })
+
+
+@app.route('/api/saved-searches/scheduler', methods=['GET'])
+def get_saved_search_scheduler():
+    """Scheduler state: the GitHub budget and upcoming auto-run searches"""
+    upcoming = SavedSearch.query.filter(
+        SavedSearch.execution_mode == 'auto-run',
+        SavedSearch.next_run_at.isnot(None)
+    ).order_by(SavedSearch.next_run_at).limit(10).all()
+    return jsonify({
+        'running': saved_search_scheduler._thread is not None,
+        'interval_seconds': saved_search_scheduler.interval,
+        'budget': github_budget.summary(),
+        'upcoming': [{'id': search.id, 'name': search.name, 'next_run_at': search.next_run_at.isoformat()}
+                     for search in upcoming]
+    })
+
+
+# Map a GitHub user's top language to an expertise area
+LANGUAGE_EXPERTISE_MAP = {
+    'Python': 'Machine Learning / Data Science',
+    'JavaScript': 'Full Stack Development',
+    'TypeScript': 'Full Stack Development',
+    'Java': 'Backend Development',
+    'Go': 'Backend / Systems Programming',
+    'Rust': 'Systems Programming',
+    'C++': 'Systems / High Performance Computing',
+    'C': 'Systems Programming',
+    'Swift': 'iOS Development',
+    'Kotlin': 'Android Development',
+    'Ruby': 'Backend Development',
+    'PHP': 'Web Development'
+}
+
+IMPORT_CHUNK_SIZE = 500
+
+
+def existing_values(column, values):
+    """The subset of `values` already stored in `column`, one IN query per chunk"""
+    found = set()
+    for chunk in chunked({value for value in values if value}):
+        found.update(row[0] for row in db.session.query(column).filter(column.in_(chunk)))
+    return found
+
+
 @app.route('/api/export-candidates', methods=['POST'])
 def export_candidates():
-    """Export GitHub users to candidates"""
+    """Export GitHub users to candidates in a single transaction"""
     data = request.get_json()
 
     if not data or 'candidates' not in data:
         return jsonify({"error": "Candidates list is required"}), 400
 
     candidates_data = data['candidates']
-    created_candidates = []
     skipped_candidates = []
+    imported_at = datetime.utcnow()
 
+    # Look up every GitHub URL and email up front instead of two queries per profile
+    existing_urls = existing_values(Candidate.github_url, [c.get('profile_url') for c in candidates_data])
+    existing_emails = existing_values(Candidate.email, [
+        email for c in candidates_data
+        for email in (c.get('email'), f"{c.get('username', 'unknown')}@github.user")
+    ])
+
+    rows = []  # (full_name, mapping)
     for candidate_data in candidates_data:
-        # Check if candidate already exists by GitHub URL
+        # Check if candidate already exists by GitHub URL (or earlier in this request)
         github_url = candidate_data.get('profile_url')
-        if github_url:
-            existing = Candidate.query.filter_by(github_url=github_url).first()
-            if existing:
-                skipped_candidates.append({
-                    'name': candidate_data.get('name'),
-                    'reason': 'Already exists'
-                })
-                continue
+        if github_url and github_url in existing_urls:
+            skipped_candidates.append({
+                'name': candidate_data.get('name'),
+                'reason': 'Already exists'
+            })
+            continue
 
         # Get data from enriched GitHub profile
         username = candidate_data.get('username', 'unknown')
-        full_name = candidate_data.get('name', username)
-        github_email = candidate_data.get('email')
+        full_name = candidate_data.get('name') or username
 
-        # Generate email - use GitHub email if available, otherwise placeholder
-        if github_email:
-            email = github_email
-        else:
-            email = f"{username}@github.user"
-
-        # Check if email exists
-        if Candidate.query.filter_by(email=email).first():
-            email = f"{username}_{int(datetime.utcnow().timestamp())}@github.user"
+        # Use GitHub email if available, otherwise placeholder; make it unique if taken
+        email = candidate_data.get('email') or f"{username}@github.user"
+        if email in existing_emails:
+            email = f"{username}_{int(imported_at.timestamp())}@github.user"
+            suffix = 1
+            while email in existing_emails:
+                email = f"{username}_{int(imported_at.timestamp())}_{suffix}@github.user"
+                suffix += 1
 
         # Smart expertise detection based on languages
         languages = candidate_data.get('languages', [])
         expertise = candidate_data.get('expertise')
         if not expertise and languages:
-            # Map languages to expertise areas
-            lang_map = {
-                'Python': 'Machine Learning / Data Science',
-                'JavaScript': 'Full Stack Development',
-                'TypeScript': 'Full Stack Development',
-                'Java': 'Backend Development',
-                'Go': 'Backend / Systems Programming',
-                'Rust': 'Systems Programming',
-                'C++': 'Systems / High Performance Computing',
-                'C': 'Systems Programming',
-                'Swift': 'iOS Development',
-                'Kotlin': 'Android Development',
-                'Ruby': 'Backend Development',
-                'PHP': 'Web Development'
-            }
-            expertise = lang_map.get(languages[0], 'Software Engineering')
+            expertise = LANGUAGE_EXPERTISE_MAP.get(languages[0], 'Software Engineering')
 
         # Build bio/notes with imported info
         bio_parts = []
         if candidate_data.get('bio'):
             bio_parts.append(candidate_data['bio'])
-        bio_parts.append(f"Imported from Boolean search on {datetime.utcnow().strftime('%Y-%m-%d')}")
+        bio_parts.append(f"Imported from Boolean search on {imported_at.strftime('%Y-%m-%d')}")
         if languages:
             bio_parts.append(f"Languages: {', '.join(languages)}")
 
-        # Create new candidate with enriched data
+        name_parts = full_name.split()
+        rows.append((full_name, {
+            'first_name': name_parts[0] if len(name_parts) > 1 else full_name,
+            'last_name': name_parts[-1] if len(name_parts) > 1 else 'User',
+            'email': email,
+            'github_url': github_url,
+            'location': candidate_data.get('location'),
+            'company': candidate_data.get('company'),
+            'bio': candidate_data.get('bio'),
+            'github_followers': candidate_data.get('followers', 0),
+            'github_repos': candidate_data.get('public_repos', 0),
+            'primary_expertise': expertise or 'Software Engineering',
+            'skills': ', '.join(languages) if languages else None,
+            'status': 'new',
+            'notes': ' | '.join(bio_parts),
+            'source': 'boolean_search'
+        }))
+        existing_urls.add(github_url)
+        existing_emails.add(email)
+
+    # Insert in chunks; a chunk that hits a concurrent write is retried row by row to report conflicts
+    created_emails = []
+    for chunk in chunked(rows, IMPORT_CHUNK_SIZE):
         try:
-            candidate = Candidate(
-                first_name=full_name.split()[0] if ' ' in full_name else full_name,
-                last_name=full_name.split()[-1] if ' ' in full_name and len(full_name.split()) > 1 else 'User',
-                email=email,
-                github_url=github_url,
-                location=candidate_data.get('location'),
-                company=candidate_data.get('company'),
-                bio=candidate_data.get('bio'),
-                github_followers=candidate_data.get('followers', 0),
-                github_repos=candidate_data.get('public_repos', 0),
-                primary_expertise=expertise or 'Software Engineering',
-                skills=','.join(languages) if languages else None,
-                status='new',
-                notes=' | '.join(bio_parts)
-            )
-
-            db.session.add(candidate)
-            db.session.commit()
-            created_candidates.append(candidate.to_dict())
-        except Exception as e:
-            skipped_candidates.append({
-                'name': full_name,
-                'reason': str(e)
-            })
+            with db.session.begin_nested():
+                db.session.bulk_insert_mappings(Candidate, [mapping for _, mapping in chunk])
+            created_emails.extend(mapping['email'] for _, mapping in chunk)
+        except IntegrityError:
+            for full_name, mapping in chunk:
+                try:
+                    with db.session.begin_nested():
+                        db.session.bulk_insert_mappings(Candidate, [mapping])
+                    created_emails.append(mapping['email'])
+                except IntegrityError:
+                    skipped_candidates.append({
+                        'name': full_name,
+                        'reason': 'Conflicts with an existing candidate'
+                    })
+
+    created_candidates = []
+    for chunk in chunked(created_emails, IMPORT_CHUNK_SIZE):
+        created_candidates.extend(Candidate.query.filter(Candidate.email.in_(chunk)).all())
+
+    # Index the new candidates' skills, expertise and text terms in the same transaction
+    postings = [{'token': token, 'kind': kind, 'candidate_id': candidate.id}
+                for candidate in created_candidates for token, kind in candidate_index_tokens(candidate)]
+    postings.extend({'token': token, 'kind': 'term', 'candidate_id': candidate.id}
+                    for candidate in created_candidates
+                    for token in text_terms(*[getattr(candidate, field) for field in CANDIDATE_TERM_FIELDS]))
+    for chunk in chunked(postings, 5000):
+        db.session.execute(CandidateToken.__table__.insert(), chunk)
+
+    # Bulk inserts bypass flush and mapper events, so update the counters and snapshot by hand
+    if created_candidates:
+        bump_pipeline_counters(db.session.connection(), 'candidate',
+                               Counter(candidate.status for candidate in created_candidates))
+        transitions = [transition_row('candidate', candidate, None, candidate.created_at)
+                       for candidate in created_candidates if candidate.status]
+        for chunk in chunked(transitions, 5000):
+            db.session.execute(StatusTransition.__table__.insert(), chunk)
+        db.session.info['analytics_changed'] = True
+    db.session.commit()
 
     return jsonify({
         'created': len(created_candidates),
         'skipped': len(skipped_candidates),
-        'candidates': created_candidates,
+        'candidates': [c.to_dict(application_count=0, publication_count=0) for c in created_candidates],
         'skipped_details': skipped_candidates
     }), 201
 
 
-# ==================== PHASE 4: ADVANCED FEATURES ====================
-
-# Email Campaign Model
-class EmailCampaign(db.Model):
-    """Email campaign for candidate outreach"""
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(200), nullable=False)
-    subject = db.Column(db.String(500), nullable=False)
-    body = db.Column(db.Text, nullable=False)
-    status = db.Column(db.String(50), default='draft')  # draft, scheduled, sent, paused
-    scheduled_at = db.Column(db.DateTime)
-    sent_at = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    # Stats
-    total_recipients = db.Column(db.Integer, default=0)
-    sent_count = db.Column(db.Integer, default=0)
-    opened_count = db.Column(db.Integer, default=0)
-    clicked_count = db.Column(db.Integer, default=0)
-    replied_count = db.Column(db.Integer, default=0)
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'subject': self.subject,
-            'body': self.body,
-            'status': self.status,
-            'scheduled_at': self.scheduled_at.isoformat() if self.scheduled_at else None,
-            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
-            'created_at': self.created_at.isoformat(),
-            'total_recipients': self.total_recipients,
-            'sent_count': self.sent_count,
-            'opened_count': self.opened_count,
-            'clicked_count': self.clicked_count,
-            'replied_count': self.replied_count,
-            'open_rate': round((self.opened_count / self.sent_count * 100), 1) if self.sent_count > 0 else 0,
-            'click_rate': round((self.clicked_count / self.sent_count * 100), 1) if self.sent_count > 0 else 0,
-            'reply_rate': round((self.replied_count / self.sent_count * 100), 1) if self.sent_count > 0 else 0
-        }
-
-
-# Interview Model
-class Interview(db.Model):
-    """Interview scheduling"""
-    id = db.Column(db.Integer, primary_key=True)
-    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
-    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
-
-    interview_type = db.Column(db.String(100))  # phone, video, onsite, technical
-    scheduled_at = db.Column(db.DateTime, nullable=False)
-    duration_minutes = db.Column(db.Integer, default=60)
-    location = db.Column(db.String(300))  # Zoom link, office address, etc.
-
-    interviewers = db.Column(db.Text)  # JSON array of interviewer names/emails
-    notes = db.Column(db.Text)
-
-    status = db.Column(db.String(50), default='scheduled')  # scheduled, completed, cancelled, no_show
-    feedback = db.Column(db.Text)
-    rating = db.Column(db.Integer)  # 1-5 rating
-
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    def to_dict(self):
-        candidate = Candidate.query.get(self.candidate_id)
-        job = Job.query.get(self.job_id)
-        return {
-            'id': self.id,
-            'candidate_id': self.candidate_id,
-            'candidate_name': f"{candidate.first_name} {candidate.last_name}" if candidate else 'Unknown',
-            'job_id': self.job_id,
-            'job_title': job.title if job else 'Unknown',
-            'interview_type': self.interview_type,
-            'scheduled_at': self.scheduled_at.isoformat(),
-            'duration_minutes': self.duration_minutes,
-            'location': self.location,
-            'interviewers': self.interviewers,
-            'notes': self.notes,
-            'status': self.status,
-            'feedback': self.feedback,
-            'rating': self.rating,
-            'created_at': self.created_at.isoformat()
-        }
-
-
-# Offer Model
-class Offer(db.Model):
-    """Job offer management"""
-    id = db.Column(db.Integer, primary_key=True)
-    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
-    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
-
-    salary = db.Column(db.Integer)
-    equity = db.Column(db.String(100))  # e.g., "0.1%"
-    signing_bonus = db.Column(db.Integer)
-    start_date = db.Column(db.Date)
-
-    status = db.Column(db.String(50), default='draft')  # draft, sent, negotiating, accepted, declined, expired
-    sent_at = db.Column(db.DateTime)
-    expires_at = db.Column(db.DateTime)
-    responded_at = db.Column(db.DateTime)
-
-    notes = db.Column(db.Text)
-
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    def to_dict(self):
-        candidate = Candidate.query.get(self.candidate_id)
-        job = Job.query.get(self.job_id)
-        return {
-            'id': self.id,
-            'candidate_id': self.candidate_id,
-            'candidate_name': f"{candidate.first_name} {candidate.last_name}" if candidate else 'Unknown',
-            'job_id': self.job_id,
-            'job_title': job.title if job else 'Unknown',
-            'salary': self.salary,
-            'equity': self.equity,
-            'signing_bonus': self.signing_bonus,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'status': self.status,
-            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
-            'responded_at': self.responded_at.isoformat() if self.responded_at else None,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat()
-        }
-
-
 # ==================== EMAIL CAMPAIGN ENDPOINTS ====================
 
 @app.route('/api/campaigns', methods=['GET'])
 def get_campaigns():
     """Get all email campaigns"""
-    campaigns = EmailCampaign.query.order_by(EmailCampaign.created_at.desc()).all()
-    return jsonify({
-        'campaigns': [c.to_dict() for c in campaigns],
-        'total': len(campaigns)
-    })
+    return list_response(EmailCampaign.query, EmailCampaign, 'campaigns', lambda rows: [c.to_dict() for c in rows],
+                         EmailCampaign.created_at.desc())
 
 
 @app.route('/api/campaigns', methods=['POST'])
@@ -1899,11 +5675,8 @@ def get_interviews():
     if candidate_id:
         query = query.filter_by(candidate_id=candidate_id)
 
-    interviews = query.order_by(Interview.scheduled_at.desc()).all()
-    return jsonify({
-        'interviews': [i.to_dict() for i in interviews],
-        'total': len(interviews)
-    })
+    return list_response(query, Interview, 'interviews', lambda rows: [i.to_dict() for i in rows],
+                         Interview.scheduled_at.desc(), options=candidate_and_job_options(Interview))
 
 
 @app.route('/api/interviews', methods=['POST'])
@@ -1970,11 +5743,8 @@ def get_offers():
     if status:
         query = query.filter_by(status=status)
 
-    offers = query.order_by(Offer.created_at.desc()).all()
-    return jsonify({
-        'offers': [o.to_dict() for o in offers],
-        'total': len(offers)
-    })
+    return list_response(query, Offer, 'offers', lambda rows: [o.to_dict() for o in rows],
+                         Offer.created_at.desc(), options=candidate_and_job_options(Offer))
 
 
 @app.route('/api/offers', methods=['POST'])
@@ -1999,6 +5769,7 @@ def create_offer():
         offer.start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
 
     db.session.add(offer)
+    record_status_transition('offer', offer, None)
     db.session.commit()
 
     return jsonify(offer.to_dict()), 201
@@ -2009,6 +5780,7 @@ def update_offer(offer_id):
     """Update offer"""
     offer = Offer.query.get_or_404(offer_id)
     data = request.get_json()
+    previous_status = offer.status
 
     for field in ['salary', 'equity', 'signing_bonus', 'notes', 'status']:
         if field in data:
@@ -2018,11 +5790,12 @@ def update_offer(offer_id):
         offer.start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
 
     # Track status changes
-    if data.get('status') == 'sent' and offer.status != 'sent':
+    if data.get('status') == 'sent' and previous_status != 'sent':
         offer.sent_at = datetime.utcnow()
     elif data.get('status') in ['accepted', 'declined']:
         offer.responded_at = datetime.utcnow()
 
+    record_status_transition('offer', offer, previous_status)
     db.session.commit()
     return jsonify(offer.to_dict())
 
@@ -2036,68 +5809,325 @@ def delete_offer(offer_id):
     return jsonify({"message": "Offer deleted successfully"})
 
 
+# ==================== PIPELINE COUNTERS ====================
+
+PIPELINE_COUNTER_MODELS = {Candidate: 'candidate', Job: 'job', Interview: 'interview', Offer: 'offer'}
+
+
+def group_counts(column):
+    """Return {value: count} for a column with one GROUP BY query"""
+    rows = db.session.query(column, func.count()).group_by(column).all()
+    return {value: count for value, count in rows}
+
+
+def bump_pipeline_counters(connection, entity, deltas):
+    """
+    Apply {status: delta} to the counters on the flushing connection with one upsert, so
+    two transactions creating the first row for a status cannot collide on the key
+    """
+    rows = [{'entity': entity, 'status': status or '', 'count': delta} for status, delta in deltas.items() if delta]
+    if not rows:
+        return
+    insert = postgresql_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    statement = insert(PipelineCounter.__table__).values(rows)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=['entity', 'status'],
+        set_={'count': PipelineCounter.__table__.c.count + statement.excluded.count}
+    ))
+
+
+def status_before_flush(target):
+    history = db.inspect(target).attrs.status.history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else target.status
+
+
+def _count_inserted(mapper, connection, target):
+    bump_pipeline_counters(connection, PIPELINE_COUNTER_MODELS[mapper.class_], {target.status: 1})
+
+
+def _count_status_change(mapper, connection, target):
+    history = db.inspect(target).attrs.status.history
+    if history.added and history.deleted and history.added[0] != history.deleted[0]:
+        bump_pipeline_counters(connection, PIPELINE_COUNTER_MODELS[mapper.class_],
+                               {history.deleted[0]: -1, history.added[0]: 1})
+
+
+def _count_deleted(mapper, connection, target):
+    bump_pipeline_counters(connection, PIPELINE_COUNTER_MODELS[mapper.class_], {status_before_flush(target): -1})
+
+
+for _model in PIPELINE_COUNTER_MODELS:
+    event.listen(_model, 'after_insert', _count_inserted)
+    event.listen(_model, 'after_update', _count_status_change)
+    event.listen(_model, 'after_delete', _count_deleted)
+
+
+def pipeline_counter_snapshot():
+    """Read every counter in one query as {entity: {status: count}}"""
+    counters = {entity: {} for entity in PIPELINE_COUNTER_MODELS.values()}
+    for row in PipelineCounter.query.filter(PipelineCounter.count != 0):
+        counters.setdefault(row.entity, {})[row.status or None] = row.count
+    return counters
+
+
+def reconcile_pipeline_counters():
+    """Rebuild the counters from the source tables and return the rows that had drifted"""
+    stored = {(row.entity, row.status): row.count for row in PipelineCounter.query}
+    actual = {}
+    for model, entity in PIPELINE_COUNTER_MODELS.items():
+        for status, count in group_counts(model.status).items():
+            actual[(entity, status or '')] = count
+
+    drift = {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(stored.keys() | actual.keys())
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+    PipelineCounter.query.delete(synchronize_session=False)
+    rows = [{'entity': entity, 'status': status, 'count': count} for (entity, status), count in actual.items()]
+    if rows:
+        db.session.execute(PipelineCounter.__table__.insert(), rows)
+    db.session.commit()
+    return drift
+
+
+@app.cli.command('reconcile-counters')
+def reconcile_counters_command():
+    """Rebuild pipeline status counters and report drift"""
+    drift = reconcile_pipeline_counters()
+    if not drift:
+        print("Counters match the source tables")
+        return
+    for (entity, status), (stored, actual) in drift.items():
+        print(f"{entity}.{status or '<null>'}: counter {stored}, actual {actual} ({actual - stored:+d})")
+    print(f"Rebuilt counters, {len(drift)} drifted")
+
+
+def backfill_pipeline_counters():
+    """Build the counters for databases created before they existed"""
+    if not db.session.query(PipelineCounter.query.exists()).scalar() and any(
+            db.session.query(model.query.exists()).scalar() for model in PIPELINE_COUNTER_MODELS):
+        reconcile_pipeline_counters()
+
+
+# ==================== STATUS TRANSITIONS ====================
+
+STATUS_TRANSITION_MODELS = {'candidate': Candidate, 'application': Application, 'offer': Offer}
+
+
+def transition_row(entity, obj, from_status, transitioned_at, entered_at=None):
+    return {
+        'entity': entity,
+        'entity_id': obj.id,
+        'candidate_id': obj.id if entity == 'candidate' else obj.candidate_id,
+        'job_id': getattr(obj, 'job_id', None),
+        'from_status': from_status,
+        'to_status': obj.status,
+        'transitioned_at': transitioned_at,
+        'dwell_seconds': int((transitioned_at - entered_at).total_seconds()) if entered_at else None,
+        'since_created_seconds': int((transitioned_at - obj.created_at).total_seconds())
+    }
+
+
+def record_status_transition(entity, obj, from_status):
+    """Log obj entering its current status; from_status None records creation (caller commits)"""
+    if obj.status is None or obj.status == from_status:
+        return
+    if obj.id is None or obj.created_at is None:
+        db.session.flush()
+
+    now = datetime.utcnow()
+    entered_at = None
+    if from_status is not None:
+        entered_at = db.session.query(func.max(StatusTransition.transitioned_at)).filter(
+            StatusTransition.entity == entity,
+            StatusTransition.entity_id == obj.id
+        ).scalar() or obj.created_at
+    db.session.add(StatusTransition(**transition_row(entity, obj, from_status, now, entered_at)))
+
+
+def backfill_status_transitions():
+    """
+    Seed the log for databases created before it existed: one creation row per existing
+    record, treating updated_at as when it reached its status
+    """
+    if db.session.query(StatusTransition.query.exists()).scalar():
+        return
+    for entity, model in STATUS_TRANSITION_MODELS.items():
+        batch = []
+        for obj in model.query.yield_per(5000):
+            if obj.status is None:
+                continue
+            batch.append(transition_row(entity, obj, None, obj.updated_at or obj.created_at))
+            if len(batch) >= 5000:
+                db.session.execute(StatusTransition.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(StatusTransition.__table__.insert(), batch)
+    db.session.commit()
+
+
+def filter_transitions(query):
+    """Apply ?from, ?to (ISO timestamps on transitioned_at) and ?job_id; raises ValueError on bad input"""
+    if request.args.get('from'):
+        query = query.filter(StatusTransition.transitioned_at >= datetime.fromisoformat(request.args['from']))
+    if request.args.get('to'):
+        query = query.filter(StatusTransition.transitioned_at < datetime.fromisoformat(request.args['to']))
+    if request.args.get('job_id'):
+        query = query.filter(StatusTransition.job_id == int(request.args['job_id']))
+    return query
+
+
+def duration_percentiles(query, column, count, percentiles=(50, 75, 90)):
+    """Nearest-rank percentiles of a duration column, one ORDER BY/OFFSET query each"""
+    values = {}
+    for p in percentiles:
+        offset = int(round(p / 100 * (count - 1))) if count else 0
+        values[p] = query.with_entities(column).order_by(column).offset(offset).limit(1).scalar() if count else None
+    return values
+
+
+def seconds_to_days(seconds):
+    return round(seconds / 86400, 1) if seconds is not None else 0
+
+
+# ==================== ANALYTICS ENGINE ====================
+
+# Dashboards poll these endpoints constantly; a snapshot this many seconds old
+# is acceptable and is dropped early whenever a pipeline table is committed.
+ANALYTICS_SNAPSHOT_TTL = float(os.environ.get('ANALYTICS_SNAPSHOT_TTL', 15))
+ANALYTICS_MODELS = (Candidate, Job, Application, Interview, Offer)
+
+
+class AnalyticsSnapshot:
+    """Process-local cache of computed analytics, keyed by name"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, name, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        value = compute()
+        with self._lock:
+            self._entries[name] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analytics_snapshot = AnalyticsSnapshot(ANALYTICS_SNAPSHOT_TTL)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_analytics_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ANALYTICS_MODELS):
+            session.info['analytics_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_analytics(session):
+    if session.info.pop('analytics_changed', False):
+        analytics_snapshot.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_analytics_changes(session):
+    session.info.pop('analytics_changed', None)
+
+
+def compute_pipeline_metrics():
+    """Compute every dashboard count from the status counters plus a few grouped queries"""
+    counters = pipeline_counter_snapshot()
+    interview_statuses = counters['interview']
+    upcoming_interviews = db.session.query(func.count(Interview.id)).filter(
+        Interview.status == 'scheduled',
+        Interview.scheduled_at > datetime.utcnow()
+    ).scalar()
+
+    expertise_counts = group_counts(Candidate.primary_expertise)
+    expertise_counts.pop(None, None)
+    expertise_counts.pop('', None)
+
+    return {
+        'candidate_statuses': counters['candidate'],
+        'job_statuses': counters['job'],
+        'interview_statuses': {
+            'total': sum(interview_statuses.values()),
+            'completed': interview_statuses.get('completed', 0),
+            'upcoming': upcoming_interviews
+        },
+        'offer_statuses': counters['offer'],
+        'expertise_counts': expertise_counts,
+        'total_applications': db.session.query(func.count(Application.id)).scalar()
+    }
+
+
+def pipeline_metrics():
+    return analytics_snapshot.get('pipeline', compute_pipeline_metrics)
+
+
 # ==================== ANALYTICS DASHBOARD ENDPOINTS ====================
 
 @app.route('/api/analytics/overview', methods=['GET'])
 def get_analytics_overview():
     """Get comprehensive analytics overview"""
+    metrics = pipeline_metrics()
 
     # Pipeline metrics
-    total_candidates = Candidate.query.count()
-    total_jobs = Job.query.count()
-    total_applications = Application.query.count()
-
-    # Candidate status breakdown
-    candidate_statuses = {}
-    for status in ['new', 'reviewing', 'interviewing', 'offer', 'hired', 'rejected']:
-        count = Candidate.query.filter_by(status=status).count()
-        candidate_statuses[status] = count
-
-    # Job status breakdown
-    job_statuses = {}
-    for status in ['open', 'closed', 'filled', 'on_hold']:
-        count = Job.query.filter_by(status=status).count()
-        job_statuses[status] = count
-
-    # Interview stats
-    total_interviews = Interview.query.count()
-    completed_interviews = Interview.query.filter_by(status='completed').count()
-    upcoming_interviews = Interview.query.filter(
-        Interview.scheduled_at > datetime.utcnow(),
-        Interview.status == 'scheduled'
-    ).count()
-
-    # Offer stats
-    total_offers = Offer.query.count()
-    accepted_offers = Offer.query.filter_by(status='accepted').count()
-    pending_offers = Offer.query.filter(Offer.status.in_(['sent', 'negotiating'])).count()
+    total_candidates = sum(metrics['candidate_statuses'].values())
+    total_jobs = sum(metrics['job_statuses'].values())
+
+    # Status breakdowns, keeping zero buckets for the known statuses
+    candidate_statuses = {
+        status: metrics['candidate_statuses'].get(status, 0)
+        for status in ['new', 'reviewing', 'interviewing', 'offer', 'hired', 'rejected']
+    }
+    job_statuses = {
+        status: metrics['job_statuses'].get(status, 0)
+        for status in ['open', 'closed', 'filled', 'on_hold']
+    }
+
+    # Interview and offer stats
+    interviews = metrics['interview_statuses']
+    offer_statuses = metrics['offer_statuses']
+    total_offers = sum(offer_statuses.values())
+    accepted_offers = offer_statuses.get('accepted', 0)
+    pending_offers = offer_statuses.get('sent', 0) + offer_statuses.get('negotiating', 0)
 
     # Calculate conversion rates
-    interview_rate = round((completed_interviews / total_candidates * 100), 1) if total_candidates > 0 else 0
+    interview_rate = round((interviews['completed'] / total_candidates * 100), 1) if total_candidates > 0 else 0
     offer_rate = round((total_offers / total_candidates * 100), 1) if total_candidates > 0 else 0
     hire_rate = round((accepted_offers / total_offers * 100), 1) if total_offers > 0 else 0
 
     # Top expertise areas
-    expertise_counts = {}
-    candidates = Candidate.query.all()
-    for c in candidates:
-        if c.primary_expertise:
-            expertise_counts[c.primary_expertise] = expertise_counts.get(c.primary_expertise, 0) + 1
-
-    top_expertise = sorted(expertise_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+    top_expertise = sorted(metrics['expertise_counts'].items(), key=lambda x: (-x[1], x[0]))[:5]
 
     return jsonify({
         'pipeline': {
             'total_candidates': total_candidates,
             'total_jobs': total_jobs,
-            'total_applications': total_applications
+            'total_applications': metrics['total_applications']
         },
         'candidate_statuses': candidate_statuses,
         'job_statuses': job_statuses,
         'interviews': {
-            'total': total_interviews,
-            'completed': completed_interviews,
-            'upcoming': upcoming_interviews
+            'total': interviews['total'],
+            'completed': interviews['completed'],
+            'upcoming': interviews['upcoming']
         },
         'offers': {
             'total': total_offers,
@@ -2116,13 +6146,14 @@ def get_analytics_overview():
 @app.route('/api/analytics/pipeline-funnel', methods=['GET'])
 def get_pipeline_funnel():
     """Get pipeline funnel metrics"""
+    statuses = pipeline_counter_snapshot()['candidate']
 
     funnel = {
-        'sourced': Candidate.query.filter_by(status='new').count(),
-        'screening': Candidate.query.filter_by(status='reviewing').count(),
-        'interviewing': Candidate.query.filter_by(status='interviewing').count(),
-        'offer': Candidate.query.filter_by(status='offer').count(),
-        'hired': Candidate.query.filter_by(status='hired').count()
+        'sourced': statuses.get('new', 0),
+        'screening': statuses.get('reviewing', 0),
+        'interviewing': statuses.get('interviewing', 0),
+        'offer': statuses.get('offer', 0),
+        'hired': statuses.get('hired', 0)
     }
 
     return jsonify({
@@ -2133,56 +6164,154 @@ def get_pipeline_funnel():
 
 @app.route('/api/analytics/time-to-hire', methods=['GET'])
 def get_time_to_hire():
-    """Get average time-to-hire metrics"""
+    """Get time-to-hire metrics from the status transition log
 
-    # Calculate average time from candidate creation to hire
-    hired_candidates = Candidate.query.filter_by(status='hired').all()
-
-    if not hired_candidates:
+    Measures creation to first 'hired' transition per candidate. With ?job_id it
+    measures applications to that job instead. ?from/?to bound the hire date.
+    """
+    entity = 'application' if request.args.get('job_id') else 'candidate'
+    try:
+        hires = filter_transitions(db.session.query(
+            StatusTransition.entity_id,
+            func.min(StatusTransition.since_created_seconds).label('seconds')
+        ).filter(
+            StatusTransition.entity == entity,
+            StatusTransition.to_status == 'hired'
+        )).group_by(StatusTransition.entity_id).subquery()
+    except ValueError:
+        return jsonify({"error": "from/to must be ISO timestamps and job_id an integer"}), 400
+
+    total_hired, average_seconds = db.session.query(func.count(), func.avg(hires.c.seconds)).one()
+
+    if not total_hired:
         return jsonify({
             'average_days': 0,
             'total_hired': 0,
             'message': 'No hired candidates yet'
         })
 
-    total_days = 0
-    for candidate in hired_candidates:
-        days = (candidate.updated_at - candidate.created_at).days
-        total_days += days
-
-    avg_days = round(total_days / len(hired_candidates), 1)
+    percentiles = duration_percentiles(db.session.query(hires), hires.c.seconds, total_hired)
+    avg_days = seconds_to_days(average_seconds)
 
     return jsonify({
         'average_days': avg_days,
-        'total_hired': len(hired_candidates),
+        'median_days': seconds_to_days(percentiles[50]),
+        'p75_days': seconds_to_days(percentiles[75]),
+        'p90_days': seconds_to_days(percentiles[90]),
+        'total_hired': total_hired,
         'message': f'Average time to hire: {avg_days} days'
     })
 
 
-@app.route('/api/analytics/source-effectiveness', methods=['GET'])
-def get_source_effectiveness():
-    """Analyze effectiveness of different candidate sources"""
+@app.route('/api/analytics/stage-dwell', methods=['GET'])
+def get_stage_dwell():
+    """Get time spent in each status before moving on
+
+    ?entity=candidate|application|offer (default candidate); ?from/?to bound the
+    transition date and ?job_id restricts to one job.
+    """
+    entity = request.args.get('entity', 'candidate')
+    if entity not in STATUS_TRANSITION_MODELS:
+        return jsonify({"error": f"entity must be one of: {', '.join(STATUS_TRANSITION_MODELS)}"}), 400
+
+    try:
+        query = filter_transitions(StatusTransition.query.filter(
+            StatusTransition.entity == entity,
+            StatusTransition.from_status.isnot(None),
+            StatusTransition.dwell_seconds.isnot(None)
+        ))
+    except ValueError:
+        return jsonify({"error": "from/to must be ISO timestamps and job_id an integer"}), 400
+
+    rows = query.with_entities(
+        StatusTransition.from_status,
+        func.count(),
+        func.avg(StatusTransition.dwell_seconds),
+        func.max(StatusTransition.dwell_seconds)
+    ).group_by(StatusTransition.from_status).all()
+
+    stages = {}
+    for status, count, average_seconds, max_seconds in rows:
+        percentiles = duration_percentiles(query.filter(StatusTransition.from_status == status),
+                                           StatusTransition.dwell_seconds, count, (50, 90))
+        stages[status] = {
+            'transitions': count,
+            'average_days': seconds_to_days(average_seconds),
+            'median_days': seconds_to_days(percentiles[50]),
+            'p90_days': seconds_to_days(percentiles[90]),
+            'max_days': seconds_to_days(max_seconds)
+        }
+
+    return jsonify({'entity': entity, 'stages': stages})
+
+
+PERIOD_FORMATS = {'week': '%Y-W%W', 'month': '%Y-%m'}
+
+
+def created_window(start, end):
+    """Parse an optional [start, end) creation window; raises ValueError on bad input"""
+    return (datetime.fromisoformat(start) if start else None,
+            datetime.fromisoformat(end) if end else None)
+
+
+def period_bucket(column, interval):
+    """SQL expression labelling a timestamp with its week or month"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(func.date_trunc(interval, column), 'IYYY-"W"IW' if interval == 'week' else 'YYYY-MM')
+    return func.strftime(PERIOD_FORMATS[interval], column)
+
+
+def source_conversion(model, source_column, window, interval=None):
+    """Totals, hires and conversion rate per source with one GROUP BY query"""
+    keys = [func.coalesce(source_column, 'unknown')]
+    if interval:
+        keys.append(period_bucket(model.created_at, interval))
+
+    query = db.session.query(*keys, func.count(), func.sum(case((model.status == 'hired', 1), else_=0)))
+    start, end = window
+    if start:
+        query = query.filter(model.created_at >= start)
+    if end:
+        query = query.filter(model.created_at < end)
+
+    def rates(total, hired):
+        return {
+            'total': total,
+            'hired': hired,
+            'conversion_rate': round((hired / total * 100), 1) if total > 0 else 0
+        }
 
-    # Group candidates by source
     sources = {}
-    candidates = Candidate.query.all()
+    for row in query.group_by(*keys):
+        total, hired = row[-2], row[-1] or 0
+        entry = sources.setdefault(row[0], {'total': 0, 'hired': 0})
+        entry['total'] += total
+        entry['hired'] += hired
+        if interval:
+            entry.setdefault('periods', {})[row[1]] = rates(total, hired)
+    for entry in sources.values():
+        entry.update(rates(entry['total'], entry['hired']))
+    return sources
 
-    for c in candidates:
-        source = 'Direct' if not c.notes else 'Boolean Search' if 'Boolean' in (c.notes or '') else 'Other'
-        if source not in sources:
-            sources[source] = {'total': 0, 'hired': 0}
-        sources[source]['total'] += 1
-        if c.status == 'hired':
-            sources[source]['hired'] += 1
 
-    # Calculate conversion rates
-    for source in sources:
-        total = sources[source]['total']
-        hired = sources[source]['hired']
-        sources[source]['conversion_rate'] = round((hired / total * 100), 1) if total > 0 else 0
+@app.route('/api/analytics/source-effectiveness', methods=['GET'])
+def get_source_effectiveness():
+    """Analyze effectiveness of different candidate and application sources
+
+    ?from/?to bound the creation date (ISO timestamps); ?interval=week|month adds a
+    per-period breakdown. Rows without a recorded source are reported as 'unknown'.
+    """
+    interval = request.args.get('interval')
+    if interval and interval not in PERIOD_FORMATS:
+        return jsonify({"error": f"interval must be one of: {', '.join(PERIOD_FORMATS)}"}), 400
+    try:
+        window = created_window(request.args.get('from'), request.args.get('to'))
+    except ValueError:
+        return jsonify({"error": "from/to must be ISO timestamps"}), 400
 
     return jsonify({
-        'sources': sources
+        'sources': source_conversion(Candidate, Candidate.source, window, interval),
+        'application_sources': source_conversion(Application, Application.source, window, interval)
     })
 
 
@@ -2264,10 +6393,14 @@ def submit_public_application():
             resume_url=data.get('resume_url'),
             years_experience=data.get('years_experience'),
             primary_expertise=data.get('primary_expertise'),
-            status='new'
+            status='new',
+            source='landing_page'
         )
         db.session.add(candidate)
         db.session.flush()  # Get candidate ID
+        record_status_transition('candidate', candidate, None)
+
+    reindex_candidate_tokens(candidate)
 
     # Create application
     application = Application(
@@ -2278,6 +6411,7 @@ def submit_public_application():
         notes=data.get('cover_letter', '')
     )
     db.session.add(application)
+    record_status_transition('application', application, None)
 
     try:
         db.session.commit()
@@ -2291,6 +6425,30 @@ def submit_public_application():
         return jsonify({"error": str(e)}), 500
 
 
+# ==================== DATABASE UPGRADE ====================
+
+def upgrade_database():
+    """Create missing tables, apply pending MIGRATIONS and backfill the derived tables"""
+    db.create_all()
+    run_migrations()
+    for backfill in (backfill_candidate_index, backfill_pipeline_counters, backfill_status_transitions):
+        begin_write()
+        backfill()
+        db.session.commit()
+
+
+@app.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Bring the database schema up to date; run once per deploy, before starting workers"""
+    upgrade_database()
+    applied = {row.version for row in SchemaMigration.query}
+    pending = [f"{version} ({name})" for version, name, _ in MIGRATIONS if version not in applied]
+    print(f"Database is at migration {max(applied, default=0)}"
+          + (f"; still pending: {', '.join(pending)}" if pending else ""))
+
+
 if __name__ == '__main__':
+    with app.app_context():
+        upgrade_database()
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=True, host='0.0.0.0', port=port)
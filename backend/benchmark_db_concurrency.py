@@ -0,0 +1,119 @@
+"""
+Write-throughput benchmark for the ATS database configuration
+
+Starts N worker processes that each create candidates and move them to 'reviewing'
+through the Flask app -- the same code path a gunicorn worker runs, including the
+token index, pipeline counters and status log -- against one shared database, and
+reports committed transactions per second, failures and latency per worker count.
+
+    python benchmark_db_concurrency.py                          # temp SQLite file, WAL
+    python benchmark_db_concurrency.py --journal-mode DELETE    # rollback journal, for comparison
+    DATABASE_URL=postgresql://... python benchmark_db_concurrency.py --workers 1 4 16
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_worker(worker_id, run_id, duration, barrier, results):
+    import app as ats
+
+    client = ats.app.test_client()
+    latencies = []
+    failures = 0
+    n = 0
+
+    barrier.wait()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        n += 1
+        started = time.perf_counter()
+        response = client.post('/api/candidates', json={
+            'first_name': 'Bench',
+            'last_name': f'Worker{worker_id}',
+            'email': f'bench-{run_id}-{worker_id}-{n}@example.com',
+            'skills': 'python,pytorch,transformers',
+            'primary_expertise': 'NLP'
+        })
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 201:
+            failures += 1
+            continue
+
+        started = time.perf_counter()
+        response = client.put(f"/api/candidates/{response.get_json()['id']}", json={'status': 'reviewing'})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            failures += 1
+
+    results.put((len(latencies) - failures, failures, latencies))
+
+
+def run_round(workers, duration):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    run_id = uuid.uuid4().hex[:8]
+
+    processes = [context.Process(target=run_worker, args=(i, run_id, duration, barrier, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    committed = sum(c for c, _, _ in collected)
+    failures = sum(f for _, f, _ in collected)
+    latencies = sorted(l for _, _, ls in collected for l in ls)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0
+    return {
+        'workers': workers,
+        'committed': committed,
+        'per_second': committed / duration,
+        'failures': failures,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p99_ms': p99 * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per round')
+    parser.add_argument('--journal-mode', default=None, help='override SQLITE_JOURNAL_MODE (e.g. WAL, DELETE)')
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix='ats-bench-'), 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    if args.journal_mode:
+        os.environ['SQLITE_JOURNAL_MODE'] = args.journal_mode
+    os.environ['ENRICHMENT_WORKERS'] = '0'  # keep the background queue out of the measurement
+
+    # Create the schema once so workers do not race on DDL
+    import app as ats
+    with ats.app.app_context():
+        ats.upgrade_database()
+        print(f"Database: {ats.db.engine.url.render_as_string(hide_password=True)}")
+        if ats.db.engine.dialect.name == 'sqlite':
+            print(f"SQLite pragmas: {ats.SQLITE_PRAGMAS}")
+        ats.db.engine.dispose()
+
+    print(f"{'workers':>7} {'txns':>7} {'txn/s':>8} {'failed':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        row = run_round(workers, args.duration)
+        print(f"{row['workers']:>7} {row['committed']:>7} {row['per_second']:>8.1f} {row['failures']:>7} "
+              f"{row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Configure the app before it is imported: an in-memory database, caches outside the
+# instance folder and no background threads polling the database during tests
+_cache_dir = tempfile.mkdtemp(prefix='ats-test-')
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['HTTP_CACHE_PATH'] = os.path.join(_cache_dir, 'http_cache.db')
+os.environ['SCHOLAR_CACHE_PATH'] = os.path.join(_cache_dir, 'scholar_cache.db')
+os.environ['ENRICHMENT_WORKERS'] = '0'
+os.environ['SAVED_SEARCH_SCHEDULER_INTERVAL'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as ats  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    with ats.app.app_context():
+        ats.upgrade_database()
+    return ats.app
+
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        yield ats.db
+        ats.db.session.rollback()
@@ -0,0 +1,46 @@
+"""Conference stats must count a shared paper once, under the class of the paper's own venue"""
+import app as ats
+
+
+def add_candidate(db, email):
+    candidate = ats.Candidate(first_name='Conference', last_name='Author', email=email)
+    db.session.add(candidate)
+    db.session.flush()
+    return candidate
+
+
+def add_publication(db, candidate, title, venue, citations=0):
+    paper, = ats.resolve_papers([{'title': title, 'venue': venue, 'citation_count': citations}])
+    db.session.add(ats.Publication(candidate_id=candidate.id, paper_id=paper.id, title=title, venue=venue,
+                                   citation_count=citations))
+    db.session.flush()
+    return paper
+
+
+def test_shared_paper_keeps_the_class_of_its_first_venue(app, db):
+    first, second = add_candidate(db, 'icml.author@example.com'), add_candidate(db, 'neurips.author@example.com')
+    paper = add_publication(db, first, 'Conflicting Venues Paper', 'ICML 2023', citations=10_000)
+    add_publication(db, second, 'Conflicting Venues Paper', 'NeurIPS 2023', citations=10_000)
+    db.session.commit()
+    try:
+        data = app.test_client().get('/api/publications/analyze-conferences').get_json()
+        listed = [row for row in data['papers'] if row['paper_id'] == paper.id]
+        assert len(listed) == 1
+        assert listed[0]['conference'] == 'ICML'
+        assert {author['candidate_id'] for author in listed[0]['candidates']} == {first.id, second.id}
+    finally:
+        ats.Publication.query.filter_by(paper_id=paper.id).delete()
+        db.session.delete(paper)
+        db.session.delete(first)
+        db.session.delete(second)
+        db.session.commit()
+
+
+def test_conference_venue_replaces_an_uninformative_one(db):
+    candidate = add_candidate(db, 'preprint.author@example.com')
+    paper = add_publication(db, candidate, 'Preprint Then Published', 'arXiv')
+    assert paper.venue_class is None
+    add_publication(db, candidate, 'Preprint Then Published', 'CVPR 2024')
+    assert (paper.venue, paper.venue_class) == ('CVPR 2024', 'CVPR')
+    add_publication(db, candidate, 'Preprint Then Published', 'ICCV 2025')
+    assert paper.venue_class == 'CVPR'
@@ -0,0 +1,30 @@
+"""Queued enrichment tasks must only be stored with a usable retry limit"""
+import pytest
+
+import app as ats
+
+
+@pytest.fixture
+def candidate(db):
+    candidate = ats.Candidate(first_name='Task', last_name='Candidate', email='task.candidate@example.com')
+    db.session.add(candidate)
+    db.session.commit()
+    yield candidate
+    ats.EnrichmentTask.query.filter_by(candidate_id=candidate.id).delete()
+    db.session.delete(candidate)
+    db.session.commit()
+
+
+@pytest.mark.parametrize('max_attempts', ['x', None, 0, -1, ats.TASK_MAX_ATTEMPTS_LIMIT + 1, [3]])
+def test_invalid_max_attempts_is_rejected(app, candidate, max_attempts):
+    response = app.test_client().post(f'/api/candidates/{candidate.id}/enrich/github/async',
+                                      json={'max_attempts': max_attempts})
+    assert response.status_code == 400
+    assert ats.EnrichmentTask.query.filter_by(candidate_id=candidate.id).count() == 0
+
+
+def test_valid_max_attempts_is_stored_as_integer(app, candidate):
+    response = app.test_client().post(f'/api/candidates/{candidate.id}/enrich/github/async',
+                                      json={'max_attempts': '5'})
+    assert response.status_code == 202
+    assert response.get_json()['task']['max_attempts'] == 5
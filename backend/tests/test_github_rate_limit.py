@@ -0,0 +1,63 @@
+"""The GitHub rate limiter must not spend budget past a fan-out deadline or choke on headers"""
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+import app as ats
+
+
+class FakeSession:
+    def __init__(self):
+        self.timeouts = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.timeouts.append(timeout)
+        return SimpleNamespace(status_code=200, headers={})
+
+
+def client(limiter, session):
+    github = ats.GitHubClient(limiter, max_workers=2, deadline=1)
+    github.session = ats.RateLimitedSession(session, limiter)
+    return github
+
+
+def test_paced_call_is_not_sent_after_the_fan_out_deadline():
+    limiter = ats.GitHubRateLimiter(['token'], low_water=0.5, max_wait=10)
+    limiter.record(0, 'core', 100, 2, time.time() + 30)  # Next paced slot is ~15s away
+    session = FakeSession()
+    started = time.monotonic()
+    github = client(limiter, session)
+    results = github.fan_out([lambda: github.get(f'{ats.GITHUB_API_URL}/users/someone')])
+    assert results == [None]
+    assert session.timeouts == []
+    assert time.monotonic() - started < 1
+
+
+def test_fan_out_call_timeout_is_cut_to_the_deadline():
+    session = FakeSession()
+    github = client(ats.GitHubRateLimiter(['token']), session)
+    results = github.fan_out([lambda: github.get(f'{ats.GITHUB_API_URL}/users/someone').status_code])
+    assert results == [200]
+    assert 0 < session.timeouts[0] <= 1
+
+
+def observe_403(limiter, retry_after, reset):
+    limiter.observe(0, 'core', SimpleNamespace(status_code=403, headers={
+        'Retry-After': retry_after, 'X-RateLimit-Remaining': '50', 'X-RateLimit-Reset': str(reset),
+        'X-RateLimit-Limit': '100'}))
+    return limiter._state[(0, 'core')]
+
+
+@pytest.mark.parametrize('retry_after', ['60', formatdate(time.time() + 60, usegmt=True)])
+def test_retry_after_backs_the_token_off(retry_after):
+    state = observe_403(ats.GitHubRateLimiter(['token']), retry_after, int(time.time()) + 3600)
+    assert state['remaining'] == 0
+    assert abs(state['reset'] - (time.time() + 60)) < 5
+
+
+def test_unparseable_retry_after_falls_back_to_reset_header():
+    reset = int(time.time()) + 100
+    state = observe_403(ats.GitHubRateLimiter(['token']), 'soon', reset)
+    assert (state['reset'], state['remaining']) == (reset, 50)
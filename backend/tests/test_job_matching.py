@@ -0,0 +1,60 @@
+"""Job matching must validate its parameters and see other workers' candidate writes"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as ats
+
+
+@pytest.fixture
+def job(db):
+    job = ats.Job(title='Research Scientist', company='Example Labs', required_expertise='NLP',
+                  required_skills='python, pytorch')
+    db.session.add(job)
+    db.session.commit()
+    yield job
+    db.session.delete(job)
+    db.session.commit()
+
+
+@pytest.mark.parametrize('body', [{'top_n': 'abc'}, {'min_score': 'abc'}, {'top_n': 0}, {'min_score': None}])
+def test_invalid_match_parameters_are_rejected(app, job, body):
+    response = app.test_client().post(f'/api/jobs/{job.id}/match-candidates', json=body)
+    assert response.status_code == 400
+
+
+def insert_candidate(db, email, **values):
+    """Write a candidate with Core, as another worker would: no ORM events reach this process's store"""
+    result = db.session.execute(ats.Candidate.__table__.insert().values(
+        first_name='Feature', last_name='Store', email=email, **values))
+    db.session.commit()
+    return result.inserted_primary_key[0]
+
+
+def test_sync_sees_late_commit_behind_watermark(db):
+    store = ats.CandidateFeatureStore()
+    candidate_id = insert_candidate(db, 'late.commit@example.com', h_index=1)
+    store.sync()
+    # Flushed before the watermark was taken, committed after the sync
+    db.session.execute(ats.Candidate.__table__.update().where(ats.Candidate.id == candidate_id).values(
+        h_index=40, updated_at=store.watermark - timedelta(seconds=5)))
+    db.session.commit()
+    store.sync()
+    assert store.features[store.row_of[candidate_id]][0] == 40
+    db.session.execute(ats.Candidate.__table__.delete().where(ats.Candidate.id == candidate_id))
+    db.session.commit()
+
+
+def test_sync_drops_deleted_ids_when_count_is_unchanged(db, monkeypatch):
+    store = ats.CandidateFeatureStore()
+    deleted_id = insert_candidate(db, 'deleted@example.com')
+    kept_id = insert_candidate(db, 'kept@example.com')  # So the added row cannot reuse the deleted id
+    store.sync()
+    db.session.execute(ats.Candidate.__table__.delete().where(ats.Candidate.id == deleted_id))
+    added_id = insert_candidate(db, 'added@example.com', updated_at=datetime.utcnow() + timedelta(seconds=1))
+    monkeypatch.setattr(ats, 'FEATURE_STORE_RECONCILE_SECONDS', 0)
+    store.sync()
+    assert deleted_id not in store.row_of
+    assert added_id in store.row_of
+    db.session.execute(ats.Candidate.__table__.delete().where(ats.Candidate.id.in_([kept_id, added_id])))
+    db.session.commit()
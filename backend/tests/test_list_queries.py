@@ -0,0 +1,80 @@
+"""List endpoints must issue a fixed number of queries however many rows they return"""
+from datetime import datetime, timedelta
+import itertools
+
+import pytest
+from sqlalchemy import event
+
+import app as ats
+
+LIST_ENDPOINTS = [
+    '/api/candidates',
+    '/api/candidates?limit=500',
+    '/api/candidates?all=1',
+    '/api/jobs',
+    '/api/jobs?limit=500',
+    '/api/jobs?all=1',
+    '/api/applications?all=1',
+    '/api/interviews?all=1',
+    '/api/offers?all=1',
+]
+
+_sequence = itertools.count()
+
+
+def seed(n):
+    """Add n candidates, each with a job, an application, an interview, an offer and a publication"""
+    now = datetime.utcnow()
+    for _ in range(n):
+        i = next(_sequence)
+        candidate = ats.Candidate(first_name='Test', last_name=f'Candidate{i}', email=f'candidate{i}@example.com',
+                                  skills='python, pytorch', primary_expertise='NLP')
+        job = ats.Job(title=f'Research Engineer {i}', company='Example Labs', confidential=i % 2 == 0)
+        ats.db.session.add_all([candidate, job])
+        ats.db.session.flush()
+        ats.db.session.add_all([
+            ats.Application(candidate_id=candidate.id, job_id=job.id),
+            ats.Interview(candidate_id=candidate.id, job_id=job.id, scheduled_at=now + timedelta(days=1)),
+            ats.Offer(candidate_id=candidate.id, job_id=job.id, salary=200000),
+            ats.Publication(candidate_id=candidate.id, title=f'Paper {i}', venue='NeurIPS 2023'),
+        ])
+    ats.db.session.commit()
+
+
+def count_queries(client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(ats.db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(ats.db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+@pytest.mark.parametrize('url', LIST_ENDPOINTS)
+def test_query_count_does_not_grow_with_rows(db, app, url):
+    client = app.test_client()
+    seed(3)
+    few = count_queries(client, url)
+    seed(30)
+    many = count_queries(client, url)
+    assert many == few, f"{url}: {few} queries for a few rows, {many} after adding 30 more"
+
+
+def test_lists_default_to_one_page(db, app):
+    seed(ats.DEFAULT_PAGE_SIZE + 1)
+    client = app.test_client()
+    page = client.get('/api/candidates').get_json()
+    assert page['count'] == ats.DEFAULT_PAGE_SIZE
+    paged = [c['id'] for c in page['candidates']]
+    while page['has_more']:
+        page = client.get('/api/candidates', query_string={'cursor': page['next_cursor']}).get_json()
+        paged.extend(c['id'] for c in page['candidates'])
+    everything = client.get('/api/candidates?all=1').get_json()
+    assert sorted(paged) == sorted(c['id'] for c in everything['candidates'])
+    assert len(set(paged)) == len(paged)
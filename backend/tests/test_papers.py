@@ -0,0 +1,25 @@
+"""Shared paper records must not merge different papers or steal identifiers"""
+import app as ats
+
+
+def test_same_title_with_different_arxiv_ids_stays_separate(db):
+    first, = ats.resolve_papers([{'arxiv_id': '2101.00001', 'title': 'Deep Learning'}])
+    second, = ats.resolve_papers([{'arxiv_id': '2305.99999', 'title': 'Deep learning.'}])
+    assert first is not second
+    assert (first.arxiv_id, second.arxiv_id) == ('2101.00001', '2305.99999')
+
+
+def test_title_match_without_identifiers_reuses_paper(db):
+    paper, = ats.resolve_papers([{'arxiv_id': '2101.00002', 'title': 'Attention Everywhere'}])
+    again, = ats.resolve_papers([{'title': 'attention everywhere', 'venue': 'ICML'}])
+    assert again is paper
+    assert paper.venue == 'ICML'
+
+
+def test_identifier_owned_by_another_paper_is_not_filled_in(db):
+    owner, = ats.resolve_papers([{'doi': '10.1000/owned', 'title': 'Owner'}])
+    paper, = ats.resolve_papers([{'arxiv_id': '2101.00003', 'title': 'Matched By arXiv'}])
+    again, = ats.resolve_papers([{'arxiv_id': '2101.00003', 'doi': '10.1000/owned', 'title': 'Matched By arXiv'}])
+    assert again is paper
+    assert paper.doi is None
+    assert owner.doi == '10.1000/owned'
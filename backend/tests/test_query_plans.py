@@ -0,0 +1,10 @@
+"""Hot endpoint queries must be served by an index, not a full table scan"""
+import pytest
+
+import app as ats
+
+
+@pytest.mark.parametrize('name, build', ats.QUERY_PLAN_CHECKS, ids=[name for name, _ in ats.QUERY_PLAN_CHECKS])
+def test_query_uses_index(db, name, build):
+    plan = ats.explain_query(build())
+    assert not ats.full_scans(plan), f"{name} scans a whole table:\n" + "\n".join(plan)
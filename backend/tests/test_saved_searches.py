@@ -0,0 +1,43 @@
+"""Saved-search runs and schedules must fail cleanly on deleted searches and bad input"""
+from types import SimpleNamespace
+
+import pytest
+
+import app as ats
+
+
+@pytest.fixture
+def search(db):
+    search = ats.SavedSearch(search_query='"machine learning" AND python', data_sources='GitHub')
+    db.session.add(search)
+    db.session.commit()
+    yield search
+    if db.session.get(ats.SavedSearch, search.id):
+        db.session.delete(search)
+        db.session.commit()
+
+
+@pytest.mark.parametrize('status_code', [200, 500])
+def test_search_deleted_during_run_is_not_found(app, db, search, monkeypatch, status_code):
+    def search_and_delete(query, headers):
+        ats.SavedSearch.query.filter_by(id=search.id).delete()
+        db.session.commit()
+        return SimpleNamespace(status_code=status_code, json=lambda: {'items': [], 'total_count': 0}), query
+
+    monkeypatch.setattr(ats, 'github_user_search', search_and_delete)
+    response = app.test_client().post(f'/api/saved-searches/{search.id}/run')
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('schedule', [
+    'daily',
+    ['daily'],
+    {'frequency': 'monthly', 'dayOfMonth': 'first'},
+    {'frequency': 'weekly', 'daysOfWeek': 'Mon'},
+    {'frequency': 'daily', 'timezone': 5},
+])
+def test_invalid_schedule_is_rejected(app, search, schedule):
+    response = app.test_client().put(f'/api/saved-searches/{search.id}/schedule',
+                                     json={'execution_mode': 'auto-run', 'schedule': schedule})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
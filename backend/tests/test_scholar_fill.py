@@ -0,0 +1,33 @@
+"""Scholar publication fills that hang must not hold up later enrichments"""
+import threading
+
+import app as ats
+
+
+class HangingScholarly:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def fill(self, entry):
+        if entry.get('hang'):
+            self.release.wait(5)
+        return dict(entry, bib=dict(entry['bib'], venue='NeurIPS'))
+
+
+def entry(pub_id, hang=False):
+    return {'author_pub_id': pub_id, 'hang': hang, 'bib': {'title': f'Paper {pub_id}'}}
+
+
+def test_hung_fills_do_not_block_later_enrichments(app, monkeypatch):
+    monkeypatch.setattr(ats, 'SCHOLAR_FILL_TIMEOUT', 0.2)
+    scholarly = HangingScholarly()
+    try:
+        with app.app_context():
+            hung = [entry(f'hung-{i}', hang=True) for i in range(ats.scholar_fill_pool.max_workers + 2)]
+            records, _ = ats.fill_scholar_publications(scholarly, hung)
+            assert all('venue' not in record['bib'] for record in records)
+
+            records, _ = ats.fill_scholar_publications(scholarly, [entry('after-hang')])
+            assert records[0]['bib']['venue'] == 'NeurIPS'
+    finally:
+        scholarly.release.set()
@@ -0,0 +1,36 @@
+"""Skill extraction must find keywords as words, including their plurals"""
+import pytest
+
+import app as ats
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return ats.SkillExtractor(ats.AI_ML_SKILLS)
+
+
+def test_plurals_match_their_keyword(extractor):
+    found = extractor.extract('Researcher in graph neural networks, large language models, Transformers, '
+                              'CNNs and word embeddings for robots')
+    assert found == {
+        'deep_learning': ['cnn', 'neural network', 'transformer'],
+        'nlp': ['embedding', 'language model'],
+        'robotics': ['robot'],
+    }
+
+
+@pytest.mark.parametrize('text', [
+    'Girls who code, world class',
+    'She goes to the Google office',
+    'Works on algorithms and cargo tooling',
+])
+def test_short_keywords_match_only_as_words(extractor, text):
+    found = extractor.extract(text)
+    assert 'rl' not in found.get('reinforcement_learning', [])
+    assert 'go' not in found.get('programming', [])
+
+
+def test_keywords_with_symbols_still_match(extractor):
+    found = extractor.extract('RL with q-learning in C++ and Go')
+    assert found['reinforcement_learning'] == ['q-learning', 'rl']
+    assert found['programming'] == ['c++', 'go']
@@ -5,6 +5,35 @@ import './App.css';
 import BooleanGenerator from './components/BooleanGenerator';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+const TASK_POLL_INTERVAL_MS = 2000;
+const PAGE_SIZE = 50;
+
+// One page of a list endpoint, newest first; pass the previous page's nextCursor for the next
+const fetchPage = async (path, collection, cursor) => {
+  const params = { limit: PAGE_SIZE };
+  if (cursor) params.cursor = cursor;
+  const { data } = await axios.get(`${API_URL}${path}`, { params });
+  return { items: data[collection] || [], nextCursor: data.next_cursor || null };
+};
+
+function LoadMoreButton({ cursor, onLoadMore }) {
+  if (!cursor) return null;
+  return (
+    <div className="load-more">
+      <button className="btn-primary" onClick={() => onLoadMore(cursor)}>Load more</button>
+    </div>
+  );
+}
+
+// Poll a background enrichment task until it finishes; resolves with its result
+const waitForTask = async (taskId) => {
+  for (;;) {
+    const { data: task } = await axios.get(`${API_URL}/api/tasks/${taskId}`);
+    if (task.status === 'succeeded') return task.result;
+    if (task.status === 'failed') throw new Error(task.error || 'Enrichment failed');
+    await new Promise(resolve => setTimeout(resolve, TASK_POLL_INTERVAL_MS));
+  }
+};
 
 // ==================== CANDIDATE LANDING PAGE ====================
 
@@ -327,7 +356,9 @@ function CandidateLandingPage() {
 function App() {
   const [activeTab, setActiveTab] = useState('dashboard');
   const [candidates, setCandidates] = useState([]);
+  const [candidatesCursor, setCandidatesCursor] = useState(null);
   const [jobs, setJobs] = useState([]);
+  const [jobsCursor, setJobsCursor] = useState(null);
   const [stats, setStats] = useState({});
   const [loading, setLoading] = useState(false);
   const [apiStatus, setApiStatus] = useState('checking...');
@@ -363,11 +394,13 @@ function App() {
     }
   };
 
-  const fetchCandidates = async () => {
-    setLoading(true);
+  // Without a cursor the list restarts at the first page; with one the next page is appended
+  const fetchCandidates = async (cursor) => {
+    if (!cursor) setLoading(true);
     try {
-      const response = await axios.get(`${API_URL}/api/candidates`);
-      setCandidates(response.data.candidates || []);
+      const page = await fetchPage('/api/candidates', 'candidates', cursor);
+      setCandidates(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setCandidatesCursor(page.nextCursor);
     } catch (err) {
       console.error('Error fetching candidates:', err);
     } finally {
@@ -375,11 +408,12 @@ function App() {
     }
   };
 
-  const fetchJobs = async () => {
-    setLoading(true);
+  const fetchJobs = async (cursor) => {
+    if (!cursor) setLoading(true);
     try {
-      const response = await axios.get(`${API_URL}/api/jobs`);
-      setJobs(response.data.jobs || []);
+      const page = await fetchPage('/api/jobs', 'jobs', cursor);
+      setJobs(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setJobsCursor(page.nextCursor);
     } catch (err) {
       console.error('Error fetching jobs:', err);
     } finally {
@@ -487,7 +521,9 @@ function App() {
             onDelete={deleteCandidate}
             showForm={showCandidateForm}
             setShowForm={setShowCandidateForm}
-            onRefresh={fetchCandidates}
+            onRefresh={() => fetchCandidates()}
+            nextCursor={candidatesCursor}
+            onLoadMore={fetchCandidates}
           />
         )}
         {activeTab === 'jobs' && (
@@ -497,7 +533,9 @@ function App() {
             onDelete={deleteJob}
             showForm={showJobForm}
             setShowForm={setShowJobForm}
-            onRefresh={fetchJobs}
+            onRefresh={() => fetchJobs()}
+            nextCursor={jobsCursor}
+            onLoadMore={fetchJobs}
           />
         )}
         {activeTab === 'analytics' && <AnalyticsView />}
@@ -554,7 +592,7 @@ function DashboardView({ stats }) {
 }
 
 // Candidates View
-function CandidatesView({ candidates, loading, onDelete, showForm, setShowForm, onRefresh }) {
+function CandidatesView({ candidates, loading, onDelete, showForm, setShowForm, onRefresh, nextCursor, onLoadMore }) {
   const [newCandidate, setNewCandidate] = useState({
     first_name: '',
     last_name: '',
@@ -567,12 +605,13 @@ function CandidatesView({ candidates, loading, onDelete, showForm, setShowForm,
   const [enriching, setEnriching] = useState({});
   const [impactScores, setImpactScores] = useState({});
 
-  // Enrich candidate from various sources
+  // Enrich candidate from various sources; the fetch runs on a background worker
   const enrichCandidate = async (candidateId, source) => {
     setEnriching(prev => ({ ...prev, [`${candidateId}-${source}`]: true }));
     try {
-      const response = await axios.post(`${API_URL}/api/candidates/${candidateId}/enrich/${source}`);
-      alert(`✅ ${response.data.message}`);
+      const response = await axios.post(`${API_URL}/api/candidates/${candidateId}/enrich/${source}/async`);
+      const result = await waitForTask(response.data.task.id);
+      alert(`✅ ${result.message}`);
       onRefresh();
     } catch (err) {
       alert(`❌ Error: ${err.response?.data?.error || err.message}`);
@@ -825,6 +864,7 @@ function CandidatesView({ candidates, loading, onDelete, showForm, setShowForm,
               </div>
             </div>
           ))}
+          <LoadMoreButton cursor={nextCursor} onLoadMore={onLoadMore} />
         </div>
       )}
     </div>
@@ -832,7 +872,7 @@ function CandidatesView({ candidates, loading, onDelete, showForm, setShowForm,
 }
 
 // Jobs View
-function JobsView({ jobs, loading, onDelete, showForm, setShowForm, onRefresh }) {
+function JobsView({ jobs, loading, onDelete, showForm, setShowForm, onRefresh, nextCursor, onLoadMore }) {
   const [newJob, setNewJob] = useState({
     title: '',
     company: '',
@@ -1036,6 +1076,7 @@ function JobsView({ jobs, loading, onDelete, showForm, setShowForm, onRefresh })
               </div>
             </div>
           ))}
+          <LoadMoreButton cursor={nextCursor} onLoadMore={onLoadMore} />
         </div>
       )}
     </div>
@@ -1094,6 +1135,7 @@ function AnalyticsView() {
 // Campaigns View
 function CampaignsView() {
   const [campaigns, setCampaigns] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showForm, setShowForm] = useState(false);
 
@@ -1101,10 +1143,11 @@ function CampaignsView() {
     fetchCampaigns();
   }, []);
 
-  const fetchCampaigns = async () => {
+  const fetchCampaigns = async (cursor) => {
     try {
-      const response = await axios.get(`${API_URL}/api/campaigns`);
-      setCampaigns(response.data.campaigns || []);
+      const page = await fetchPage('/api/campaigns', 'campaigns', cursor);
+      setCampaigns(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error('Error fetching campaigns:', err);
     } finally {
@@ -1154,6 +1197,7 @@ function CampaignsView() {
           </div>
         </div>
       ))}
+      <LoadMoreButton cursor={nextCursor} onLoadMore={fetchCampaigns} />
     </div>
   );
 }
@@ -1161,16 +1205,18 @@ function CampaignsView() {
 // Interviews View
 function InterviewsView() {
   const [interviews, setInterviews] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchInterviews();
   }, []);
 
-  const fetchInterviews = async () => {
+  const fetchInterviews = async (cursor) => {
     try {
-      const response = await axios.get(`${API_URL}/api/interviews`);
-      setInterviews(response.data.interviews || []);
+      const page = await fetchPage('/api/interviews', 'interviews', cursor);
+      setInterviews(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error('Error fetching interviews:', err);
     } finally {
@@ -1220,6 +1266,7 @@ function InterviewsView() {
           </div>
         ))
       )}
+      <LoadMoreButton cursor={nextCursor} onLoadMore={fetchInterviews} />
     </div>
   );
 }
@@ -1227,16 +1274,18 @@ function InterviewsView() {
 // Offers View
 function OffersView() {
   const [offers, setOffers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchOffers();
   }, []);
 
-  const fetchOffers = async () => {
+  const fetchOffers = async (cursor) => {
     try {
-      const response = await axios.get(`${API_URL}/api/offers`);
-      setOffers(response.data.offers || []);
+      const page = await fetchPage('/api/offers', 'offers', cursor);
+      setOffers(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error('Error fetching offers:', err);
     } finally {
@@ -1288,6 +1337,7 @@ function OffersView() {
           </div>
         ))
       )}
+      <LoadMoreButton cursor={nextCursor} onLoadMore={fetchOffers} />
     </div>
   );
 }
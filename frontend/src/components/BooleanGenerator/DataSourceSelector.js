@@ -9,6 +9,7 @@ function DataSourceSelector({ onDataSourceChange }) {
     { name: 'LinkedIn', icon: '💼' },
     { name: 'GitHub', icon: '💻' },
     { name: 'Google Scholar', icon: '🎓' },
+    { name: 'Internal', icon: '🗂️' },
   ];
 
   const handleToggleSource = (source) => {
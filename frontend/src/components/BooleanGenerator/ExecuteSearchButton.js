@@ -276,6 +276,34 @@ function ExecuteSearchButton({ booleanQuery, onExecute, disabled, onSearchSaved,
                       )}
                     </div>
                   )}
+
+                  {/* Internal Results */}
+                  {results.results.Internal && (
+                    <div className="p-4 bg-gray-50 rounded-lg">
+                      <h4 className="font-semibold text-gray-800 mb-2 flex items-center gap-2">
+                        🗂️ Internal Candidates
+                      </h4>
+                      {results.results.Internal.error ? (
+                        <p className="text-sm text-gray-700">{results.results.Internal.error}</p>
+                      ) : (
+                        <>
+                          <p className="text-sm text-gray-700 mb-2">
+                            Found {results.results.Internal.total} candidates in {results.results.Internal.took_ms} ms
+                          </p>
+                          <ul className="space-y-1">
+                            {results.results.Internal.candidates.map((candidate) => (
+                              <li key={candidate.id} className="text-sm text-gray-800">
+                                {candidate.first_name} {candidate.last_name}
+                                {candidate.primary_expertise && (
+                                  <span className="text-gray-500"> · {candidate.primary_expertise}</span>
+                                )}
+                              </li>
+                            ))}
+                          </ul>
+                        </>
+                      )}
+                    </div>
+                  )}
                 </div>
               )}
 